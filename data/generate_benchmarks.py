@@ -12,20 +12,37 @@ import os
 import glob
 import csv
 import json
+import time
+import hashlib
+import multiprocessing
+import queue
+import threading
+from multiprocessing.connection import wait
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, field
 import traceback
 
+try:
+    import resource  # Unix only, used for per-task memory limits
+except ImportError:
+    resource = None
+
 # Core libraries
+import vcgc
 from vcgc.network import VCPNetwork
-from vcgc.boolean import BooleanFunction
-from vcgc.synthesis import Synthesizer
-from vcgc.circuit import uniform_superposition_qiskit, generate_grover_diffusion, glue_grover_circuit
+from vcgc.dimacs import file_digest
+from vcgc.boolean import BooleanFunction, REDUCTION_MODES, oracle_vertices
+from vcgc.synthesis import Synthesizer, SynthesisCache
+from vcgc.instrumentation import profile, stage
+from vcgc.circuit import (uniform_superposition_qiskit, generate_grover_diffusion, assemble_grover_circuit,
+                          optimal_iterations, expanded_size, diffusion_depths, MCX_MODES)
+from vcgc.classical import num_colorings
+from vcgc.verification import check_oracle
 
 # Tweedledum for logic synthesis
 from tweedledum.bool_function_compiler.bool_function import BoolFunction
-from tweedledum.classical import write_gate_dot, LogicNetwork
+from tweedledum.classical import write_gate_dot, write_verilog, LogicNetwork
 
 # Qiskit for quantum circuits
 from qiskit import QuantumCircuit
@@ -46,6 +63,107 @@ class CircuitMetrics:
     depth: int
     num_gates: int
     oracle_type: Optional[str] = None
+    iterations: int = 1
+    diffusion: str = "default"
+    # Per-stage timings and memory (see vcgc.instrumentation.Profile.summary); "total" covers the whole task
+    stages: Dict[str, dict] = field(default_factory=dict)
+    # Why a task failed, e.g. the exception raised by its worker
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class BenchmarkTask:
+    """One independent unit of work: a circuit for one benchmark and method"""
+    filename: str
+    method: str  # "vcgc" or "saha_belletti"
+    oracle_type: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        return "VCGC" if self.method == "vcgc" else f"Saha-Belletti-{self.oracle_type}"
+
+    def failed_metrics(self, error: Optional[str] = None) -> "CircuitMetrics":
+        """Zero metrics recorded for a task that failed, timed out or ran out of memory"""
+        return CircuitMetrics(name=self.label, num_qubits=0, depth=0, num_gates=0, oracle_type=self.oracle_type,
+                              error=error)
+
+
+def _task_worker(generator: "BenchmarkGenerator", task: BenchmarkTask, conn, memory_limit_mb: Optional[int]):
+    """Entry point of a worker process: run one task and send its metrics back"""
+    if memory_limit_mb and resource is not None:
+        limit = memory_limit_mb << 20
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    try:
+        metrics = generator.run_task(task)
+        generator.flush_artifacts()
+    except MemoryError:
+        metrics = task.failed_metrics("MemoryError")
+    except Exception as e:
+        metrics = task.failed_metrics(f"{type(e).__name__}: {e}")
+    conn.send(metrics)
+    conn.close()
+
+
+# Pipeline stages reported as CSV columns, in pipeline order
+VCGC_STAGES = ['reduce', 'expression', 'from_expression', 'build_network', 'cache_lookup', 'xag_synth', 'to_qiskit',
+               'cache_store', 'verify_oracle', 'state_preparation', 'grover_diffusion', 'glue_grover_circuit']
+
+# Which files are written next to the metrics:
+#   full     Verilog and DOT of the VCGC logic network, and QASM of every circuit
+#   lazy     QASM of every circuit only; Verilog and DOT can be regenerated from the graph
+#   metrics  no files
+ARTIFACT_POLICIES = ['full', 'lazy', 'metrics']
+
+# Diffusion decompositions compared by --diffusion best
+BEST_DIFFUSION_MODES = ['clean', 'dirty', 'v-chain', 'log-depth']
+
+# QASM files repeat the oracle call per iteration; beyond this only metrics are recorded
+MAX_QASM_ITERATIONS = 1000
+
+
+class ArtifactWriter:
+    """
+    Background thread that writes artifact files, so metric computation does not wait on disk
+
+    Writes are queued with submit and run in order. A failed write is reported
+    and counted, and does not affect the task that produced the artifact.
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.written = 0
+        self.errors = 0
+        self.busy_s = 0.0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            path, write, args = self._queue.get()
+            start = time.perf_counter()
+            try:
+                write(*args)
+                self.written += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"Error writing {path}: {str(e)}")
+            finally:
+                self.busy_s += time.perf_counter() - start
+                self._queue.task_done()
+
+    def submit(self, path: Path, write, *args):
+        """Queue write(*args), which creates the file at path"""
+        self._queue.put((path, write, args))
+
+    def flush(self):
+        """Block until every queued artifact is written"""
+        self._queue.join()
+
+
+def _write_qasm(circuit: QuantumCircuit, path: Path):
+    with open(path, "w") as f:
+        dump(circuit=circuit, stream=f)
 
 
 @dataclass
@@ -59,10 +177,71 @@ class BenchmarkResult:
     saha_belletti_metrics: Dict[str, CircuitMetrics]
 
 
+def code_version() -> str:
+    """Digest of the vcgc package sources and this script, so results are redone after code changes"""
+    digest = hashlib.sha256()
+    paths = sorted(Path(vcgc.__file__).parent.glob("*.py")) + [Path(__file__)]
+    for path in paths:
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class ResultStore:
+    """
+    Append-only JSONL file of finished tasks, written as each task completes
+
+    Every line holds one task's metrics under a key that covers the benchmark
+    input and the code that produced it. A sweep that is interrupted loses at most
+    the tasks that were still running.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.records = {}
+        if self.path.exists():
+            with open(self.path, "rb") as f:
+                data = f.read()
+            for line in data.splitlines():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line of an interrupted run
+                self.records[record["key"]] = record
+            if data and not data.endswith(b"\n"):
+                with open(self.path, "a") as f:
+                    f.write("\n")
+
+    def get(self, key: str) -> Optional[dict]:
+        return self.records.get(key)
+
+    def append(self, key: str, task: "BenchmarkTask", metrics: CircuitMetrics) -> None:
+        record = {
+            "key": key,
+            "benchmark": task.filename,
+            "method": task.method,
+            "oracle_type": task.oracle_type,
+            "failed": metrics.num_qubits == 0,
+            "metrics": asdict(metrics),
+            "finished": time.time(),
+        }
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.records[key] = record
+
+
 class BenchmarkGenerator:
     """Main class for generating benchmark comparisons between VCGC and Saha-Belletti"""
     
-    def __init__(self, benchmarks_dir: str, output_dir: str, draw_circuits: bool = False):
+    def __init__(self, benchmarks_dir: str, output_dir: str, draw_circuits: bool = False, use_cache: bool = False,
+                 reduction: str = "balanced", exclude_invalid: bool = False, reduce_graph: bool = False,
+                 break_symmetry: bool = False, synthesis_cache: Optional[str] = None, canonical: bool = False,
+                 jobs: int = 1, task_timeout: Optional[float] = None, memory_limit_mb: Optional[int] = None,
+                 resume: bool = True, retry_failed: bool = False, trace_memory: bool = False,
+                 artifacts: str = "full", iterations="1", diffusion: str = "default", reflect_usp: bool = False,
+                 verify_oracle: bool = False):
         """
         Initialize the benchmark generator
         
@@ -70,10 +249,58 @@ class BenchmarkGenerator:
             benchmarks_dir: Directory containing .col benchmark files
             output_dir: Directory to save output files
             draw_circuits: Whether to save circuit visualizations
+            use_cache: Whether to load graphs through the compiled binary cache
+            reduction: AND reduction mode for the VCGC oracle (see vcgc.boolean.REDUCTION_MODES)
+            exclude_invalid: Forbid unused color codes in the oracle and prepare plain
+                Hadamards instead of a uniform superposition over the valid codes
+            reduce_graph: Build the VCGC circuit for VCPNetwork.reduce() of each graph
+            break_symmetry: Pre-color a clique of each graph before building the VCGC oracle
+            synthesis_cache: Directory of a persistent synthesis cache (None disables it)
+            canonical: Build the VCGC oracle from the canonically relabeled graph, so
+                relabeled copies of a graph hit the same synthesis cache entry
+            jobs: Number of worker processes; above 1 every (benchmark, method, oracle
+                type) task runs in its own process
+            task_timeout: Seconds after which a task's process is killed (process mode)
+            memory_limit_mb: Address space limit of every task's process in MiB (process mode)
+            resume: Skip tasks already recorded in output_dir/results.jsonl for the same
+                input file, settings and code version
+            retry_failed: When resuming, run recorded tasks again if they failed
+            trace_memory: Also record per-stage Python allocation peaks with tracemalloc
+                (slower). Peak RSS is always recorded, but is only per task in process mode.
+            artifacts: Which files to write next to the metrics, one of ARTIFACT_POLICIES
+            iterations: Grover iterations of the VCGC circuit, a number or "optimal" to
+                derive it from the search space and the number of colorings (exact, or sampled for wide graphs)
+            diffusion: MCX decomposition of the diffusion operator (see vcgc.circuit.MCX_MODES),
+                or "best" to pick the one with the lowest transpiled depth per instance
+            reflect_usp: Reflect about the prepared uniform superposition over the valid
+                codes instead of |+>^n
+            verify_oracle: Check every synthesized VCGC oracle against the coloring
+                predicate (see vcgc.verification.check_oracle) and fail the task on a mismatch
         """
+        if artifacts not in ARTIFACT_POLICIES:
+            raise ValueError(f"Unknown artifact policy '{artifacts}', expected one of {ARTIFACT_POLICIES}")
         self.benchmarks_dir = Path(benchmarks_dir)
         self.output_dir = Path(output_dir)
         self.draw_circuits = draw_circuits
+        self.use_cache = use_cache
+        self.reduction = reduction
+        self.exclude_invalid = exclude_invalid
+        self.reduce_graph = reduce_graph
+        self.break_symmetry = break_symmetry
+        self.synthesis_cache = SynthesisCache(synthesis_cache) if synthesis_cache else None
+        self.canonical = canonical
+        self.jobs = jobs
+        self.task_timeout = task_timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.resume = resume
+        self.retry_failed = retry_failed
+        self.trace_memory = trace_memory
+        self.artifacts = artifacts
+        self.iterations = iterations if iterations == "optimal" else int(iterations)
+        self.diffusion = diffusion
+        self.reflect_usp = reflect_usp
+        self.verify_oracle = verify_oracle
+        self._artifact_writer = None
         
         # Create output directory if it doesn't exist
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -81,10 +308,127 @@ class BenchmarkGenerator:
         # Saha-Belletti oracle types to test
         self.sb_oracle_types = ['original', 'minimal', 'simple', 'balanced']
     
+    def __getstate__(self):
+        # Worker processes start their own writer thread
+        state = self.__dict__.copy()
+        state['_artifact_writer'] = None
+        return state
+
+    def write_artifact(self, path: Path, write, *args):
+        """Write an artifact file in the background (see ArtifactWriter)"""
+        if self._artifact_writer is None or self._artifact_writer.pid != os.getpid():
+            self._artifact_writer = ArtifactWriter()
+        self._artifact_writer.submit(path, write, *args)
+
+    def flush_artifacts(self):
+        """Wait for the queued artifacts of this process to be written"""
+        if self._artifact_writer is not None and self._artifact_writer.pid == os.getpid():
+            self._artifact_writer.flush()
+
     def get_benchmark_files(self) -> List[str]:
-        """Get list of .col benchmark files"""
+        """Get sorted list of .col benchmark files"""
         col_files = glob.glob(str(self.benchmarks_dir / "*.col"))
-        return [Path(f).stem for f in col_files]
+        return sorted(Path(f).stem for f in col_files)
+
+    def load_network(self, filename: str) -> VCPNetwork:
+        """Load the network of a benchmark file (without .col extension)"""
+        dimacs_path = self.benchmarks_dir / f"{filename}.col"
+        return VCPNetwork(file_path=str(dimacs_path), use_cache=self.use_cache)
+
+    def get_tasks(self, benchmark_files: List[str]) -> List[BenchmarkTask]:
+        """Expand benchmarks into independent (benchmark, method, oracle type) tasks"""
+        tasks = []
+        for filename in benchmark_files:
+            tasks.append(BenchmarkTask(filename, "vcgc"))
+            tasks.extend(BenchmarkTask(filename, "saha_belletti", oracle_type) for oracle_type in self.sb_oracle_types)
+        return tasks
+
+    def task_key(self, task: BenchmarkTask, input_hash: str, version: str) -> str:
+        """Key of a task's result: benchmark input, method, VCGC settings and code version"""
+        settings = None
+        if task.method == "vcgc":
+            settings = [self.reduction, self.exclude_invalid, self.reduce_graph, self.break_symmetry, self.canonical,
+                        self.iterations, self.diffusion, self.reflect_usp, self.verify_oracle]
+        key = [task.filename, task.method, task.oracle_type, input_hash, settings, version]
+        return hashlib.sha256(json.dumps(key).encode()).hexdigest()
+
+    def run_task(self, task: BenchmarkTask) -> CircuitMetrics:
+        """Run a single task in the current process, recording the time and memory of its stages"""
+        with profile(trace_memory=self.trace_memory) as task_profile:
+            with stage("total"):
+                network = self.load_network(task.filename)
+                if task.method == "vcgc":
+                    metrics = self.generate_vcgc_circuit(network, task.filename)
+                else:
+                    metrics = self.generate_saha_belletti_circuit(network, task.filename, task.oracle_type)
+        metrics.stages = task_profile.summary()
+        return metrics
+
+    def run_tasks(self, tasks: List[BenchmarkTask], on_result=None) -> List[CircuitMetrics]:
+        """
+        Run tasks in a pool of worker processes, one process per task
+
+        At most self.jobs processes run at a time. A process that exceeds
+        self.task_timeout is killed, and self.memory_limit_mb caps the address space
+        of each process. Failed tasks get zero metrics.
+        
+        Args:
+            tasks: Tasks to run
+            on_result: Optional callback(task, metrics) called as each task finishes
+            
+        Returns:
+            Metrics of every task, in the order of tasks
+        """
+        context = multiprocessing.get_context()
+        results: List[Optional[CircuitMetrics]] = [None] * len(tasks)
+        pending = list(reversed(range(len(tasks))))
+        running = {}  # receiving connection -> (task index, process, deadline)
+        done = 0
+
+        def finish(index: int, metrics: CircuitMetrics, status: str = ""):
+            nonlocal done
+            done += 1
+            results[index] = metrics
+            if metrics.error and not status:
+                status = f" failed: {metrics.error}"
+            print(f"  [{done}/{len(tasks)}] {tasks[index].filename} {tasks[index].label}{status}")
+            if on_result is not None:
+                on_result(tasks[index], metrics)
+
+        while pending or running:
+            while pending and len(running) < max(self.jobs, 1):
+                index = pending.pop()
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(target=_task_worker, args=(self, tasks[index], sender, self.memory_limit_mb),
+                                          daemon=True)
+                process.start()
+                sender.close()
+                deadline = time.monotonic() + self.task_timeout if self.task_timeout else None
+                running[receiver] = (index, process, deadline)
+
+            deadlines = [deadline for _, _, deadline in running.values() if deadline is not None]
+            timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            for receiver in wait(list(running), timeout=timeout):
+                index, process, _ = running.pop(receiver)
+                try:
+                    finish(index, receiver.recv())
+                except EOFError:
+                    # The worker died without reporting, e.g. killed for exceeding its memory
+                    finish(index, tasks[index].failed_metrics("worker exited"), " failed: worker exited")
+                receiver.close()
+                process.join()
+
+            now = time.monotonic()
+            for receiver, (index, process, deadline) in list(running.items()):
+                if deadline is not None and now >= deadline:
+                    process.kill()
+                    process.join()
+                    receiver.close()
+                    del running[receiver]
+                    finish(index, tasks[index].failed_metrics(f"timed out after {self.task_timeout}s"),
+                           f" timed out after {self.task_timeout}s")
+
+        return results
     
     def generate_vcgc_circuit(self, network: VCPNetwork, filename: str) -> CircuitMetrics:
         """
@@ -101,63 +445,123 @@ class BenchmarkGenerator:
             # Create benchmark-specific output directory
             benchmark_output_dir = self.output_dir / filename
             benchmark_output_dir.mkdir(parents=True, exist_ok=True)
+
+            if self.reduce_graph:
+                with stage("reduce"):
+                    network = network.reduce().reduced
+                print(f"  Reduced graph: {network.num_vertices} vertices, {network.num_edges} edges")
             
             # Step 1: Extract graph constraints
             bf = BooleanFunction()
+            if self.break_symmetry:
+                # Work on a copy so the Saha-Belletti circuits see the original graph
+                network = network.subnetwork(network.core.vertices())
+                fixed = bf.fix_clique_colors(network)
+                print(f"  Fixed clique colors: {fixed}")
+            if self.canonical:
+                network = network.canonical_form().network
             
             # Step 2: Generate logic network
-            tweedledum_bf: BoolFunction = bf.create_multi_bit_function(network=network)
+            tweedledum_bf: BoolFunction = bf.create_multi_bit_function(network=network, reduction=self.reduction,
+                                                                       exclude_invalid=self.exclude_invalid)
             logic_network: LogicNetwork = tweedledum_bf.logic_network()
             
-            # Save Verilog file
-            verilog_filename = benchmark_output_dir / f"{filename}_vcgc.v"
-            bf.write_verilog_file(network=network, filename=str(verilog_filename))
-            
-            # Save DOT file for logic network
-            dot_filename = benchmark_output_dir / f"{filename}_vcgc.dot"
-            write_gate_dot(logic_network, str(dot_filename))
+            if self.artifacts == "full":
+                # Save Verilog and DOT files of the logic network built above
+                verilog_filename = benchmark_output_dir / f"{filename}_vcgc.v"
+                self.write_artifact(verilog_filename, write_verilog, logic_network, str(verilog_filename))
+                dot_filename = benchmark_output_dir / f"{filename}_vcgc.dot"
+                self.write_artifact(dot_filename, write_gate_dot, logic_network, str(dot_filename))
             
             # Step 3: Set up XAG synthesizer
-            synthesizer = Synthesizer(cf=tweedledum_bf)
+            synthesizer = Synthesizer(cf=tweedledum_bf, cache=self.synthesis_cache)
             
             # Step 4: Synthesize oracle with XAG
             oracle_circuit_xag: QuantumCircuit = synthesizer.synthesize_with_xag()
+            if self.verify_oracle:
+                with stage("verify_oracle"):
+                    check = check_oracle(network, oracle_circuit_xag, exclude_invalid=self.exclude_invalid, seed=0)
+                print(f"  Oracle check: {check}")
+                if not check.passed:
+                    raise RuntimeError(f"Synthesized oracle does not match the coloring predicate, "
+                                       f"e.g. on inputs {check.counterexample}")
             
             
             # Step 5: Create uniform superposition oracle
             num_superpos_states = network.available_colors
             num_encode_qubits = ceil(log2(num_superpos_states))
-            usp_oracle = uniform_superposition_qiskit(num_superpos_states=num_superpos_states).decompose()
+            if self.exclude_invalid:
+                # The oracle rejects unused codes, so every code may be prepared
+                usp_oracle = QuantumCircuit(num_encode_qubits)
+                usp_oracle.h(range(num_encode_qubits))
+            else:
+                usp_oracle = uniform_superposition_qiskit(num_superpos_states=num_superpos_states).decompose()
             
             # Step 6: Create diffusion operator
-            num_data_qubits = network.num_vertices * num_encode_qubits
-            diff_oracle = generate_grover_diffusion(num_qubits=num_data_qubits)
+            num_vertices = len(oracle_vertices(network))
+            num_data_qubits = num_vertices * num_encode_qubits
+            reflected = usp_oracle if self.reflect_usp else None
+            diffusion_mode = self.diffusion
+            if diffusion_mode == "best":
+                # Ancilla-free decompositions are never the shallowest, so only the ancilla modes are compared
+                depths = diffusion_depths(num_data_qubits, usp=reflected, num_encode_qubits=num_encode_qubits,
+                                          modes=BEST_DIFFUSION_MODES)
+                diffusion_mode = min(depths, key=lambda mode: (depths[mode]["depth"], depths[mode]["ancillas"]))
+                print(f"  Diffusion depths: " + ", ".join(f"{mode} {entry['depth']}" for mode, entry in depths.items())
+                      + f" -> {diffusion_mode}")
+            diff_oracle = generate_grover_diffusion(num_qubits=num_data_qubits, mcx_mode=diffusion_mode, usp=reflected,
+                                                    num_encode_qubits=num_encode_qubits)
             
             # Step 7: Create complete Grover circuit
-            vcgc_grover_circuit = glue_grover_circuit(
+            iterations = self.iterations
+            if iterations == "optimal":
+                codes = 2 ** num_encode_qubits if self.exclude_invalid else num_superpos_states
+                num_states = codes ** num_vertices
+                num_solutions, exact = num_colorings(network, seed=0)
+                if exact and num_solutions == 0:
+                    print("  No valid coloring exists, the oracle marks no state")
+                num_solutions = min(num_solutions, num_states)
+                iterations = optimal_iterations(num_states, max(round(num_solutions), 1) if num_solutions else 0)
+                print(f"  Grover iterations: {iterations} ({'' if exact else '~'}{num_solutions:.6g} colorings "
+                      f"of {num_states} states)")
+            assemble = lambda rounds: assemble_grover_circuit(
                 usp=usp_oracle,
                 oracle=oracle_circuit_xag,
                 diffusion=diff_oracle,
                 num_data_qubits=num_data_qubits,
-                num_encode_qubits=num_encode_qubits
+                num_encode_qubits=num_encode_qubits,
+                iterations=rounds
             )
+            vcgc_grover_circuit = assemble(1)
+            # Gate-level metrics with the oracle and diffusion expanded. Rounds are separated by
+            # barriers over all qubits, so they add up and are measured on a single round.
+            prep_depth, prep_gates = expanded_size(assemble(0))
+            round_depth, round_gates = expanded_size(vcgc_grover_circuit)
+            depth = prep_depth + iterations * (round_depth - prep_depth)
+            num_gates = prep_gates + iterations * (round_gates - prep_gates)
             
             # Save QASM file
-            qasm_filename = benchmark_output_dir / f"{filename}_vcgc.qasm"
-            with open(qasm_filename, "w") as f:
-                dump(circuit=vcgc_grover_circuit, stream=f)
+            if self.artifacts != "metrics" and iterations > MAX_QASM_ITERATIONS:
+                print(f"  Skipping the QASM file: {iterations} iterations exceed {MAX_QASM_ITERATIONS}")
+            elif self.artifacts != "metrics":
+                if iterations != 1:
+                    vcgc_grover_circuit = assemble(iterations)
+                qasm_filename = benchmark_output_dir / f"{filename}_vcgc.qasm"
+                self.write_artifact(qasm_filename, _write_qasm, vcgc_grover_circuit, qasm_filename)
             
             return CircuitMetrics(
                 name="VCGC",
                 num_qubits=vcgc_grover_circuit.num_qubits,
-                depth=vcgc_grover_circuit.depth(),
-                num_gates=len(vcgc_grover_circuit)
+                depth=depth,
+                num_gates=num_gates,
+                iterations=iterations,
+                diffusion=diffusion_mode
             )
             
         except Exception as e:
             print(f"Error generating VCGC circuit for {filename}: {str(e)}")
             traceback.print_exc()
-            return CircuitMetrics(name="VCGC", num_qubits=0, depth=0, num_gates=0)
+            return CircuitMetrics(name="VCGC", num_qubits=0, depth=0, num_gates=0, error=f"{type(e).__name__}: {e}")
     
     def generate_saha_belletti_circuits(self, network: VCPNetwork, filename: str) -> Dict[str, CircuitMetrics]:
         """
@@ -177,39 +581,52 @@ class BenchmarkGenerator:
         benchmark_output_dir.mkdir(parents=True, exist_ok=True)
         
         for oracle_type in self.sb_oracle_types:
-            try:
-                # Generate Saha-Belletti circuit
+            sb_metrics[oracle_type] = self.generate_saha_belletti_circuit(network, filename, oracle_type)
+        
+        return sb_metrics
+
+    def generate_saha_belletti_circuit(self, network: VCPNetwork, filename: str, oracle_type: str) -> CircuitMetrics:
+        """
+        Generate the Saha-Belletti circuit for one oracle type
+        
+        Args:
+            network: VCP network object
+            filename: Base filename for outputs
+            oracle_type: Saha-Belletti oracle type
+            
+        Returns:
+            CircuitMetrics object with the circuit metrics (zeros on failure)
+        """
+        benchmark_output_dir = self.output_dir / filename
+        benchmark_output_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            # Generate Saha-Belletti circuit
+            with stage("generate_circuit"):
                 sb_circuit = generate_circuit(
                     graph=network.graph,
                     colors=network.available_colors,
                     oracle_type=oracle_type,
                     grover_iterations=1
                 )
-                
-                sb_metrics[oracle_type] = CircuitMetrics(
-                    name=f"Saha-Belletti-{oracle_type}",
-                    num_qubits=sb_circuit.num_qubits,
-                    depth=sb_circuit.depth(),
-                    num_gates=len(sb_circuit),
-                    oracle_type=oracle_type
-                )
-                
-                # Save QASM file for this oracle type
+            
+            metrics = CircuitMetrics(
+                name=f"Saha-Belletti-{oracle_type}",
+                num_qubits=sb_circuit.num_qubits,
+                depth=sb_circuit.depth(),
+                num_gates=len(sb_circuit),
+                oracle_type=oracle_type
+            )
+            
+            # Save QASM file for this oracle type
+            if self.artifacts != "metrics":
                 qasm_filename = benchmark_output_dir / f"{filename}_sb_{oracle_type}.qasm"
-                with open(qasm_filename, "w") as f:
-                    dump(circuit=sb_circuit, stream=f)
-                    
-            except Exception as e:
-                print(f"Error generating Saha-Belletti {oracle_type} circuit for {filename}: {str(e)}")
-                sb_metrics[oracle_type] = CircuitMetrics(
-                    name=f"Saha-Belletti-{oracle_type}",
-                    num_qubits=0,
-                    depth=0,
-                    num_gates=0,
-                    oracle_type=oracle_type
-                )
-        
-        return sb_metrics
+                self.write_artifact(qasm_filename, _write_qasm, sb_circuit, qasm_filename)
+
+            return metrics
+                
+        except Exception as e:
+            print(f"Error generating Saha-Belletti {oracle_type} circuit for {filename}: {str(e)}")
+            return BenchmarkTask(filename, "saha_belletti", oracle_type).failed_metrics(f"{type(e).__name__}: {e}")
     
     def process_benchmark(self, filename: str) -> Optional[BenchmarkResult]:
         """
@@ -225,8 +642,7 @@ class BenchmarkGenerator:
         
         try:
             # Load network from DIMACS file
-            dimacs_path = self.benchmarks_dir / f"{filename}.col"
-            network = VCPNetwork(file_path=str(dimacs_path))
+            network = self.load_network(filename)
             
             # Create benchmark-specific output directory
             benchmark_output_dir = self.output_dir / filename
@@ -246,6 +662,7 @@ class BenchmarkGenerator:
             # Generate Saha-Belletti circuits
             print("  Generating Saha-Belletti circuits...")
             sb_metrics = self.generate_saha_belletti_circuits(network, filename)
+            self.flush_artifacts()
             
             return BenchmarkResult(
                 filename=filename,
@@ -261,6 +678,75 @@ class BenchmarkGenerator:
             traceback.print_exc()
             return None
     
+    def run_benchmark_tasks(self, benchmark_files: List[str]) -> List[BenchmarkResult]:
+        """
+        Process benchmarks as independent tasks, recording each one as it finishes
+
+        Graphs are loaded (and drawn) in this process for the graph statistics. The
+        circuits are built in this process, or by worker processes (see run_tasks)
+        when jobs, a task timeout or a memory limit are set. Tasks found in the
+        result store are skipped when resuming.
+        
+        Args:
+            benchmark_files: Names of the benchmark files (without .col extension)
+            
+        Returns:
+            BenchmarkResult objects in the order of benchmark_files
+        """
+        networks = {}
+        input_hashes = {}
+        for filename in benchmark_files:
+            try:
+                networks[filename] = network = self.load_network(filename)
+                input_hashes[filename] = file_digest(str(self.benchmarks_dir / f"{filename}.col"))
+            except Exception as e:
+                print(f"Error processing benchmark {filename}: {str(e)}")
+                continue
+            if self.draw_circuits:
+                benchmark_output_dir = self.output_dir / filename
+                benchmark_output_dir.mkdir(parents=True, exist_ok=True)
+                network.draw_graph(name=str(benchmark_output_dir / f"{filename}_graph.png"), node_size=1000)
+
+        store = ResultStore(self.output_dir / "results.jsonl")
+        version = code_version()
+        keys = {task: self.task_key(task, input_hashes[task.filename], version)
+                for task in self.get_tasks(list(networks))}
+
+        metrics = {}
+        for task, key in keys.items():
+            record = store.get(key) if self.resume else None
+            if record is not None and not (record["failed"] and self.retry_failed):
+                metrics[task] = CircuitMetrics(**record["metrics"])
+        tasks = [task for task in keys if task not in metrics]
+        print(f"Running {len(tasks)} tasks ({len(metrics)} already recorded) on {self.jobs} worker(s)")
+
+        def record(task: BenchmarkTask, task_metrics: CircuitMetrics):
+            store.append(keys[task], task, task_metrics)
+
+        if self.jobs > 1 or self.task_timeout or self.memory_limit_mb:
+            metrics.update(zip(tasks, self.run_tasks(tasks, on_result=record)))
+        else:
+            for done, task in enumerate(tasks, start=1):
+                print(f"  [{done}/{len(tasks)}] {task.filename} {task.label}")
+                metrics[task] = self.run_task(task)
+                record(task, metrics[task])
+            self.flush_artifacts()
+
+        results = []
+        for filename, network in networks.items():
+            results.append(BenchmarkResult(
+                filename=filename,
+                graph_nodes=network.num_vertices,
+                graph_edges=network.num_edges,
+                available_colors=network.available_colors,
+                vcgc_metrics=metrics[BenchmarkTask(filename, "vcgc")],
+                saha_belletti_metrics={
+                    oracle_type: metrics[BenchmarkTask(filename, "saha_belletti", oracle_type)]
+                    for oracle_type in self.sb_oracle_types
+                }
+            ))
+        return results
+    
     def save_results_csv(self, results: List[BenchmarkResult], filename: str = "benchmark_results.csv"):
         """Save results to CSV file"""
         csv_path = self.output_dir / filename
@@ -272,8 +758,11 @@ class BenchmarkGenerator:
                 'sb_original_qubits', 'sb_original_depth', 'sb_original_gates',
                 'sb_minimal_qubits', 'sb_minimal_depth', 'sb_minimal_gates',
                 'sb_simple_qubits', 'sb_simple_depth', 'sb_simple_gates',
-                'sb_balanced_qubits', 'sb_balanced_depth', 'sb_balanced_gates'
+                'sb_balanced_qubits', 'sb_balanced_depth', 'sb_balanced_gates',
+                'vcgc_iterations', 'vcgc_diffusion', 'vcgc_time_s', 'vcgc_cpu_s', 'vcgc_peak_rss_kb', 'vcgc_peak_traced_kb'
             ]
+            fieldnames += [f'vcgc_{name}_s' for name in VCGC_STAGES]
+            fieldnames += [f'sb_{oracle_type}_time_s' for oracle_type in self.sb_oracle_types]
             
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
             writer.writeheader()
@@ -288,6 +777,17 @@ class BenchmarkGenerator:
                     'vcgc_depth': result.vcgc_metrics.depth,
                     'vcgc_gates': result.vcgc_metrics.num_gates,
                 }
+
+                # Timings are left empty for stages that did not run (or results recorded without them)
+                row['vcgc_iterations'] = result.vcgc_metrics.iterations
+                row['vcgc_diffusion'] = result.vcgc_metrics.diffusion
+                total = result.vcgc_metrics.stages.get('total', {})
+                row['vcgc_time_s'] = total.get('wall_s')
+                row['vcgc_cpu_s'] = total.get('cpu_s')
+                row['vcgc_peak_rss_kb'] = total.get('peak_rss_kb')
+                row['vcgc_peak_traced_kb'] = total.get('peak_traced_kb')
+                for name in VCGC_STAGES:
+                    row[f'vcgc_{name}_s'] = result.vcgc_metrics.stages.get(name, {}).get('wall_s')
                 
                 # Add Saha-Belletti metrics
                 for oracle_type in self.sb_oracle_types:
@@ -296,6 +796,7 @@ class BenchmarkGenerator:
                         row[f'sb_{oracle_type}_qubits'] = metrics.num_qubits
                         row[f'sb_{oracle_type}_depth'] = metrics.depth
                         row[f'sb_{oracle_type}_gates'] = metrics.num_gates
+                        row[f'sb_{oracle_type}_time_s'] = metrics.stages.get('total', {}).get('wall_s')
                     else:
                         row[f'sb_{oracle_type}_qubits'] = 0
                         row[f'sb_{oracle_type}_depth'] = 0
@@ -318,7 +819,10 @@ class BenchmarkGenerator:
                 'vcgc': {
                     'qubits': result.vcgc_metrics.num_qubits,
                     'depth': result.vcgc_metrics.depth,
-                    'gates': result.vcgc_metrics.num_gates
+                    'gates': result.vcgc_metrics.num_gates,
+                    'iterations': result.vcgc_metrics.iterations,
+                    'diffusion': result.vcgc_metrics.diffusion,
+                    'stages': result.vcgc_metrics.stages
                 },
                 'saha_belletti': {}
             }
@@ -327,7 +831,8 @@ class BenchmarkGenerator:
                 results_dict[result.filename]['saha_belletti'][oracle_type] = {
                     'qubits': metrics.num_qubits,
                     'depth': metrics.depth,
-                    'gates': metrics.num_gates
+                    'gates': metrics.num_gates,
+                    'stages': metrics.stages
                 }
         
         with open(json_path, 'w') as f:
@@ -343,6 +848,11 @@ class BenchmarkGenerator:
             print(f"\n📊 {result.filename}")
             print(f"   Graph: {result.graph_nodes} nodes, {result.graph_edges} edges, {result.available_colors} colors")
             print(f"   VCGC: {result.vcgc_metrics.num_qubits} qubits, {result.vcgc_metrics.depth} depth, {result.vcgc_metrics.num_gates} gates")
+            stages = {name: entry for name, entry in result.vcgc_metrics.stages.items() if name != 'total'}
+            if stages:
+                slowest = sorted(stages, key=lambda name: -stages[name]['wall_s'])[:3]
+                print(f"   VCGC time: {result.vcgc_metrics.stages['total']['wall_s']:.2f}s, slowest stages: "
+                      + ", ".join(f"{name} {stages[name]['wall_s']:.2f}s" for name in slowest))
             
             for oracle_type in self.sb_oracle_types:
                 if oracle_type in result.saha_belletti_metrics:
@@ -359,11 +869,7 @@ class BenchmarkGenerator:
         benchmark_files = self.get_benchmark_files()
         print(f"Found {len(benchmark_files)} benchmark files")
         
-        results = []
-        for filename in benchmark_files:
-            result = self.process_benchmark(filename)
-            if result:
-                results.append(result)
+        results = self.run_benchmark_tasks(benchmark_files)
         
         # Save results
         self.save_results_csv(results)
@@ -388,6 +894,42 @@ def main():
                        help="Output directory for results")
     parser.add_argument("--draw-circuits", "-d", action="store_true", 
                        help="Generate circuit visualizations")
+    parser.add_argument("--cache", action="store_true",
+                       help="Load graphs through the compiled binary cache (.vcgc_cache)")
+    parser.add_argument("--reduction", choices=REDUCTION_MODES, default="balanced",
+                       help="AND reduction mode for the VCGC oracle")
+    parser.add_argument("--exclude-invalid", action="store_true",
+                       help="Forbid unused color codes in the VCGC oracle instead of in the state preparation")
+    parser.add_argument("--reduce", action="store_true",
+                       help="Peel low-degree and dominated vertices before building the VCGC oracle")
+    parser.add_argument("--break-symmetry", action="store_true",
+                       help="Pre-color a clique to break the color permutation symmetry of the VCGC oracle")
+    parser.add_argument("--synthesis-cache", metavar="DIR",
+                       help="Reuse synthesized oracles from a persistent cache in DIR")
+    parser.add_argument("--canonical", action="store_true",
+                       help="Build the VCGC oracle from the canonically relabeled graph")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                       help="Number of worker processes for (benchmark, method, oracle type) tasks")
+    parser.add_argument("--task-timeout", type=float, default=None,
+                       help="Kill a task after this many seconds (runs tasks in worker processes)")
+    parser.add_argument("--memory-limit", type=int, default=None, metavar="MB",
+                       help="Address space limit per task in MiB (runs tasks in worker processes)")
+    parser.add_argument("--no-resume", action="store_true",
+                       help="Run every task again instead of reusing results.jsonl in the output directory")
+    parser.add_argument("--retry-failed", action="store_true",
+                       help="Run recorded tasks again if they failed or timed out")
+    parser.add_argument("--trace-memory", action="store_true",
+                       help="Record per-stage Python allocation peaks with tracemalloc (slower)")
+    parser.add_argument("--iterations", default="1",
+                       help="Grover iterations of the VCGC circuit, or 'optimal' to derive them from the number of valid colorings")
+    parser.add_argument("--diffusion", choices=list(MCX_MODES) + ["best"], default="default",
+                       help="MCX decomposition of the VCGC diffusion operator, or 'best' for the shallowest per instance")
+    parser.add_argument("--reflect-usp", action="store_true",
+                       help="Reflect about the prepared uniform superposition instead of |+>^n in the diffusion")
+    parser.add_argument("--verify-oracle", action="store_true",
+                       help="Check every synthesized VCGC oracle against the coloring predicate")
+    parser.add_argument("--artifacts", choices=ARTIFACT_POLICIES, default="full",
+                       help="Files to write: Verilog, DOT and QASM (full), QASM only (lazy) or none (metrics)")
     
     args = parser.parse_args()
     
@@ -395,7 +937,25 @@ def main():
     generator = BenchmarkGenerator(
         benchmarks_dir=args.benchmarks_dir,
         output_dir=args.output_dir,
-        draw_circuits=args.draw_circuits
+        draw_circuits=args.draw_circuits,
+        use_cache=args.cache,
+        reduction=args.reduction,
+        exclude_invalid=args.exclude_invalid,
+        reduce_graph=args.reduce,
+        break_symmetry=args.break_symmetry,
+        synthesis_cache=args.synthesis_cache,
+        canonical=args.canonical,
+        jobs=args.jobs,
+        task_timeout=args.task_timeout,
+        memory_limit_mb=args.memory_limit,
+        resume=not args.no_resume,
+        retry_failed=args.retry_failed,
+        trace_memory=args.trace_memory,
+        artifacts=args.artifacts,
+        iterations=args.iterations,
+        diffusion=args.diffusion,
+        reflect_usp=args.reflect_usp,
+        verify_oracle=args.verify_oracle
     )
     
     # Run all benchmarks
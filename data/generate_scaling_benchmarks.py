@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Scaling Benchmark Suite for the VCGC Pipeline
+
+Generates parameterized graph families (Erdos-Renyi, grids, Mycielski, complete
+k-partite and random regular graphs), runs the full VCGC pipeline on every point
+through BenchmarkGenerator, and fits growth curves of synthesis time, qubits,
+depth and gate count against |V|, |E| and k. A stored baseline flags regressions.
+"""
+
+import csv
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import networkx as nx
+import numpy as np
+
+from vcgc.dimacs import write_dimacs
+from generate_benchmarks import BenchmarkGenerator, BenchmarkResult
+
+
+def _greedy_colors(graph: nx.Graph) -> int:
+    """Number of colors of a largest-first greedy coloring, so generated instances are colorable"""
+    coloring = nx.coloring.greedy_color(graph, strategy="largest_first")
+    return max(2, max(coloring.values(), default=0) + 1)
+
+
+def _erdos_renyi(p: float):
+    def build(n: int, seed: int):
+        graph = nx.gnp_random_graph(n, p, seed=seed)
+        return graph, _greedy_colors(graph)
+    return build
+
+
+def _grid(side: int, seed: int):
+    return nx.grid_2d_graph(side, side), 2
+
+
+def _mycielski(order: int, seed: int):
+    # The Mycielski graph of order i has chromatic number i
+    return nx.mycielski_graph(order), order
+
+
+def _k_partite(k: int):
+    def build(part_size: int, seed: int):
+        return nx.complete_multipartite_graph(*([part_size] * k)), k
+    return build
+
+
+def _random_regular(degree: int):
+    def build(n: int, seed: int):
+        graph = nx.random_regular_graph(degree, n, seed=seed)
+        return graph, _greedy_colors(graph)
+    return build
+
+
+# Family name -> (builder(parameter, seed) -> (graph, colors), default parameters)
+FAMILIES = {
+    "er_sparse": (_erdos_renyi(0.2), [4, 6, 8, 10, 12, 14]),
+    "er_medium": (_erdos_renyi(0.4), [4, 6, 8, 10, 12]),
+    "er_dense": (_erdos_renyi(0.7), [4, 5, 6, 7, 8]),
+    "grid": (_grid, [2, 3, 4, 5]),
+    "mycielski": (_mycielski, [2, 3, 4]),
+    "tripartite": (_k_partite(3), [1, 2, 3, 4]),
+    "regular3": (_random_regular(3), [4, 6, 8, 10, 12]),
+}
+
+# Metrics fitted and compared against the baseline
+METRICS = ["synthesis_s", "total_s", "qubits", "depth", "gates"]
+SIZE_METRICS = ["qubits", "depth", "gates"]
+
+
+class ScalingSuite:
+    """Generate the family instances, benchmark them and analyse how the metrics grow"""
+
+    def __init__(self, output_dir: str, families: Optional[List[str]] = None, max_vertices: Optional[int] = None,
+                 seed: int = 0, **generator_options):
+        """
+        Initialize the scaling suite
+
+        Args:
+            output_dir: Directory for the generated graphs, circuits and reports
+            families: Names of FAMILIES to run (all by default)
+            max_vertices: Skip family points with more vertices
+            seed: Seed of the random families, so every run sees the same graphs
+            generator_options: Options passed on to BenchmarkGenerator (jobs, task_timeout, ...)
+        """
+        self.output_dir = Path(output_dir)
+        self.graphs_dir = self.output_dir / "graphs"
+        self.families = families or list(FAMILIES)
+        self.max_vertices = max_vertices
+        self.seed = seed
+        self.generator = BenchmarkGenerator(benchmarks_dir=str(self.graphs_dir), output_dir=str(self.output_dir),
+                                            **generator_options)
+        # Only the VCGC pipeline is measured
+        self.generator.sb_oracle_types = []
+
+    def generate_graphs(self) -> Dict[str, dict]:
+        """
+        Write every family point as a DIMACS file
+
+        Returns:
+            Mapping of benchmark name to its family and parameter
+        """
+        self.graphs_dir.mkdir(parents=True, exist_ok=True)
+        points = {}
+        for family in self.families:
+            build, parameters = FAMILIES[family]
+            for parameter in parameters:
+                graph, colors = build(parameter, self.seed)
+                if self.max_vertices and graph.number_of_nodes() > self.max_vertices:
+                    continue
+                if graph.number_of_edges() == 0:
+                    # Small sparse random graphs can come out empty, leaving the oracle without inputs
+                    continue
+                graph = nx.convert_node_labels_to_integers(graph, first_label=1)
+                name = f"{family}_{parameter}"
+                write_dimacs(str(self.graphs_dir / f"{name}.col"), graph.number_of_nodes(), list(graph.edges()),
+                             colors, comments=(f"{family} family, parameter {parameter}, seed {self.seed}",))
+                points[name] = {"family": family, "parameter": parameter}
+        return points
+
+    def run(self) -> List[dict]:
+        """
+        Generate the graphs and benchmark every point
+
+        Returns:
+            One row per point with its size, metrics and per-stage timings
+        """
+        points = self.generate_graphs()
+        print(f"Running the VCGC pipeline on {len(points)} scaling points")
+        results = self.generator.run_benchmark_tasks(list(points))
+        rows = [self.to_row(result, points[result.filename]) for result in results]
+        self.save_points_csv(rows)
+        return rows
+
+    @staticmethod
+    def to_row(result: BenchmarkResult, point: dict) -> dict:
+        """Flatten a benchmark result into one point of the growth curves"""
+        metrics = result.vcgc_metrics
+        stages = metrics.stages
+        wall = lambda name: stages.get(name, {}).get("wall_s", 0.0)
+        return {
+            "benchmark": result.filename,
+            "family": point["family"],
+            "parameter": point["parameter"],
+            "vertices": result.graph_nodes,
+            "edges": result.graph_edges,
+            "colors": result.available_colors,
+            "failed": metrics.num_qubits == 0,
+            # Time to get from the logic network to the Qiskit oracle
+            "synthesis_s": wall("cache_lookup") + wall("xag_synth") + wall("to_qiskit"),
+            "total_s": wall("total"),
+            "peak_rss_kb": stages.get("total", {}).get("peak_rss_kb"),
+            "qubits": metrics.num_qubits,
+            "depth": metrics.depth,
+            "gates": metrics.num_gates,
+        }
+
+    def save_points_csv(self, rows: List[dict], filename: str = "scaling_points.csv"):
+        """Save one line per scaling point"""
+        if not rows:
+            return
+        with open(self.output_dir / filename, "w", newline="") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def fit_growth(x: List[float], y: List[float]) -> Optional[dict]:
+    """
+    Fit y = c * x^b by least squares in log-log space
+
+    Points with non-positive x or y carry no information in log space and are dropped.
+
+    Returns:
+        {"exponent", "coefficient", "r2", "points"} or None with fewer than 3 usable points
+    """
+    pairs = [(a, b) for a, b in zip(x, y) if a > 0 and b > 0]
+    if len(pairs) < 3 or len({a for a, _ in pairs}) < 2:
+        return None
+    log_x, log_y = np.log(np.array(pairs, dtype=float)).T
+    exponent, intercept = np.polyfit(log_x, log_y, 1)
+    residual = log_y - (exponent * log_x + intercept)
+    total = np.sum((log_y - log_y.mean()) ** 2)
+    r2 = 1.0 - np.sum(residual ** 2) / total if total > 0 else 1.0
+    return {"exponent": float(exponent), "coefficient": float(np.exp(intercept)), "r2": float(r2),
+            "points": len(pairs)}
+
+
+def growth_curves(rows: List[dict]) -> Dict[str, dict]:
+    """
+    Fit every metric against |V|, |E| and k, over all points and per family
+
+    Returns:
+        {"all" or family: {metric: {"vertices" | "edges" | "colors": fit or None}}}
+    """
+    groups = {"all": [row for row in rows if not row["failed"]]}
+    for row in groups["all"]:
+        groups.setdefault(row["family"], []).append(row)
+    return {
+        group: {
+            metric: {size: fit_growth([row[size] for row in members], [row[metric] for row in members])
+                     for size in ("vertices", "edges", "colors")}
+            for metric in METRICS
+        }
+        for group, members in groups.items()
+    }
+
+
+def find_regressions(rows: List[dict], baseline: Dict[str, dict], time_tolerance: float = 1.5,
+                     min_seconds: float = 0.05) -> List[str]:
+    """
+    Compare the points against a baseline of earlier rows keyed by benchmark name
+
+    Circuit sizes are deterministic, so any growth is a regression. Times regress when
+    they exceed the baseline by more than time_tolerance and by at least min_seconds,
+    which keeps timer noise on tiny instances out of the report. A point that failed
+    but passed in the baseline is always a regression.
+    """
+    regressions = []
+    for row in rows:
+        before = baseline.get(row["benchmark"])
+        if before is None:
+            continue
+        if row["failed"]:
+            if not before["failed"]:
+                regressions.append(f"{row['benchmark']}: failed (passed in the baseline)")
+            continue
+        for metric in SIZE_METRICS:
+            if row[metric] > before[metric]:
+                regressions.append(f"{row['benchmark']}: {metric} {before[metric]} -> {row[metric]}")
+        for metric in ("synthesis_s", "total_s"):
+            if row[metric] > before[metric] * time_tolerance and row[metric] - before[metric] >= min_seconds:
+                regressions.append(f"{row['benchmark']}: {metric} {before[metric]:.3f}s -> {row[metric]:.3f}s")
+    return regressions
+
+
+def print_growth_curves(curves: Dict[str, dict]):
+    """Print the fitted exponents, e.g. gates ~ |E|^1.02"""
+    print("\n" + "=" * 80)
+    print("GROWTH CURVES (y = c * x^b, b shown with R^2)")
+    print("=" * 80)
+    for group, metrics in curves.items():
+        print(f"\n📈 {group}")
+        for metric, fits in metrics.items():
+            parts = [f"{size} b={fit['exponent']:.2f} (R^2 {fit['r2']:.2f})"
+                     for size, fit in fits.items() if fit is not None]
+            if parts:
+                print(f"   {metric}: " + ", ".join(parts))
+
+
+def main():
+    """Main function to run the scaling suite"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the VCGC pipeline on synthetic graph families and fit growth curves")
+    parser.add_argument("--output-dir", "-o", default="../data/scaling",
+                       help="Output directory for graphs, circuits and reports")
+    parser.add_argument("--families", nargs="+", choices=list(FAMILIES), default=None,
+                       help="Families to run (default: all)")
+    parser.add_argument("--max-vertices", type=int, default=None,
+                       help="Skip family points with more vertices")
+    parser.add_argument("--seed", type=int, default=0,
+                       help="Seed of the random families")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                       help="Number of worker processes")
+    parser.add_argument("--task-timeout", type=float, default=None,
+                       help="Seconds after which a point is killed and recorded as failed")
+    parser.add_argument("--memory-limit", type=int, default=None, metavar="MB",
+                       help="Address space limit of every point's process")
+    parser.add_argument("--no-resume", action="store_true",
+                       help="Run every point again instead of reusing results.jsonl in the output directory")
+    parser.add_argument("--baseline", metavar="FILE",
+                       help="Baseline JSON to compare against; exits with status 1 on regressions")
+    parser.add_argument("--save-baseline", metavar="FILE",
+                       help="Write this run's points as a baseline JSON")
+    parser.add_argument("--time-tolerance", type=float, default=1.5,
+                       help="Factor by which a time may exceed the baseline before it is flagged")
+
+    args = parser.parse_args()
+
+    suite = ScalingSuite(
+        output_dir=args.output_dir,
+        families=args.families,
+        max_vertices=args.max_vertices,
+        seed=args.seed,
+        jobs=args.jobs,
+        task_timeout=args.task_timeout,
+        memory_limit_mb=args.memory_limit,
+        resume=not args.no_resume
+    )
+    rows = suite.run()
+
+    curves = growth_curves(rows)
+    with open(suite.output_dir / "scaling_fits.json", "w") as f:
+        json.dump(curves, f, indent=2)
+    print_growth_curves(curves)
+
+    failed = [row["benchmark"] for row in rows if row["failed"]]
+    if failed:
+        print(f"\n⚠️  Failed or timed out: {', '.join(failed)}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({row["benchmark"]: row for row in rows}, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(rows, baseline, time_tolerance=args.time_tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(f"   {regression}")
+            status = 1
+        else:
+            print(f"\n✅ No regressions against {args.baseline}")
+
+    print(f"\n✅ Results saved to {suite.output_dir}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
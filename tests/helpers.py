@@ -0,0 +1,13 @@
+# Helpers shared by the vcgc test modules
+"""
+Network factory used across the tests
+"""
+import vcgc
+
+
+def make_network(edges, num_vertices, colors=3, colored=None):
+    """Return a network of num_vertices vertices with the given edges, colors and pre-assigned colors."""
+    network = vcgc.VCPNetwork()
+    network.available_colors = colors
+    network.create_graph_core(num_vertices, edges, colored or {}, colors)
+    return network
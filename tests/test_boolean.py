@@ -0,0 +1,142 @@
+# Test module for vcgc.boolean
+"""
+Tests for the boolean function builders
+"""
+import pytest
+import vcgc
+from tweedledum.bool_function_compiler.bool_function import BoolFunction
+from vcgc.verification import check_oracle
+from .helpers import make_network
+
+# create_manual_verilog output of the original implementation for the graph of
+# test_manual_verilog_keeps_the_chained_output
+MANUAL_VERILOG = """module top( x0 , x1 , x2 , x3 , x4 , x5 , x6 , x7 , y0 );
+  input x0 , x1 , x2 , x3 , x4 , x5 , x6 , x7 ;
+  output y0 ;
+  wire n13 , n14 , n15 , n16 , n17 , n18 , n19 , n20 , n21 , n22 , n23 , n24 , n25 , n26 ;
+  assign n13 = x4 ^ x2 ;
+  assign n14 = x5 ^ x3 ;
+  assign n15 = ~n13 & ~n14 ;
+  assign n16 = x6 ^ x2 ;
+  assign n17 = x7 ^ x3 ;
+  assign n18 = ~n16 & ~n17 ;
+  assign n19 = x6 ^ x4 ;
+  assign n20 = x7 ^ x5 ;
+  assign n21 = ~n19 & ~n20 ;
+  assign n22 = x8 ^ x6 ;
+  assign n23 = x9 ^ x7 ;
+  assign n24 = ~n22 & ~n23 ;
+  assign n25 = ~n15 & ~n18 ;
+  assign n26 = n25 & ~n21 ;
+  assign y0 = n26 & ~n24 ;
+endmodule
+"""
+
+
+def _truth_table(function):
+    return str(function.truth_table(output_bit=0))
+
+
+def test_direct_network_matches_expression():
+    """Test that the directly built XAG computes the same predicate as the parsed expression."""
+    bf = vcgc.BooleanFunction()
+    network = make_network([(1, 2), (2, 3), (1, 3), (3, 4)], num_vertices=4, colors=3)
+    direct = bf.create_multi_bit_function(network)
+    parsed = bf.create_multi_bit_function(network, from_expression=True)
+    assert direct.num_input_bits() == parsed.num_input_bits() == 8
+    assert _truth_table(direct) == _truth_table(parsed)
+
+
+def test_reduction_modes_are_equivalent():
+    """Test that every AND reduction mode computes the same predicate."""
+    bf = vcgc.BooleanFunction()
+    network = make_network([(1, 2), (2, 3), (1, 3), (3, 4), (4, 5)], num_vertices=5, colors=2)
+    tables = set()
+    for reduction in vcgc.boolean.REDUCTION_MODES:
+        tables.add(_truth_table(bf.create_multi_bit_function(network, reduction=reduction)))
+        tables.add(_truth_table(bf.create_multi_bit_function(network, from_expression=True, reduction=reduction)))
+    assert len(tables) == 1
+
+
+def test_balanced_expression_nests_pairs():
+    """Test that the balanced expression is a pairwise tree and unknown modes are rejected."""
+    bf = vcgc.BooleanFunction()
+    network = make_network([(1, 2), (2, 3), (3, 4), (1, 4)], num_vertices=4, colors=2)
+    expression, _ = bf.generate_coloring_expression(network)
+    assert expression == "(((v1 ^ v2) & (v1 ^ v4)) & ((v2 ^ v3) & (v3 ^ v4)))"
+    with pytest.raises(ValueError):
+        bf.generate_coloring_expression(network, reduction="flat")
+
+
+def test_precolored_vertices_become_constants():
+    """Test that pre-colored vertices get no inputs and both builders agree on the folded predicate."""
+    bf = vcgc.BooleanFunction()
+    network = vcgc.VCPNetwork()
+    network.available_colors = 3
+    network.create_graph_core(4, [(1, 2), (2, 3), (1, 3), (3, 4)], {1: 0, 4: 2}, 3)
+    assert vcgc.boolean.oracle_vertices(network) == [2, 3]
+    direct = bf.create_multi_bit_function(network)
+    parsed = bf.create_multi_bit_function(network, from_expression=True)
+    assert direct.num_input_bits() == parsed.num_input_bits() == 4
+    assert _truth_table(direct) == _truth_table(parsed)
+    assert bf.create_multi_bit_function(network, fix_colored=False).num_input_bits() == 8
+    for reduction in vcgc.boolean.REDUCTION_MODES:
+        assert _truth_table(bf.create_multi_bit_function(network, reduction=reduction)) == _truth_table(direct)
+
+
+def test_invalid_codes_are_excluded():
+    """Test that exclude_invalid forbids codes >= k and is skipped when k is a power of two."""
+    bf = vcgc.BooleanFunction()
+    network = make_network([(1, 2)], num_vertices=2, colors=3)
+    reference = BoolFunction.from_expression(
+        "((v1_0 ^ v2_0) | (v1_1 ^ v2_1)) & (~v1_0 | ~v1_1) & (~v2_0 | ~v2_1)", ["v1_0", "v1_1", "v2_0", "v2_1"])
+    direct = bf.create_multi_bit_function(network, exclude_invalid=True)
+    parsed = bf.create_multi_bit_function(network, from_expression=True, exclude_invalid=True)
+    assert _truth_table(direct) == _truth_table(parsed) == _truth_table(reference)
+    assert _truth_table(direct) != _truth_table(bf.create_multi_bit_function(network))
+    network = make_network([(1, 2)], num_vertices=2, colors=4)
+    assert _truth_table(bf.create_multi_bit_function(network, exclude_invalid=True)) == \
+        _truth_table(bf.create_multi_bit_function(network))
+
+
+def test_break_symmetry_fixes_a_clique():
+    """Test that a clique is pre-colored once and its vertices leave the oracle inputs."""
+    bf = vcgc.BooleanFunction()
+    network = make_network([(1, 2), (2, 3), (1, 3), (3, 4)], num_vertices=4, colors=3)
+    function = bf.create_multi_bit_function(network, break_symmetry=True)
+    assert sorted(network.colored_vertices) == [1, 2, 3]
+    assert sorted(network.colored_vertices.values()) == [0, 1, 2]
+    assert function.num_input_bits() == 2
+    assert bf.fix_clique_colors(network) == {}
+
+
+def test_wrapped_logic_network_round_trips():
+    """Test that the BoolFunction wrapped around a LogicNetwork serves tweedledum's accessors and synthesis."""
+    network = make_network([(1, 2), (2, 3), (1, 3), (3, 4)], num_vertices=4, colors=3, colored={4: 1})
+    function = vcgc.BooleanFunction().create_multi_bit_function(network)
+    logic_network = function.logic_network()
+    assert logic_network.num_pis() == function.num_input_bits() == 6
+    assert logic_network.num_pos() == 1
+    circuit = vcgc.Synthesizer(function).synthesize_with_xag()
+    assert check_oracle(network, circuit).passed
+
+
+def test_custom_mapping_lists_the_oracle_inputs(tmp_path):
+    """Test that the mapping file has the oracle's inputs when colors are fixed and k is a power of two."""
+    network = make_network([(1, 2), (2, 3), (1, 3), (3, 4)], num_vertices=4, colors=4, colored={4: 1})
+    filename = str(tmp_path / "oracle.v")
+    vcgc.BooleanFunction().write_verilog_with_custom_mapping(network, filename)
+    mapping = (tmp_path / "oracle_mapping.txt").read_text()
+    assert "v3_1 -> x5\n" in mapping and "v4_" not in mapping and "v1_2" not in mapping
+    assert "Total inputs: 6\n" in mapping and "Bits per color: 2\n" in mapping
+
+
+def test_manual_verilog_keeps_the_chained_output(tmp_path):
+    """Test that the linear manual Verilog is byte-identical to the original and balanced differs."""
+    network = make_network([(1, 2), (1, 3), (2, 3), (3, 4)], num_vertices=4, colors=3)
+    bf = vcgc.BooleanFunction()
+    bf.create_manual_verilog(network, str(tmp_path / "linear.v"))
+    assert (tmp_path / "linear.v").read_text() == MANUAL_VERILOG
+    bf.create_manual_verilog(network, str(tmp_path / "balanced.v"), reduction="balanced")
+    balanced = (tmp_path / "balanced.v").read_text()
+    assert "assign n26 = ~n21 & ~n24 ;" in balanced and "assign y0 = n25 & n26 ;" in balanced
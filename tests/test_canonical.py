@@ -0,0 +1,36 @@
+# Test module for vcgc.canonical
+"""
+Tests for canonical labelling
+"""
+import vcgc
+from .helpers import make_network
+
+
+def test_relabeled_graphs_share_a_canonical_form():
+    """Test that relabeled copies get the same canonical network and digest."""
+    edges = [(1, 2), (2, 3), (3, 4), (4, 1), (1, 5)]
+    relabel = {1: 3, 2: 5, 3: 1, 4: 2, 5: 4}
+    first = make_network(edges, 5, colored={5: 1}).canonical_form()
+    second = make_network([(relabel[u], relabel[v]) for u, v in edges], 5, colored={4: 1}).canonical_form()
+    assert first.certified and second.certified
+    assert first.digest == second.digest
+    assert first.network.core.edges.tolist() == second.network.core.edges.tolist()
+    assert first.network.colored_vertices == second.network.colored_vertices
+
+
+def test_canonical_form_separates_non_isomorphic_graphs():
+    """Test that colors, available colors and structure all change the digest."""
+    path = make_network([(1, 2), (2, 3)], 3).canonical_form()
+    assert path.digest != make_network([(1, 2), (2, 3), (1, 3)], 3).canonical_form().digest
+    assert path.digest != make_network([(1, 2), (2, 3)], 3, colored={2: 0}).canonical_form().digest
+    assert path.digest != make_network([(1, 2), (2, 3)], 3, colors=4).canonical_form().digest
+
+
+def test_colorings_map_back_to_original_vertices():
+    """Test that a canonical coloring maps back to a proper coloring of the input."""
+    network = make_network([(1, 4), (4, 2), (2, 3)], 4, colors=2)
+    form = network.canonical_form()
+    coloring = form.to_original(vcgc.classical.find_coloring(form.network))
+    assert sorted(coloring) == [1, 2, 3, 4]
+    assert all(coloring[u] != coloring[v] for u, v in network.core.edges.tolist())
+    assert form.from_original(coloring) == {v: coloring[int(form.vertices[v - 1])] for v in range(1, 5)}
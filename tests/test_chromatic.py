@@ -0,0 +1,76 @@
+# Test module for vcgc.chromatic
+"""
+Tests for the chromatic number search
+"""
+import networkx as nx
+import vcgc
+from vcgc.chromatic import ChromaticSearch
+from vcgc.classical import find_coloring
+from .helpers import make_network
+
+
+def _groetzsch():
+    # The Mycielskian of C5 (myciel3): triangle-free with chromatic number 4
+    graph = nx.mycielski_graph(4)
+    return make_network([(u + 1, v + 1) for u, v in graph.edges()], graph.number_of_nodes())
+
+
+def test_search_stops_when_the_bounds_meet():
+    """Test that k rises from the clique bound until it meets the DSATUR bound."""
+    network = _groetzsch()
+    search = ChromaticSearch(network)
+    assert (search.lower, search.upper) == (2, 4)
+    chromatic, coloring = search.search()
+    assert chromatic == 4 and max(coloring.values()) == 3
+    conflicts, _ = network.verify_colorings([coloring[v] for v in range(1, 12)])
+    assert conflicts[0] == 0
+    # Both k below the bound have no coloring, so no circuit was built
+    assert [(entry["k"], entry["exact"], entry["found"]) for entry in search.history] == [(2, True, False),
+                                                                                         (3, True, False)]
+    assert all("qubits" not in entry for entry in search.history)
+
+    # The bounds of a clique already meet
+    assert ChromaticSearch(make_network([(1, 2), (2, 3), (1, 3)], 3)).search()[0] == 3
+
+
+def test_components_are_reused_within_a_bit_width():
+    """Test that k = 3 and k = 4 share the oracle, and with exclude_invalid the state preparation."""
+    network = _groetzsch()
+    search = ChromaticSearch(network)
+    three = search.solver(3)
+    assert search.build(three) == []
+    four = search.solver(4)
+    assert search.build(four) == ["oracle"]
+    assert four.oracle is three.oracle
+    assert find_coloring(four.network) is not None
+
+    fresh = vcgc.GroverSolver(search.network_for(4))
+    fresh.build()
+    assert fresh.oracle == four.oracle and fresh.circuit.num_qubits == four.circuit.num_qubits
+
+    search = ChromaticSearch(network, exclude_invalid=True)
+    search.build(search.solver(3))
+    assert search.build(search.solver(4)) == ["usp", "diffusion_operator"]
+
+
+def test_only_exact_counts_decide_a_k(monkeypatch):
+    """Test that estimated zero counts are searched and known colorings are not given up."""
+    monkeypatch.setattr(vcgc.simulation, "num_colorings", lambda network, seed=None: (0.0, False))
+    search = ChromaticSearch(_groetzsch())
+    assert search.search(solve=lambda solver: find_coloring(solver.network))[0] == 4
+    assert [entry["k"] for entry in search.history if "qubits" in entry] == [2, 3]
+    monkeypatch.undo()
+
+    # A solver that never finds anything still keeps a k with colorings
+    search = ChromaticSearch(_groetzsch())
+    search.upper = 5
+    assert search.search(solve=lambda solver: None)[0] == 4
+    assert search.history[-1]["fallback"] and search.history[-1]["found"]
+
+
+def test_unsimulable_k_stays_undecided():
+    """Test that a circuit beyond the simulator stops the search instead of raising."""
+    search = ChromaticSearch(_groetzsch())
+    search.upper = 5
+    assert search.search()[0] == 5
+    assert search.lower == 4 and "undecided" in search.history[-1]
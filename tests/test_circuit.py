@@ -0,0 +1,65 @@
+# Test module for vcgc.circuit
+"""
+Tests for the Grover circuit assembly
+"""
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit.quantum_info import Operator, Statevector
+from vcgc.circuit import (optimal_iterations, assemble_grover_circuit, glue_grover_circuit,
+                          generate_grover_diffusion, expanded_size, diffusion_depths, uniform_superposition_qiskit,
+                          MCX_MODES)
+
+
+def _oracle(num_data_qubits):
+    # Marks |11...1> by flipping the output qubit
+    oracle = QuantumCircuit(num_data_qubits + 1)
+    oracle.mcx(list(range(num_data_qubits)), num_data_qubits)
+    return oracle
+
+
+def test_optimal_iterations():
+    """Test the iteration counts of known cases."""
+    assert optimal_iterations(4, 1) == 1  # one iteration finds 1 of 4 with certainty
+    assert optimal_iterations(1 << 10, 1) == 25
+    assert optimal_iterations(8, 0) == 0
+    assert optimal_iterations(8, 6) == 0
+
+
+def test_assembly_shares_oracle_and_matches_single_round():
+    """Test that rounds reuse one oracle gate and one round equals glue_grover_circuit."""
+    usp = QuantumCircuit(1)
+    usp.h(0)
+    oracle, diffusion = _oracle(3), generate_grover_diffusion(3)
+
+    circuit = assemble_grover_circuit(usp, oracle, diffusion, 3, 1, num_states=8, num_solutions=1)
+    oracles = [instruction.operation for instruction in circuit.data if instruction.operation.name == "oracle"]
+    assert len(oracles) == optimal_iterations(8, 1) == 2
+    assert oracles[0] is oracles[1]
+    expanded = circuit.decompose(gates_to_decompose=["oracle", "grover_diffusion"])
+    assert expanded_size(circuit) == (expanded.depth(), len(expanded))
+
+    single = assemble_grover_circuit(usp, oracle, diffusion, 3, 1, iterations=1)
+    expanded = single.decompose(gates_to_decompose=["oracle", "grover_diffusion"])
+    assert expanded == glue_grover_circuit(usp, oracle, diffusion, 3, 1)
+
+
+def test_diffusion_modes_are_equivalent():
+    """Test that every MCX decomposition gives the same reflection with its ancillas in |0>."""
+    reference = Operator(generate_grover_diffusion(4)).data
+    for mode in MCX_MODES:
+        diffusion = generate_grover_diffusion(4, mcx_mode=mode)
+        unitary = Operator(diffusion).data[:16, :16]  # ancillas are the high qubits
+        assert np.allclose(unitary, unitary[0, 0] / reference[0, 0] * reference), mode
+    assert set(diffusion_depths(4)) == set(MCX_MODES)
+
+
+def test_diffusion_reflects_about_prepared_state():
+    """Test that passing the state preparation reflects about the uniform superposition over 3 codes."""
+    usp = uniform_superposition_qiskit(3).decompose()
+    prep = QuantumCircuit(4)
+    prep.compose(usp, qubits=[0, 1], inplace=True)
+    prep.compose(usp, qubits=[2, 3], inplace=True)
+    psi = Statevector(prep).data
+    reflection = np.eye(16) - 2 * np.outer(psi, psi.conj())
+    diffusion = generate_grover_diffusion(4, usp=usp, num_encode_qubits=2)
+    assert np.allclose(Operator(diffusion).data, reflection)
@@ -0,0 +1,66 @@
+# Test module for vcgc.classical
+"""
+Tests for the classical coloring routines
+"""
+import itertools
+import random
+import pytest
+from vcgc.classical import (expected_num_colorings, count_colorings, estimate_colorings, num_colorings, dsatur,
+                            tabu_search)
+from .helpers import make_network
+
+
+def _brute_force_count(network):
+    core = network.core
+    free = core.free_vertices().tolist()
+    count = 0
+    for assignment in itertools.product(range(network.available_colors), repeat=len(free)):
+        colors = core.color_idx.tolist()
+        for vertex, color in zip(free, assignment):
+            colors[vertex] = color
+        count += all(colors[u] != colors[v] for u, v in core.edges.tolist())
+    return count
+
+
+def test_count_matches_brute_force():
+    """Test exact counts with pre-colored vertices on random small graphs."""
+    rng = random.Random(3)
+    for _ in range(100):
+        n, k = rng.randint(1, 7), rng.randint(2, 4)
+        edges = [(u, v) for u in range(1, n + 1) for v in range(u + 1, n + 1) if rng.random() < 0.4]
+        colored = {v: rng.randrange(k) for v in range(1, n + 1) if rng.random() < 0.2}
+        network = make_network(edges, n, colors=k, colored=colored)
+        assert count_colorings(network) == _brute_force_count(network)
+
+
+def test_wide_graphs_fall_back_to_sampling():
+    """Test that a component too wide for the table limit is estimated instead."""
+    network = make_network([(u, v) for u in range(1, 7) for v in range(u + 1, 7)], 6, colors=6)
+    assert count_colorings(network) == 720
+    assert count_colorings(network, max_table_size=100) is None
+    count, exact = num_colorings(network, max_table_size=100, seed=0)
+    assert not exact
+    # Every sample of a clique has weight 6!, so the estimate is exact up to rounding
+    assert count == estimate_colorings(network, seed=0) == pytest.approx(720)
+
+
+def test_expected_colorings():
+    """Test that the estimate is exact on a path and zero for clashing pre-colors."""
+    assert expected_num_colorings(make_network([(1, 2), (2, 3)], 3)) == 3 * 2 * 2
+    assert expected_num_colorings(make_network([(1, 2)], 2, colored={1: 0, 2: 0})) == 0
+
+
+def test_tabu_search_repairs_dsatur_and_keeps_pre_colored():
+    """Test that the heuristics keep pre-assigned colors and end without conflicts when possible."""
+    rng = random.Random(5)
+    for _ in range(50):
+        n, k = 12, 3
+        planted = [rng.randrange(k) for _ in range(n)]
+        edges = [(u, v) for u in range(1, n + 1) for v in range(u + 1, n + 1)
+                 if planted[u - 1] != planted[v - 1] and rng.random() < 0.5]
+        network = make_network(edges, n, colors=k, colored={1: planted[0]})
+        start = dsatur(network)
+        coloring = tabu_search(network, start, seed=0)
+        assert start[1] == coloring[1] == planted[0]
+        conflicts, _ = network.verify_colorings([coloring[v] for v in range(1, n + 1)])
+        assert conflicts[0] == 0
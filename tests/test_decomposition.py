@@ -0,0 +1,48 @@
+# Test module for vcgc.decomposition
+"""
+Tests for the connected-component decomposition
+"""
+import vcgc
+from .helpers import make_network
+
+
+def _is_proper(network, coloring):
+    return all(coloring[u] != coloring[v] for u, v in network.core.edges.tolist())
+
+
+def test_components_are_relabeled_subnetworks():
+    """Test that components keep their edges and pre-assigned colors under relabeling."""
+    network = make_network([(1, 4), (4, 6), (2, 3)], num_vertices=7, colored={6: 2})
+    components = network.components()
+    assert [vertices.tolist() for _, vertices in components] == [[1, 4, 6], [2, 3]]
+    first, _ = components[0]
+    assert first.core.edges.tolist() == [[1, 2], [2, 3]]
+    assert first.colored_vertices == {3: 2}
+    assert len(network.components(include_isolated=True)) == 4
+
+
+def test_isomorphic_components_share_a_class():
+    """Test that isomorphic components are solved once and merged into a proper coloring."""
+    network = make_network([(1, 2), (2, 3), (1, 3), (4, 5), (5, 6), (4, 6), (7, 8)], num_vertices=9)
+    decomposition = vcgc.ComponentDecomposition(network)
+    assert decomposition.classes == [0, 0, 1]
+    calls = []
+
+    def solver(subnetwork):
+        calls.append(subnetwork)
+        return vcgc.classical.find_coloring(subnetwork)
+
+    coloring = decomposition.solve(solver)
+    assert len(calls) == 2
+    assert sorted(coloring) == list(range(1, 10))
+    assert _is_proper(network, coloring)
+
+
+def test_pre_colors_split_classes_and_are_kept():
+    """Test that pre-colored components only match components with the same colors."""
+    network = make_network([(1, 2), (3, 4)], num_vertices=4, colors=2, colored={1: 1})
+    decomposition = vcgc.ComponentDecomposition(network)
+    assert decomposition.num_classes == 2
+    coloring = decomposition.solve()
+    assert coloring[1] == 1 and _is_proper(network, coloring)
+    assert vcgc.ComponentDecomposition(make_network([(1, 2), (2, 3), (1, 3)], 3, colors=2)).solve() is None
@@ -0,0 +1,69 @@
+# Test module for vcgc.dimacs
+"""
+Tests for the DIMACS reader and writer
+"""
+import numpy as np
+import pytest
+from vcgc.dimacs import read_dimacs, read_dimacs_cached, write_dimacs
+
+
+def _write(tmp_path, text):
+    path = tmp_path / "graph.col"
+    path.write_text(text)
+    return str(path)
+
+
+def test_read_mixed_file(tmp_path):
+    """Test that header, colored vertices, edges and colors are parsed."""
+    path = _write(tmp_path, "c comment\np edge 4 3\nn 1 0\ne 1 2\ne 2 3\nc middle\ne 3 4\nx colors 3\n")
+    num_vertices, num_edges, colors, edges, colored = read_dimacs(path)
+    assert (num_vertices, num_edges, colors) == (4, 3, 3)
+    assert edges.dtype == np.int32
+    assert edges.tolist() == [[1, 2], [2, 3], [3, 4]]
+    assert colored == {1: 0}
+
+
+def test_write_round_trip(tmp_path):
+    """Test that a written problem reads back unchanged."""
+    path = str(tmp_path / "written.col")
+    write_dimacs(path, 4, [(1, 2), (2, 3), (3, 4)], 3, colored_vertices={2: 1}, comments=("generated",))
+    num_vertices, num_edges, colors, edges, colored = read_dimacs(path)
+    assert (num_vertices, num_edges, colors) == (4, 3, 3)
+    assert edges.tolist() == [[1, 2], [2, 3], [3, 4]]
+    assert colored == {2: 1}
+
+
+def test_read_edges_exceeding_header(tmp_path):
+    """Test that more edges than announced in the header are still read."""
+    path = _write(tmp_path, "p edge 3 1\ne 1 2\ne 2 3\ne 1 3")
+    _, num_edges, _, edges, _ = read_dimacs(path)
+    assert num_edges == 1
+    assert edges.tolist() == [[1, 2], [2, 3], [1, 3]]
+
+
+def test_read_indented_lines(tmp_path):
+    """Test that lines with leading whitespace are read like the others."""
+    path = _write(tmp_path, "p edge 3 2\n e 1 2\ne 2 3\n\tn 1 0\n  x colors 3\n")
+    _, _, colors, edges, colored = read_dimacs(path)
+    assert edges.tolist() == [[1, 2], [2, 3]]
+    assert colors == 3 and colored == {1: 0}
+
+
+def test_read_rejects_unknown_lines(tmp_path):
+    """Test that unknown descriptors raise instead of being read as edges."""
+    path = _write(tmp_path, "p edge 2 1\nq 1 2\n")
+    with pytest.raises(ValueError):
+        read_dimacs(path)
+
+
+def test_cached_read_matches_text_read(tmp_path):
+    """Test that the compiled cache round-trips and exposes a CSR adjacency."""
+    path = _write(tmp_path, "p edge 3 2\nn 3 1\ne 1 2\ne 2 3\nx colors 2\n")
+    cache_dir = str(tmp_path / "cache")
+    for _ in range(2):  # compile, then load from the cache
+        num_vertices, num_edges, colors, edges, colored, indptr, indices = read_dimacs_cached(path, cache_dir)
+        assert (num_vertices, num_edges, colors) == (3, 2, 2)
+        assert edges.tolist() == [[1, 2], [2, 3]]
+        assert colored == {3: 1}
+        assert indices[indptr[2]:indptr[3]].tolist() == [1, 3]
+    assert len(list((tmp_path / "cache").iterdir())) == 1
@@ -0,0 +1,43 @@
+# Test module for vcgc.hybrid
+"""
+Tests for the hybrid classical-quantum solve
+"""
+from functools import partial
+import vcgc
+from vcgc.hybrid import HybridSolver
+from vcgc.classical import find_coloring
+from vcgc.simulation import GroverSolver, grover_solve
+from .helpers import make_network
+
+
+# 3-colorable, but DSATUR alone leaves the edge (2, 6) conflicting
+EDGES = [(1, 3), (2, 3), (2, 6), (2, 8), (3, 7), (4, 5), (4, 6), (4, 7), (5, 6), (5, 7), (7, 8)]
+
+
+def test_residual_problem_fixes_everything_but_the_core():
+    """Test that only the conflicting vertices stay free in the residual problem."""
+    hybrid = HybridSolver(make_network(EDGES, 8), tabu_iterations=0)
+    assert hybrid.conflicts == 1 and hybrid.hard_core().tolist() == [2, 6]
+    subnetwork, vertices = hybrid.residual_problem()
+    assert vertices.tolist() == [2, 3, 4, 5, 6, 8]
+    assert vertices[subnetwork.core.free_vertices() - 1].tolist() == [2, 6]
+    assert hybrid.hard_core(radius=1).tolist() == [2, 3, 4, 5, 6, 8]
+
+
+def test_grover_solves_the_residual_core():
+    """Test that the hybrid coloring is proper and its circuit only covers the core."""
+    network = make_network(EDGES, 8)
+    hybrid = HybridSolver(network, tabu_iterations=0)
+    coloring = hybrid.solve(solver=partial(grover_solve, seed=1))
+    conflicts, _ = network.verify_colorings([coloring[v] for v in range(1, 9)])
+    assert conflicts[0] == 0
+    residual, _ = hybrid.residual
+    assert GroverSolver(residual).num_data_qubits < GroverSolver(network).num_data_qubits
+
+
+def test_unsolvable_instances_return_none():
+    """Test that the core grows until it stops and then gives up."""
+    k4 = make_network([(1, 2), (1, 3), (1, 4), (2, 3), (2, 4), (3, 4)], 4)
+    hybrid = HybridSolver(k4, seed=0)
+    assert hybrid.conflicts > 0
+    assert hybrid.solve(solver=find_coloring) is None
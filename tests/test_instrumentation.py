@@ -0,0 +1,36 @@
+# Test module for vcgc.instrumentation
+"""
+Tests for the per-stage timing and memory records
+"""
+from vcgc.instrumentation import profile, stage
+from vcgc.circuit import generate_grover_diffusion
+
+
+def test_stages_are_recorded_only_while_profiling():
+    """Test that stages nest, aggregate by name and are ignored outside a profile."""
+    with stage("outside"):
+        pass
+    with profile() as prof:
+        with stage("outer"):
+            for _ in range(2):
+                generate_grover_diffusion(3)
+    summary = prof.summary()
+    assert set(summary) == {"outer", "grover_diffusion"}
+    assert summary["grover_diffusion"]["calls"] == 2
+    assert summary["outer"]["wall_s"] >= summary["grover_diffusion"]["wall_s"]
+    assert summary["outer"]["peak_traced_kb"] is None
+
+
+def test_traced_peaks_cover_nested_stages():
+    """Test that an enclosing stage's allocation peak includes its nested stages."""
+    with profile(trace_memory=True) as prof:
+        with stage("outer"):
+            with stage("inner"):
+                block = bytearray(4 << 20)
+                del block
+            with stage("after"):
+                pass
+    summary = prof.summary()
+    assert summary["inner"]["peak_traced_kb"] >= 4096
+    assert summary["outer"]["peak_traced_kb"] >= 4096
+    assert summary["after"]["peak_traced_kb"] < 4096
@@ -0,0 +1,94 @@
+# Test module for vcgc.network
+"""
+Tests for VCPNetwork and its array-backed graph core
+"""
+import numpy as np
+import pytest
+from .helpers import make_network
+
+
+def test_core_canonicalizes_edges():
+    """Test that duplicate and reversed edges collapse to one canonical edge."""
+    network = make_network([(2, 1), (1, 2), (3, 4), (2, 3)], num_vertices=4)
+    assert network.core.edges.tolist() == [[1, 2], [2, 3], [3, 4]]
+    assert network.core.degrees[1:].tolist() == [1, 2, 2, 1]
+    assert network.core.neighbors(2).tolist() == [1, 3]
+
+
+def test_graph_is_built_lazily():
+    """Test that the networkx view is only built on access and mirrors the core."""
+    network = make_network([(1, 2), (2, 3)], num_vertices=4, colored={3: 1, 4: 7})
+    assert network._graph is None
+    graph = network.graph
+    assert sorted(graph.edges()) == [(1, 2), (2, 3)]
+    assert graph.nodes[3] == {'color': 'green', 'color_idx': 1}
+    assert graph.nodes[4]['color_idx'] == -1
+    assert network.graph is graph
+    network.create_graph_core(2, np.array([[1, 2]]), {}, 3)
+    assert network.graph is not graph
+
+
+def test_free_vertices_skip_colored_and_isolated():
+    """Test that free vertices exclude pre-colored and isolated vertices."""
+    network = make_network([(1, 2), (2, 3)], colored={2: 0}, num_vertices=4)
+    assert network.core.used_vertices().tolist() == [1, 2, 3]
+    assert network.core.free_vertices().tolist() == [1, 3]
+
+
+def test_verify_colorings_counts_conflicts_per_row():
+    """Test that a batch of colorings gets its conflict counts and first conflicting edge."""
+    network = make_network([(1, 2), (2, 3), (3, 4), (1, 3)], num_vertices=4)
+    colors = np.array([[0, 1, 2, 0], [0, 1, 1, 1], [2, 2, 2, 2]])
+    conflicts, first = network.verify_colorings(colors, max_elements=4)
+    assert conflicts.tolist() == [0, 2, 4]
+    assert first.tolist() == [[-1, -1], [2, 3], [1, 2]]
+
+    single, _ = network.verify_colorings([0, 0, 1, 2])
+    assert single.tolist() == [1]
+    rng = np.random.default_rng(0)
+    batch = rng.integers(0, 3, size=(1000, 4))
+    expected = [sum(row[u - 1] == row[v - 1] for u, v in network.core.edges.tolist()) for row in batch]
+    assert network.verify_colorings(batch)[0].tolist() == expected
+
+
+def test_reduce_peels_and_reconstructs():
+    """Test that low-degree and dominated vertices are removed and recolored properly."""
+    # A triangle 1-2-3 with a pendant path 3-4-5 and vertex 6 dominated by 1
+    network = make_network([(1, 2), (2, 3), (1, 3), (3, 4), (4, 5), (2, 6), (3, 6)], num_vertices=6)
+    reduction = network.reduce()
+    assert reduction.reduced.num_vertices == 0
+    coloring = reduction.reconstruct({})
+    assert all(coloring[u] != coloring[v] for u, v in network.core.edges.tolist())
+
+    network = make_network([(1, 2), (2, 3), (1, 3), (3, 4), (2, 6), (3, 6)], num_vertices=6)
+    reduction = network.reduce(dominated=False)
+    assert sorted(reduction.removed) == [1, 2, 3, 4, 5, 6]
+
+
+def test_reduce_keeps_pre_colored_and_hard_cores():
+    """Test that K4 with 3 colors is kept while pre-colored vertices are never removed."""
+    k4 = [(1, 2), (1, 3), (1, 4), (2, 3), (2, 4), (3, 4)]
+    network = make_network(k4 + [(4, 5)], colored={5: 0}, num_vertices=5)
+    reduction = network.reduce()
+    assert reduction.vertices.tolist() == [1, 2, 3, 4, 5]
+    assert reduction.reduced.colored_vertices == {5: 0}
+
+
+def test_reduce_uses_the_given_number_of_colors():
+    """Test that the reduced network gets the k colors it was reduced for."""
+    k4 = [(1, 2), (1, 3), (1, 4), (2, 3), (2, 4), (3, 4)]
+    network = make_network(k4 + [(4, 5)], num_vertices=5, colored={5: 1})
+    reduction = network.reduce(k=2)
+    assert reduction.reduced.available_colors == 2 and len(reduction.reduced.color_map) == 2
+    assert reduction.reduced.colored_vertices == {5: 1} and reduction.reduced.core.color_idx[5] == 1
+    assert network.reduce(k=4).reduced.available_colors == 4
+    with pytest.raises(ValueError):
+        network.reduce(k=1)
+
+
+def test_greedy_clique_is_maximal():
+    """Test that the greedy clique starts at the highest degree vertex and cannot be extended."""
+    network = make_network([(1, 2), (1, 3), (2, 3), (3, 4), (2, 4), (1, 4), (4, 5)], num_vertices=5)
+    assert network.core.greedy_clique()[0] == 4
+    assert sorted(network.core.greedy_clique()) == [1, 2, 3, 4]
+    assert make_network([], num_vertices=2).core.greedy_clique() == [1]
@@ -0,0 +1,42 @@
+# Test module for vcgc.simulation
+"""
+Tests for the simulated Grover search and the bulk decoding of its samples
+"""
+import numpy as np
+from vcgc.simulation import GroverSolver, decode_counts, valid_colorings, grover_solve
+from .helpers import make_network
+
+
+def test_decode_counts_follows_the_oracle_input_layout():
+    """Test that bit b of the i-th oracle vertex is qubit i * bits + b, with qubit 0 last."""
+    # Vertex 1 is pre-colored and vertex 5 is isolated, so the qubits belong to 2, 3, 4
+    network = make_network([(1, 2), (2, 3), (3, 4)], num_vertices=5, colors=3, colored={1: 2})
+    # Qubits 5..0 read 10 01 00 -> vertex 4 code 2, vertex 3 code 1, vertex 2 code 0
+    counts = {"100100": 3, "0010 10": 1}
+    colors, frequencies = decode_counts(counts, network)
+    assert colors.tolist() == [[2, 0, 1, 2, 0], [2, 2, 2, 0, 0]]
+    assert frequencies.tolist() == [3, 1]
+    assert valid_colorings(network, colors).tolist() == [True, False]
+
+    shots, ones = decode_counts(counts, network, per_shot=True)
+    assert shots.shape == (4, 5) and ones.sum() == 4
+
+
+def test_valid_colorings_rejects_unused_codes():
+    """Test that codes past available_colors fail the check even without conflicts."""
+    network = make_network([(1, 2)], num_vertices=2, colors=3)
+    assert valid_colorings(network, np.array([[0, 3], [1, 2]])).tolist() == [False, True]
+
+
+def test_solver_returns_verified_colorings():
+    """Test that the simulated search amplifies valid colorings and returns one of them."""
+    network = make_network([(1, 2), (2, 3), (1, 3)], num_vertices=3, colors=3, colored={1: 0})
+    solver = GroverSolver(network)
+    colors, frequencies, valid = solver.sample(shots=1000, seed=7)
+    assert solver.iterations == 1
+    # 2 of the 9 states are valid before amplification
+    assert frequencies[valid].sum() > 900
+    coloring = grover_solve(network, seed=7)
+    assert coloring[1] == 0
+    assert all(coloring[u] != coloring[v] for u, v in network.core.edges.tolist())
+    assert grover_solve(make_network([(1, 2)], num_vertices=2, colors=2, colored={1: 0, 2: 0})) is None
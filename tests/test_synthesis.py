@@ -0,0 +1,57 @@
+# Test module for vcgc.synthesis
+"""
+Tests for the synthesizer and its persistent cache
+"""
+import os
+from qiskit import QuantumCircuit
+import vcgc
+from vcgc.synthesis import SynthesisCache
+
+
+def _circuit(num_qubits):
+    circuit = QuantumCircuit(num_qubits)
+    circuit.h(0)
+    circuit.mcx(list(range(num_qubits - 1)), num_qubits - 1)
+    return circuit
+
+
+def test_cache_round_trip_and_eviction(tmp_path):
+    """Test that entries round-trip and the least recently used ones are evicted first."""
+    cache = SynthesisCache(str(tmp_path))
+    cache.put("a", _circuit(3))
+    cache.put("b", _circuit(4))
+    assert cache.get("a") == _circuit(3)
+    assert cache.get("missing") is None
+
+    os.utime(tmp_path / "b.qpy", (0, 0))  # b is now the least recently used
+    cache.max_bytes = os.path.getsize(tmp_path / "a.qpy")
+    cache.evict()
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+
+def test_cache_drops_unreadable_entries(tmp_path):
+    """Test that corrupt and truncated entries are misses and get deleted."""
+    cache = SynthesisCache(str(tmp_path))
+    cache.put("a", _circuit(3))
+    data = (tmp_path / "a.qpy").read_bytes()
+    (tmp_path / "a.qpy").write_bytes(data[:len(data) // 2])
+    (tmp_path / "b.qpy").write_bytes(b"not a qpy file")
+    assert cache.get("a") is None and cache.get("b") is None
+    assert not (tmp_path / "a.qpy").exists() and not (tmp_path / "b.qpy").exists()
+
+
+def test_synthesizer_reuses_cached_circuit(tmp_path):
+    """Test that a second synthesis of the same network is served from the cache."""
+    network = vcgc.VCPNetwork()
+    network.available_colors = 3
+    network.create_graph_core(3, [(1, 2), (2, 3)], {}, 3)
+    function = vcgc.BooleanFunction().create_multi_bit_function(network)
+    cache = SynthesisCache(str(tmp_path))
+
+    first = vcgc.Synthesizer(function, cache=cache)
+    circuit = first.synthesize_with_xag()
+    assert first.tweedledum_circuit is not None
+    second = vcgc.Synthesizer(function, cache=cache)
+    assert second.synthesize_with_xag() == circuit
+    assert second.tweedledum_circuit is None
@@ -0,0 +1,88 @@
+# Test module for vcgc.verification
+"""
+Tests for the bit-parallel oracle checker
+"""
+import numpy as np
+import vcgc
+from vcgc.verification import check_oracle, pack_words, unpack_words, simulate_verilog
+from .helpers import make_network
+
+# K3 with 3 colors as tweedledum's write_verilog prints it, all vertices as inputs
+K3_VERILOG = """module top( x0 , x1 , x2 , x3 , x4 , x5 , y0 );
+  input x0 , x1 , x2 , x3 , x4 , x5 ;
+  output y0 ;
+  wire n7 , n8 , n9 , n10 , n11 , n12 , n13 , n14 , n15 , n16 , n17 ;
+  assign n7 = x2 ^ x0 ;
+  assign n8 = x3 ^ x1 ;
+  assign n9 = ~n7 & ~n8 ;
+  assign n10 = x4 ^ x0 ;
+  assign n11 = x5 ^ x1 ;
+  assign n12 = ~n10 & ~n11 ;
+  assign n13 = ~n9 & ~n12 ;
+  assign n14 = x4 ^ x2 ;
+  assign n15 = x5 ^ x3 ;
+  assign n16 = ~n14 & ~n15 ;
+  assign n17 = n13 & ~n16 ;
+  assign y0 = n17 ;
+endmodule
+"""
+
+
+def test_words_hold_64_assignments():
+    """Test that packing and unpacking round-trips and that operators act per assignment."""
+    bits = np.random.default_rng(0).integers(0, 2, size=(100, 2), dtype=np.uint8)
+    words = pack_words(bits)
+    assert words.shape == (2, 2) and words.dtype == np.uint64
+    assert unpack_words(words[0], 100).tolist() == bits[:, 0].astype(bool).tolist()
+    verilog = "module top( a , b , y0 );\n input a , b ;\n output y0 ;\n assign y0 = ~( a | 1'b0 ) ^ a & b ;\nendmodule"
+    expected = (1 - (bits[:, 0] | 0)) ^ (bits[:, 0] & bits[:, 1])
+    assert unpack_words(simulate_verilog(verilog, words), 100).tolist() == expected.astype(bool).tolist()
+
+
+def test_synthesized_oracle_matches_the_predicate():
+    """Test that the XAG circuit passes and that dropping a gate is caught."""
+    network = make_network([(1, 2), (2, 3), (1, 3), (3, 4)], num_vertices=4, colors=3, colored={4: 1})
+    function = vcgc.BooleanFunction().create_multi_bit_function(network, exclude_invalid=True)
+    circuit = vcgc.Synthesizer(function).synthesize_with_xag()
+    result = check_oracle(network, circuit, exclude_invalid=True)
+    assert result.passed and result.exhaustive and result.num_assignments == 64
+
+    # The oracle rejects unused codes, so the plain predicate disagrees with it
+    assert check_oracle(network, circuit).mismatches > 0
+    broken = circuit.copy()
+    broken.data.pop(len(broken.data) // 3)
+    result = check_oracle(network, broken, exclude_invalid=True)
+    assert not result.passed and len(result.counterexample) == 6
+
+
+def test_verilog_is_checked_exhaustively_or_by_sampling():
+    """Test that Verilog text is checked and that samples include valid colorings."""
+    network = make_network([(1, 2), (2, 3), (1, 3)], num_vertices=3, colors=3, colored={1: 0})
+    assert check_oracle(network, K3_VERILOG, fix_colored=False).passed
+    constant = K3_VERILOG.replace("assign y0 = n17", "assign y0 = 1'b0")
+    # Every proper coloring with the 4 codes is a mismatch
+    assert check_oracle(network, constant, fix_colored=False).mismatches == 4 * 3 * 2
+
+    sampled = check_oracle(network, K3_VERILOG, fix_colored=False, max_exhaustive=4, samples=256, seed=0)
+    assert sampled.passed and not sampled.exhaustive and sampled.num_assignments == 256
+
+    # 24 inputs: uniform samples are almost never valid colorings of the path
+    path = make_network([(i, i + 1) for i in range(1, 12)], num_vertices=12, colors=3)
+    function = vcgc.BooleanFunction().create_multi_bit_function(path)
+    circuit = vcgc.Synthesizer(function).synthesize_with_xag()
+    assert check_oracle(path, circuit, samples=512, seed=0).passed
+    # An empty circuit never marks anything, which only the near-solution samples reveal
+    circuit.data.clear()
+    result = check_oracle(path, circuit, samples=512, seed=0)
+    assert not result.exhaustive and result.mismatches >= 100
+
+
+def test_samples_include_valid_colorings_of_unfixed_vertices():
+    """Test that pre-colored vertices as inputs still get near-solution samples."""
+    path = make_network([(i, i + 1) for i in range(1, 12)], num_vertices=12, colors=3, colored={1: 0, 12: 2})
+    function = vcgc.BooleanFunction().create_multi_bit_function(path, fix_colored=False)
+    circuit = vcgc.Synthesizer(function).synthesize_with_xag()
+    assert check_oracle(path, circuit, fix_colored=False, samples=512, seed=0).passed
+    circuit.data.clear()
+    result = check_oracle(path, circuit, fix_colored=False, samples=512, seed=0)
+    assert not result.exhaustive and result.mismatches >= 100
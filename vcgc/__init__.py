@@ -11,6 +11,10 @@ from .network import VCPNetwork
 from .boolean import BooleanFunction
 from .dimacs import read_dimacs
 from .synthesis import Synthesizer
+from .decomposition import ComponentDecomposition
+from .simulation import GroverSolver
+from .hybrid import HybridSolver
+from .chromatic import ChromaticSearch
 
 __version__ = "0.1.0"
 __author__ = "Ismael Barzani"
@@ -21,4 +25,8 @@ __all__ = [
     "BooleanFunction", 
     "read_dimacs",
     "Synthesizer",
+    "ComponentDecomposition",
+    "GroverSolver",
+    "HybridSolver",
+    "ChromaticSearch",
 ]
\ No newline at end of file
@@ -1,15 +1,198 @@
 # A module that prepares and analyzes Boolean Functions and Logic Networks
 import math
 from .network import *
-from tweedledum.classical import write_verilog
+from .instrumentation import stage
+from tweedledum.classical import write_verilog, LogicNetwork
 from tweedledum.bool_function_compiler.bool_function import BoolFunction
+from tweedledum.bool_function_compiler.bitvec import BitVec
+
+
+def _balanced_reduce(signals: list, create_gate) -> object:
+    """
+    Combine signals pairwise with a 2-input gate so the result has log depth.
+
+    Parameters:
+    -----------
+    signals : list
+        Non-empty list of tweedledum Signals
+    create_gate : callable
+        Bound LogicNetwork method such as create_and or create_or
+
+    Returns:
+    --------
+    Signal : The root of the reduction tree
+    """
+    while len(signals) > 1:
+        paired = [create_gate(a, b) for a, b in zip(signals[0::2], signals[1::2])]
+        if len(signals) % 2:
+            paired.append(signals[-1])
+        signals = paired
+    return signals[0]
+
+
+# How the per-edge constraints are joined by AND:
+#   linear   - a left-to-right chain, logic depth linear in the number of edges
+#   balanced - a pairwise tree, logic depth ceil(log2(#edges))
+#   grouped  - a balanced tree per vertex star (edges sharing a vertex), then a
+#              balanced tree over the stars
+REDUCTION_MODES = ("linear", "balanced", "grouped")
+
+
+def _reduce_terms(terms: list, combine, reduction: str, network: VCPNetwork, edge_ids: list = None):
+    """
+    AND-reduce one term per edge of network.core.edges in the given reduction mode.
+
+    Parameters:
+    -----------
+    terms : list
+        Non-empty list of terms, terms[i] belongs to network.core.edges[i]
+    combine : callable
+        Function combining two terms into their conjunction
+    reduction : str
+        One of REDUCTION_MODES
+    network : VCPNetwork
+        The network the terms were generated from (used for grouping)
+    edge_ids : list, optional
+        Edge index of every term when only some edges produced a term, e.g. after
+        folding the edges between pre-colored vertices. Defaults to all edges.
+
+    Returns:
+    --------
+    The root term of the reduction
+    """
+    if reduction not in REDUCTION_MODES:
+        raise ValueError(f"Unknown reduction mode '{reduction}', expected one of {REDUCTION_MODES}")
+    if reduction == "linear":
+        result = terms[0]
+        for term in terms[1:]:
+            result = combine(result, term)
+        return result
+    if reduction == "grouped":
+        position = {edge: i for i, edge in enumerate(range(len(terms)) if edge_ids is None else edge_ids)}
+        stars = []
+        for group in network.core.edge_groups():
+            group = [terms[position[edge]] for edge in group if edge in position]
+            if group:
+                stars.append(_balanced_reduce(group, combine))
+        return _balanced_reduce(stars, combine)
+    return _balanced_reduce(terms, combine)
+
+
+def _and_expression(constraints: list, reduction: str, network: VCPNetwork, edge_ids: list = None) -> str:
+    """Join expression constraints with & in the given reduction mode."""
+    if reduction not in REDUCTION_MODES:
+        raise ValueError(f"Unknown reduction mode '{reduction}', expected one of {REDUCTION_MODES}")
+    if len(constraints) == 0:
+        return "1"  # Always true if no edges
+    if reduction == "linear":
+        return " & ".join(constraints)
+    return _reduce_terms(constraints, lambda a, b: f"({a} & {b})", reduction, network, edge_ids)
+
+
+def _less_than_constant(bits: list, bound: int, negate, create_and, create_or):
+    """
+    Build a comparator that is true when the unsigned value of bits is below bound.
+
+    Scans from the lowest set bit of bound upwards: a set bit of bound ORs in "this
+    bit is 0", a clear bit ANDs it in, so the comparator needs at most len(bits) - 1
+    two-input gates plus negations.
+
+    Parameters:
+    -----------
+    bits : list
+        Terms for the value bits, least significant first
+    bound : int
+        Exclusive upper bound, 0 < bound < 2 ** len(bits)
+    negate, create_and, create_or : callable
+        Builders for NOT, AND and OR of terms
+
+    Returns:
+    --------
+    The root term of the comparator
+    """
+    result = None
+    for bit, term in enumerate(bits):
+        if (bound >> bit) & 1:
+            result = negate(term) if result is None else create_or(negate(term), result)
+        elif result is not None:
+            result = create_and(negate(term), result)
+    return result
+
+
+def _fixed_colors(network: VCPNetwork, fix_colored: bool) -> list:
+    """Return the pre-assigned color of every vertex (-1 if free), or all -1 when not fixing colors."""
+    if fix_colored:
+        return network.core.color_idx.tolist()
+    return [-1] * (network.core.num_vertices + 1)
+
+
+def oracle_vertices(network: VCPNetwork, fix_colored: bool = True) -> list:
+    """
+    Return the vertices that get input variables in the multi-bit coloring function.
+
+    Parameters:
+    -----------
+    network : VCPNetwork
+        The graph network containing vertices and edges
+    fix_colored : bool
+        If True, pre-colored vertices are constants and get no variables
+
+    Returns:
+    --------
+    list : Vertex IDs in input order, each one owning bits_per_color consecutive inputs
+    """
+    if fix_colored:
+        return network.core.free_vertices().tolist()
+    return network.core.used_vertices().tolist()
+
+
+def _bool_function_from_network(logic_network: LogicNetwork) -> BoolFunction:
+    """Wrap a single-output LogicNetwork the same way BoolFunction.from_verilog_file does."""
+    function = BoolFunction.__new__(BoolFunction)
+    function._logic_network = logic_network
+    function._truth_table = None
+    num_inputs = logic_network.num_pis()
+    function._parameters_signature = [(type(BitVec(1)), 1)] * num_inputs
+    function._return_signature = [(type(BitVec(1)), 1)]
+    function._num_input_bits = num_inputs
+    function._num_output_bits = 1
+    return function
+
 
 class BooleanFunction():
     def __init__(self):
         self.boolean_function = None
 
+    def fix_clique_colors(self, network: VCPNetwork) -> dict:
+        """
+        Break the color permutation symmetry by pre-coloring a clique.
+
+        In a graph without pre-assigned colors every permutation of the k colors maps
+        solutions to solutions. The vertices of a clique need pairwise distinct colors,
+        so coloring a greedy maximal clique with 0, 1, 2, ... keeps at least one
+        solution from every symmetry class. The colors are written to the network
+        through VCPNetwork.fix_colors, so the clique vertices become oracle constants
+        and drop out of the state preparation. Networks that already have pre-colored
+        vertices are left unchanged, which also makes repeated calls harmless.
+
+        Parameters:
+        -----------
+        network : VCPNetwork
+            The graph network containing vertices and edges (modified in place)
+
+        Returns:
+        --------
+        dict : The colors that were fixed, empty if the network was left unchanged
+        """
+        if (network.core.color_idx >= 0).any():
+            return {}
+        clique = network.core.greedy_clique()[:network.available_colors]
+        assignment = {vertex: color for color, vertex in enumerate(clique)}
+        network.fix_colors(assignment)
+        return assignment
+
     def print_vertex_constraints(self, network: VCPNetwork) -> None:
-        edges = list(network.graph.edges())
+        edges = network.core.edges.tolist()
         for i, e in enumerate(edges):
             if i > 0: 
                 print(' ∧ ', end='')
@@ -17,7 +200,7 @@ class BooleanFunction():
             print(f'(v{u} != v{v})', end='')
         print('\n')
 
-    def generate_coloring_expression(self, network: VCPNetwork):
+    def generate_coloring_expression(self, network: VCPNetwork, reduction: str = "balanced"):
         """
         Generate a boolean expression string for graph coloring constraints.
         
@@ -25,14 +208,16 @@ class BooleanFunction():
         -----------
         network : VCPNetwork
             The graph network containing vertices and edges
+        reduction : str
+            How the edge constraints are joined, one of REDUCTION_MODES
             
         Returns:
         --------
         str : Boolean expression string
         list : Variable order for the expression
         """
-        vertices = list(network.graph.nodes())
-        edges = list(network.graph.edges())
+        vertices = network.core.vertices().tolist()
+        edges = network.core.edges.tolist()
         
         # Create variable names for each vertex
         var_names = [f"v{vertex}" for vertex in vertices]
@@ -44,16 +229,11 @@ class BooleanFunction():
             constraints.append(f"(v{u} ^ v{v})")
         
         # Combine all constraints with AND
-        if len(constraints) == 0:
-            expression = "1"  # Always true if no edges
-        elif len(constraints) == 1:
-            expression = constraints[0]
-        else:
-            expression = " & ".join(constraints)
+        expression = _and_expression(constraints, reduction, network)
         
         return expression, var_names
 
-    def create_tweedledum_function(self, network: VCPNetwork):
+    def create_tweedledum_function(self, network: VCPNetwork, reduction: str = "balanced"):
         """
         Create a tweedledum BoolFunction for the graph coloring problem using expression parsing.
         
@@ -61,58 +241,136 @@ class BooleanFunction():
         -----------
         network : VCPNetwork
             The graph network containing vertices and edges
+        reduction : str
+            How the edge constraints are joined, one of REDUCTION_MODES
             
         Returns:
         --------
         BoolFunction : Tweedledum boolean function object
         """
-        expression, var_order = self.generate_coloring_expression(network)
+        expression, var_order = self.generate_coloring_expression(network, reduction=reduction)
         
         print(f"Generated expression: {expression}\n")
         print(f"Variable order: {var_order}\n")
 
         # Create BoolFunction from expression
-        return BoolFunction.from_expression(expression, var_order)
+        with stage("from_expression"):
+            return BoolFunction.from_expression(expression, var_order)
 
-    def create_multi_bit_function(self, network: VCPNetwork, debug: bool = False):
+    def create_multi_bit_function(self, network: VCPNetwork, debug: bool = False, from_expression: bool = False,
+                                  reduction: str = "balanced", fix_colored: bool = True,
+                                  exclude_invalid: bool = False, break_symmetry: bool = False):
         """
         Create a function for multi-bit color representation.
         This creates a more complex expression handling multi-bit inequalities.
+
+        By default the logic network is built directly from the edge arrays (see
+        build_multi_bit_function). Set from_expression to generate and parse the
+        equivalent expression string instead.
+
+        Pre-colored vertices (network.core.color_idx) are substituted as constants
+        unless fix_colored is False: an edge between two of them folds away (or makes
+        the function constant false if they share a color), and an edge to one of them
+        compares the free vertex against the constant color.
+
+        When available_colors is not a power of two, some bit patterns encode no
+        color. uniform_superposition_qiskit never prepares them, so by default the
+        function does not forbid them. Set exclude_invalid to AND in one "code < k"
+        comparator per free vertex instead, e.g. when preparing plain Hadamards.
+
+        Set break_symmetry to first pre-color a clique of the network in place (see
+        fix_clique_colors).
         
         Parameters:
         -----------
         network : VCPNetwork
             The graph network containing vertices and edges
-        bits_per_color : int
-            Number of bits to represent each color
+        debug : bool
+            If True, prints the expression (or network size) and variable order
+        from_expression : bool
+            If True, go through BoolFunction.from_expression
+        reduction : str
+            How the edge constraints are joined, one of REDUCTION_MODES
+        fix_colored : bool
+            If True, pre-colored vertices are constants instead of input variables
+        exclude_invalid : bool
+            If True, also require every free vertex to hold a code below available_colors
+        break_symmetry : bool
+            If True, fix the colors of a clique before building the function
             
         Returns:
         --------
         BoolFunction : Tweedledum boolean function object
         """
-        vertices: list = list(network.graph.nodes())
-        edges: list = list(network.graph.edges())
+        if break_symmetry:
+            self.fix_clique_colors(network)
+        if not from_expression:
+            return self.build_multi_bit_function(network, debug=debug, reduction=reduction, fix_colored=fix_colored,
+                                                 exclude_invalid=exclude_invalid)
+
+        expression, var_names = self.generate_multi_bit_expression(network, reduction=reduction, fix_colored=fix_colored,
+                                                                   exclude_invalid=exclude_invalid)
+        if debug:
+            print(f"Generated multi-bit expression: {expression}")
+            print(f"Variable order: {var_names}")
+
+        with stage("from_expression"):
+            return BoolFunction.from_expression(expression, var_names)
+
+    @stage("expression")
+    def generate_multi_bit_expression(self, network: VCPNetwork, reduction: str = "balanced",
+                                      fix_colored: bool = True, exclude_invalid: bool = False) -> tuple:
+        """
+        Generate the multi-bit coloring expression parsed by create_multi_bit_function.
+
+        Parameters:
+        -----------
+        network : VCPNetwork
+            The graph network containing vertices and edges
+        reduction : str
+            How the edge constraints are joined, one of REDUCTION_MODES
+        fix_colored : bool
+            If True, pre-colored vertices are constants instead of input variables
+        exclude_invalid : bool
+            If True, also require every free vertex to hold a code below available_colors
+
+        Returns:
+        --------
+        tuple : (expression, var_names) with one variable v{vertex}_{bit} per bit of
+            every vertex returned by oracle_vertices
+        """
+        edges: list = network.core.edges.tolist()
         bits_per_color: int = math.ceil(math.log2(network.available_colors))
+        fixed = _fixed_colors(network, fix_colored)
 
-        # Find vertices that are actually used in edges
-        used_vertices = set()
-        for u, v in edges:
-            used_vertices.add(u)
-            used_vertices.add(v)
-        
-        # Create variable names only for vertices that appear in edges
+        # Create variable names only for free vertices that appear in edges
         var_names = []
-        for vertex in sorted(used_vertices):
+        for vertex in oracle_vertices(network, fix_colored):
             for bit in range(bits_per_color):
                 var_names.append(f"v{vertex}_{bit}")
         
         # Generate constraint clauses
         constraints = []
-        for u, v in edges:
+        edge_ids = []
+        for i, (u, v) in enumerate(edges):
+            if fixed[u] >= 0 and fixed[v] >= 0:
+                # Both colors are known: the edge is either always or never satisfied
+                if fixed[u] == fixed[v]:
+                    constraints.append("0")
+                    edge_ids.append(i)
+                continue
+            if fixed[u] >= 0:
+                u, v = v, u
+
             # For multi-bit inequality, we need to check if any bit differs
             bit_diffs = []
             for bit in range(bits_per_color):
-                bit_diffs.append(f"(v{u}_{bit} ^ v{v}_{bit})")
+                if fixed[v] < 0:
+                    bit_diffs.append(f"(v{u}_{bit} ^ v{v}_{bit})")
+                elif (fixed[v] >> bit) & 1:
+                    bit_diffs.append(f"~v{u}_{bit}")
+                else:
+                    bit_diffs.append(f"v{u}_{bit}")
             
             # At least one bit must be different
             if len(bit_diffs) == 1:
@@ -121,22 +379,120 @@ class BooleanFunction():
                 constraint = " | ".join(bit_diffs)
             
             constraints.append(f"({constraint})")
+            edge_ids.append(i)
         
         # Combine all constraints with AND
-        if len(constraints) == 0:
-            expression = "1"
-        elif len(constraints) == 1:
-            expression = constraints[0]
-        else:
-            expression = " & ".join(constraints)
+        expression = _and_expression(constraints, reduction, network, edge_ids)
+
+        if exclude_invalid and network.available_colors < 2 ** bits_per_color:
+            valid_codes = [
+                _less_than_constant([f"v{vertex}_{bit}" for bit in range(bits_per_color)], network.available_colors,
+                                    lambda a: f"~{a}", lambda a, b: f"({a} & {b})", lambda a, b: f"({a} | {b})")
+                for vertex in oracle_vertices(network, fix_colored)
+            ]
+            if valid_codes:
+                expression = f"({expression}) & {_balanced_reduce(valid_codes, lambda a, b: f'({a} & {b})')}"
+
+        return expression, var_names
+
+    @stage("build_network")
+    def build_multi_bit_function(self, network: VCPNetwork, debug: bool = False,
+                                 reduction: str = "balanced", fix_colored: bool = True,
+                                 exclude_invalid: bool = False) -> BoolFunction:
+        """
+        Build the multi-bit coloring function directly as a tweedledum LogicNetwork.
+
+        Computes the same predicate as the expression-based create_multi_bit_function,
+        with the same input order (v{vertex}_{bit} for every vertex returned by
+        oracle_vertices), but creates the XOR/OR nodes per edge and the AND tree over
+        the edges without generating and parsing an expression string.
+
+        Edges to a pre-colored vertex need no XOR: bit b of the free vertex differs
+        from a constant color c when it equals the complement of bit b of c.
+        With exclude_invalid, each free vertex gets one "code < k" comparator that
+        is shared by all of its edges and ANDed with the edge tree.
         
+        Parameters:
+        -----------
+        network : VCPNetwork
+            The graph network containing vertices and edges
+        debug : bool
+            If True, prints the network size and variable order
+        reduction : str
+            How the edge constraints are joined, one of REDUCTION_MODES
+        fix_colored : bool
+            If True, pre-colored vertices are constants instead of input variables
+        exclude_invalid : bool
+            If True, also require every free vertex to hold a code below available_colors
+            
+        Returns:
+        --------
+        BoolFunction : Tweedledum boolean function object
+        """
+        if reduction not in REDUCTION_MODES:
+            raise ValueError(f"Unknown reduction mode '{reduction}', expected one of {REDUCTION_MODES}")
+        core = network.core
+        bits_per_color: int = math.ceil(math.log2(network.available_colors))
+        fixed = _fixed_colors(network, fix_colored)
+        logic_network = LogicNetwork()
+
+        # Primary inputs in the same order as the expression-based variable list
+        inputs = {}
+        for vertex in oracle_vertices(network, fix_colored):
+            inputs[vertex] = [logic_network.create_pi() for _ in range(bits_per_color)]
+
+        # One OR of bit differences per edge: at least one bit must be different
+        constraints = []
+        edge_ids = []
+        for i, (u, v) in enumerate(core.edges.tolist()):
+            if fixed[u] >= 0 and fixed[v] >= 0:
+                # Both colors are known: drop satisfied edges, keep conflicts as constant false
+                if fixed[u] == fixed[v]:
+                    constraints.append(logic_network.get_constant(False))
+                    edge_ids.append(i)
+                continue
+            if fixed[u] >= 0:
+                u, v = v, u
+
+            if fixed[v] < 0:
+                bit_diffs = [logic_network.create_xor(a, b) for a, b in zip(inputs[u], inputs[v])]
+            else:
+                bit_diffs = [logic_network.create_not(a) if (fixed[v] >> bit) & 1 else a
+                             for bit, a in enumerate(inputs[u])]
+            if bit_diffs:
+                constraints.append(_balanced_reduce(bit_diffs, logic_network.create_or))
+            else:
+                constraints.append(logic_network.get_constant(False))
+            edge_ids.append(i)
+
+        if exclude_invalid and network.available_colors < 2 ** bits_per_color:
+            valid_codes = [
+                _less_than_constant(bits, network.available_colors, logic_network.create_not,
+                                    logic_network.create_and, logic_network.create_or)
+                for bits in inputs.values()
+            ]
+        else:
+            valid_codes = []
+
+        if constraints:
+            output = _reduce_terms(constraints, logic_network.create_and, reduction, network, edge_ids)
+            if valid_codes:
+                output = logic_network.create_and(output, _balanced_reduce(valid_codes, logic_network.create_and))
+        elif valid_codes:
+            output = _balanced_reduce(valid_codes, logic_network.create_and)
+        else:
+            output = logic_network.get_constant(True)
+        logic_network.create_po(output)
+
         if debug:
-            print(f"Generated multi-bit expression: {expression}")
+            var_names = [f"v{vertex}_{bit}" for vertex in inputs for bit in range(bits_per_color)]
+            print(f"Built logic network with {logic_network.num_gates()} gates")
             print(f"Variable order: {var_names}")
-        
-        return BoolFunction.from_expression(expression, var_names)
+
+        return _bool_function_from_network(logic_network)
     
-    def write_verilog_file(self, network: VCPNetwork, filename: str = "graph_coloring.v", use_multi_bit: bool = True):
+    def write_verilog_file(self, network: VCPNetwork, filename: str = "graph_coloring.v", use_multi_bit: bool = True,
+                           reduction: str = "balanced", fix_colored: bool = True, exclude_invalid: bool = False):
         """
         Write the graph coloring boolean function to a Verilog file.
         
@@ -148,20 +504,28 @@ class BooleanFunction():
             Name of the output Verilog file
         use_multi_bit : bool
             If True, uses multi-bit representation; if False, uses single-bit
+        reduction : str
+            How the edge constraints are joined, one of REDUCTION_MODES
+        fix_colored : bool
+            If True, pre-colored vertices are constants (multi-bit representation only)
+        exclude_invalid : bool
+            If True, forbid codes >= available_colors (multi-bit representation only)
         """
         if use_multi_bit:
-            bool_func = self.create_multi_bit_function(network)
+            bool_func = self.create_multi_bit_function(network, reduction=reduction, fix_colored=fix_colored,
+                                                       exclude_invalid=exclude_invalid)
         else:
-            bool_func = self.create_tweedledum_function(network)
+            bool_func = self.create_tweedledum_function(network, reduction=reduction)
         
         # Write to Verilog file using tweedledum's write_verilog function
         write_verilog(bool_func._logic_network, filename)
         print(f"Verilog file written to: {filename}")
 
-    def write_verilog_with_custom_mapping(self, network: VCPNetwork, filename: str = "graph_coloring.v"):
+    def write_verilog_with_custom_mapping(self, network: VCPNetwork, filename: str = "graph_coloring.v",
+                                          fix_colored: bool = True):
         """
         Write the graph coloring boolean function to a Verilog file with custom variable mapping.
-        This creates a mapping where each vertex gets consecutive input bits.
+        This creates a mapping where each oracle vertex gets consecutive input bits.
         
         Parameters:
         -----------
@@ -169,12 +533,15 @@ class BooleanFunction():
             The graph network containing vertices and edges
         filename : str
             Name of the output Verilog file
+        fix_colored : bool
+            If True, pre-colored vertices are constants and get no inputs
         """
-        vertices = list(network.graph.nodes())
-        bits_per_color: int = network.available_colors.bit_length()
+        # Same inputs as the oracle: oracle_vertices in order, ceil(log2 k) bits each
+        vertices = oracle_vertices(network, fix_colored)
+        bits_per_color: int = math.ceil(math.log2(network.available_colors))
         
         # Create the boolean function
-        bool_func = self.create_multi_bit_function(network)
+        bool_func = self.create_multi_bit_function(network, fix_colored=fix_colored)
         
         # Write to Verilog
         write_verilog(bool_func._logic_network, filename)
@@ -201,10 +568,21 @@ class BooleanFunction():
         print(f"Verilog file written to: {filename}")
         print(f"Variable mapping written to: {mapping_file}")
 
-    def create_manual_verilog(self, network: VCPNetwork, filename: str = "manual_coloring.v"):
+    def create_manual_verilog(self, network: VCPNetwork, filename: str = "manual_coloring.v", reduction: str = "linear"):
         """
         Create a manual Verilog implementation for demonstration purposes.
         This manually constructs the Verilog based on the graph structure.
+
+        With the default linear reduction the file is byte for byte the one written
+        before the reduction modes, for multi-bit colors and at least three edges.
+        Otherwise the output changed:
+        - edges are taken in the canonical order of the graph core (sorted pairs),
+          not in networkx insertion order
+        - with one bit per color every edge XOR gets its own wire, where the inline
+          "~x{u} ^ x{v}" term used to negate only its first operand
+        - y0 is always assigned; with two edges it used to be left undriven, and with
+          one multi-bit edge it was the "colors equal" wire instead of its negation
+        - balanced and grouped join the edges in a tree of AND wires instead of a chain
         
         Parameters:
         -----------
@@ -212,9 +590,12 @@ class BooleanFunction():
             The graph network containing vertices and edges
         filename : str
             Name of the output Verilog file
+        reduction : str
+            How the edge constraints are joined, one of REDUCTION_MODES. Defaults to
+            "linear", a chain of AND wires.
         """
-        vertices = list(network.graph.nodes())
-        edges = list(network.graph.edges())
+        vertices = network.core.vertices().tolist()
+        edges = network.core.edges.tolist()
         bits_per_color: int = network.available_colors.bit_length()
         
         total_inputs = len(vertices) * bits_per_color
@@ -225,11 +606,16 @@ class BooleanFunction():
         edge_constraints = []
         assign_statements = []
         
-        # Generate constraints for each edge
+        # Generate constraints for each edge. Each entry is a literal that is true
+        # when the edge is properly colored.
         for u, v in edges:
             if bits_per_color == 1:
                 # Single bit case: v_u != v_v is just v_u ^ v_v
-                constraint = f"x{u} ^ x{v}"
+                wire_name = f"n{wire_count}"
+                wires.append(wire_name)
+                assign_statements.append(f"  assign {wire_name} = x{v} ^ x{u} ;")
+                wire_count += 1
+                constraint = wire_name
             else:
                 # Multi-bit case: create separate wires for each bit XOR
                 bit_constraint_wires = []
@@ -248,33 +634,34 @@ class BooleanFunction():
                     # Single bit constraint, just use it directly
                     constraint = bit_constraint_wires[0]
                 else:
-                    # Create final wire for AND of NOTs of XORs
+                    # Create final wire for AND of NOTs of XORs (all bits equal),
+                    # the edge is satisfied by its negation
                     final_wire = f"n{wire_count}"
                     wires.append(final_wire)
                     not_terms = [f"~{wire}" for wire in bit_constraint_wires]
                     assign_statements.append(f"  assign {final_wire} = {' & '.join(not_terms)} ;")
-                    constraint = final_wire
+                    constraint = f"~{final_wire}"
                     wire_count += 1
             
             edge_constraints.append(constraint)
         
-        # Generate AND operations for combining edge constraints with negation
-        if len(edge_constraints) > 1:
-            for i, constraint in enumerate(edge_constraints[:-1]):
-                if i == 0:
-                    wire_name = f"n{wire_count}"
-                    wires.append(wire_name)
-                    assign_statements.append(f"  assign {wire_name} = ~{constraint} & ~{edge_constraints[i+1]} ;")
-                    wire_count += 1
-                else:
-                    if i == len(edge_constraints) - 2:
-                        # Last operation outputs to y0
-                        assign_statements.append(f"  assign y0 = {wires[-1]} & ~{edge_constraints[i+1]} ;")
-                    else:
-                        new_wire = f"n{wire_count}"
-                        wires.append(new_wire)
-                        assign_statements.append(f"  assign {new_wire} = {wires[-2]} & ~{edge_constraints[i+1]} ;")
-                        wire_count += 1
+        # Generate AND operations for combining edge constraints, one wire per gate
+        def create_and_wire(a: str, b: str) -> str:
+            nonlocal wire_count
+            wire_name = f"n{wire_count}"
+            wires.append(wire_name)
+            assign_statements.append(f"  assign {wire_name} = {a} & {b} ;")
+            wire_count += 1
+            return wire_name
+
+        if edge_constraints:
+            root = _reduce_terms(edge_constraints, create_and_wire, reduction, network)
+            if len(edge_constraints) > 1:
+                # The last AND gate outputs to y0 directly
+                wires.pop()
+                assign_statements[-1] = assign_statements[-1].replace(f"assign {root} =", "assign y0 =")
+            else:
+                assign_statements.append(f"  assign y0 = {root} ;")
         
         # Now write the file
         with open(filename, 'w') as f:
@@ -293,10 +680,6 @@ class BooleanFunction():
             for assign_stmt in assign_statements:
                 f.write(f"{assign_stmt}\n")
             
-            # Handle single constraint case
-            if len(edge_constraints) == 1:
-                f.write(f"  assign y0 = {edge_constraints[0]} ;\n")
-            
             f.write("endmodule\n")
         
         print(f"Manual Verilog file written to: {filename}")
\ No newline at end of file
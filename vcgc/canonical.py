@@ -0,0 +1,156 @@
+# A module that computes canonical vertex orderings so isomorphic instances get identical labels
+
+import hashlib
+import numpy as np
+
+
+def _refine(adjacency: list, colors: list) -> list:
+    """
+    Refine an ordered vertex coloring until it is equitable (1-dimensional Weisfeiler-Lehman).
+
+    Every round recolors a vertex by its color and the sorted colors of its
+    neighbours. New colors are ranks of these keys, so the order of existing cells
+    is kept and the result does not depend on the vertex numbering.
+    """
+    num_cells = len(set(colors))
+    while True:
+        keys = [(colors[v], tuple(sorted(colors[w] for w in neighbors))) for v, neighbors in enumerate(adjacency)]
+        ranks = {key: rank for rank, key in enumerate(sorted(set(keys)))}
+        colors = [ranks[key] for key in keys]
+        if len(ranks) == num_cells:
+            return colors
+        num_cells = len(ranks)
+
+
+def _individualize(colors: list, vertex: int) -> list:
+    """Split vertex off in front of the rest of its cell."""
+    keys = [(color, v != vertex) for v, color in enumerate(colors)]
+    ranks = {key: rank for rank, key in enumerate(sorted(set(keys)))}
+    return [ranks[key] for key in keys]
+
+
+def canonical_order(adjacency: list, initial: list, max_leaves: int = 10000) -> tuple:
+    """
+    Compute a canonical ordering of the vertices of a vertex-colored graph.
+
+    Individualization-refinement search: the equitable coloring is refined, the
+    first non-singleton cell is split on each of its vertices in turn, and every
+    discrete coloring reached is a candidate labelling. The candidate with the
+    smallest certificate (relabeled vertex colors and edge list) is canonical.
+    Automorphisms found between leaves prune equivalent subtrees.
+
+    Args:
+        adjacency (list): Neighbour lists of vertices 0..n-1.
+        initial (list): Initial color of every vertex (e.g. the pre-assigned color).
+        max_leaves (int): Stop after this many leaves; the best ordering found so
+            far is returned but is no longer guaranteed to be canonical.
+
+    Returns:
+        tuple: (order, certified) where order[i] is the vertex that gets label i
+        and certified tells whether the search ran to completion.
+    """
+    n = len(adjacency)
+    ranks = {color: rank for rank, color in enumerate(sorted(set(initial)))}
+    state = {'first': None, 'best': None, 'leaves': 0, 'automorphisms': []}
+
+    def certificate(labels):
+        colors = [0] * n
+        for v, label in enumerate(labels):
+            colors[label] = initial[v]
+        edges = sorted((min(labels[v], labels[w]), max(labels[v], labels[w]))
+                       for v, neighbors in enumerate(adjacency) for w in neighbors if v <= w)
+        return tuple(colors), tuple(edges)
+
+    def leaf(labels, path):
+        state['leaves'] += 1
+        cert = certificate(labels)
+        if state['first'] is None:
+            state['first'] = state['best'] = (cert, labels, path)
+            return len(path)
+        depth = len(path)
+        for known in (state['first'], state['best']):
+            if cert == known[0]:
+                # Both leaves give the same graph, so mapping one labelling onto the other is an automorphism
+                inverse = [0] * n
+                for v, label in enumerate(labels):
+                    inverse[label] = v
+                state['automorphisms'].append([inverse[label] for label in known[1]])
+                if known is state['first']:
+                    # The subtree below the first divergence from the first path repeats explored work
+                    depth = next((i for i, (a, b) in enumerate(zip(path, known[2])) if a != b), len(path))
+                return depth
+        if cert < state['best'][0]:
+            state['best'] = (cert, labels, path)
+        return depth
+
+    def search(colors, path):
+        if len(set(colors)) == n:
+            return leaf(colors, path)
+        if state['leaves'] >= max_leaves:
+            return -1
+        sizes = np.bincount(colors)
+        target = int(np.flatnonzero(sizes > 1)[0])
+        explored = []
+        for vertex in (v for v, color in enumerate(colors) if color == target):
+            if any(all(gamma[p] == p for p in path) and gamma[u] == vertex
+                   for gamma in state['automorphisms'] for u in explored):
+                continue
+            explored.append(vertex)
+            back = search(_refine(adjacency, _individualize(colors, vertex)), path + [vertex])
+            if back < len(path):
+                return back
+        return len(path)
+
+    if n == 0:
+        return [], True
+    complete = search(_refine(adjacency, [ranks[color] for color in initial]), []) >= 0
+    labels = state['best'][1]
+    order = [0] * n
+    for v, label in enumerate(labels):
+        order[label] = v
+    return order, complete
+
+
+class CanonicalForm:
+    """
+    A network relabeled into canonical order, with the permutation to map results back.
+
+    Isomorphic networks (with the same pre-assigned colors and available colors)
+    get the same canonical network, so functions and oracles built from it are
+    identical and share synthesis cache entries.
+
+    Attributes:
+    -----------
+    network : VCPNetwork
+        The canonically relabeled network
+    vertices : numpy.ndarray
+        Original ID of every canonical vertex: canonical vertex i is vertices[i - 1]
+    certified : bool
+        False if the search hit its leaf limit. Equal digests still imply isomorphic
+        networks, but isomorphic networks may then get different digests.
+    digest : str
+        SHA-256 of the canonical network and the number of colors
+    """
+
+    def __init__(self, network, max_leaves: int = 10000):
+        core = network.core
+        adjacency = [core.neighbors(v).tolist() for v in range(1, core.num_vertices + 1)]
+        adjacency = [[w - 1 for w in neighbors] for neighbors in adjacency]
+        order, self.certified = canonical_order(adjacency, core.color_idx[1:].tolist(), max_leaves)
+        self.vertices = np.asarray(order, dtype=np.int64) + 1
+        self.network = network.subnetwork(self.vertices)
+
+        canonical = self.network.core
+        digest = hashlib.sha256(np.array([network.available_colors, canonical.num_vertices], dtype=np.int64).tobytes())
+        digest.update(np.ascontiguousarray(canonical.color_idx, dtype=np.int32).tobytes())
+        digest.update(np.ascontiguousarray(canonical.edges, dtype=np.int32).tobytes())
+        self.digest = digest.hexdigest()
+
+    def to_original(self, coloring: dict) -> dict:
+        """Map a coloring of the canonical network onto the original vertex IDs."""
+        return {int(self.vertices[v - 1]): color for v, color in coloring.items()}
+
+    def from_original(self, coloring: dict) -> dict:
+        """Map a coloring keyed by original vertex IDs onto the canonical network."""
+        labels = {int(v): i for i, v in enumerate(self.vertices.tolist(), start=1)}
+        return {labels[v]: color for v, color in coloring.items()}
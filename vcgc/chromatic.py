@@ -0,0 +1,173 @@
+# A module that searches for the chromatic number, reusing circuit components across color counts
+
+from math import ceil, log2
+from typing import Callable, Optional
+from .network import VCPNetwork
+from .classical import dsatur, find_coloring
+from .simulation import GroverSolver
+from .synthesis import SynthesisCache
+
+
+class ChromaticSearch:
+    """
+    Search for the smallest number of colors k for which the network has a coloring.
+
+    The search starts from classical bounds: a greedy clique (or the largest
+    pre-assigned color) below and a DSATUR coloring above. It tries k upwards from the
+    lower bound, raising it for every k without a coloring, and stops as soon as the
+    bounds meet.
+
+    Circuit components are shared between the color counts. The edge comparators of
+    the multi-bit oracle only depend on the bits per color, so one oracle serves every
+    k of the same bit width: the uniform superposition over the k codes keeps the
+    search within the valid codes. Only with exclude_invalid, where the oracle also
+    compares every code with k, does it differ per k below a power of two. The state
+    preparation and diffusion circuits are kept per k (per bit width with
+    exclude_invalid, where they prepare all codes).
+
+    Attributes:
+    -----------
+    network : VCPNetwork
+        The network being colored
+    lower, upper : int
+        Current bounds on the chromatic number
+    coloring : dict
+        A coloring with upper colors
+    history : list of dict
+        One entry per k tried: "k", "colorings" and "exact" (see
+        classical.num_colorings), "found", and for built circuits "qubits",
+        "iterations" and "reused" (the names of the components taken from earlier k).
+        "fallback" marks a coloring found by backtracking after the solver missed
+        one that was known to exist, "undecided" the error of a circuit too large to
+        simulate.
+    """
+
+    def __init__(self, network: VCPNetwork, reduction: str = "balanced", exclude_invalid: bool = False,
+                 diffusion: str = "default", reflect_usp: bool = True, cache: Optional[SynthesisCache] = None):
+        """
+        Parameters:
+        -----------
+        network : VCPNetwork
+            The network to color; its available_colors is ignored
+        reduction, exclude_invalid, diffusion, reflect_usp, cache
+            Circuit settings, see GroverSolver
+        """
+        self.network = network
+        self.reduction = reduction
+        self.exclude_invalid = exclude_invalid
+        self.diffusion = diffusion
+        self.reflect_usp = reflect_usp
+        self.cache = cache
+        self.history = []
+        self._components = {}
+
+        core = network.core
+        max_color = int(core.color_idx.max(initial=-1))
+        self.lower = max(len(core.greedy_clique()) if core.num_edges else min(core.num_vertices, 1), max_color + 1)
+        # DSATUR never needs more than max degree + 1 colors besides the pre-assigned ones
+        bound = max(int(core.degrees.max(initial=0)) + 1, max_color + 1, 1)
+        self.coloring = dsatur(self.network_for(bound))
+        self.upper = max(self.coloring.values(), default=-1) + 1
+
+    def network_for(self, num_colors: int) -> VCPNetwork:
+        """Return a copy of the network with num_colors available colors."""
+        core = self.network.core
+        network = VCPNetwork()
+        network.num_vertices = core.num_vertices
+        network.num_edges = core.num_edges
+        network.edges = core.edges
+        network.available_colors = num_colors
+        network.colored_vertices = {v: int(core.color_idx[v]) for v in range(1, core.num_vertices + 1)
+                                    if core.color_idx[v] >= 0}
+        network.create_graph_core(core.num_vertices, core.edges, network.colored_vertices, num_colors,
+                                  indptr=core.indptr, indices=core.indices)
+        return network
+
+    def _keys(self, num_colors: int) -> dict:
+        """Return the component cache key of every component of the circuit for num_colors."""
+        bits = ceil(log2(num_colors))
+        oracle = (bits, num_colors) if self.exclude_invalid and num_colors < 2 ** bits else (bits,)
+        usp = (bits,) if self.exclude_invalid else (bits, num_colors)
+        return {"oracle": ("oracle",) + oracle, "usp": ("usp",) + usp,
+                "diffusion_operator": ("diffusion",) + (usp if self.reflect_usp else (bits,))}
+
+    def solver(self, num_colors: int) -> GroverSolver:
+        """
+        Return the Grover solver for num_colors, with every component already built for
+        an earlier k passed in.
+        """
+        components = {name: self._components.get(key) for name, key in self._keys(num_colors).items()}
+        return GroverSolver(self.network_for(num_colors), reduction=self.reduction,
+                            exclude_invalid=self.exclude_invalid, diffusion=self.diffusion,
+                            reflect_usp=self.reflect_usp, cache=self.cache, **components)
+
+    def build(self, solver: GroverSolver) -> list:
+        """
+        Build the circuit of a solver from this search and keep its components for later k.
+
+        Returns:
+        --------
+        list : Names of the components that were reused instead of built
+        """
+        reused = [name for name in ("oracle", "usp", "diffusion_operator") if getattr(solver, name) is not None]
+        solver.build()
+        for name, key in self._keys(solver.network.available_colors).items():
+            self._components[key] = getattr(solver, name)
+        return reused
+
+    def search(self, solve: Optional[Callable[[GroverSolver], Optional[dict]]] = None, prune: bool = True,
+               shots: int = 1024, seed: Optional[int] = None) -> tuple:
+        """
+        Raise the lower bound until it meets the upper bound.
+
+        A k counts as not colorable when the solver finds no coloring, which only
+        proves it when the count of colorings is exact. When the exact count says
+        colorings exist but the solver missed them, the coloring is found by
+        backtracking instead and k is kept. The search stops early, with lower below
+        upper, at the first k whose circuit is too large to simulate.
+
+        Parameters:
+        -----------
+        solve : callable, optional
+            Maps the built GroverSolver of a k to a coloring or None. Defaults to
+            simulating it, GroverSolver.solve(shots, seed).
+        prune : bool
+            If True, skip building circuits for k whose exact count of colorings is 0
+        shots : int
+            Number of samples of the default solve
+        seed : int, optional
+            Seed of the default solve
+
+        Returns:
+        --------
+        tuple : (chromatic number, coloring) as far as the solver could tell
+        """
+        while self.lower < self.upper:
+            k = self.lower
+            solver = self.solver(k)
+            count, exact = solver.count_solutions()
+            entry = {"k": k, "colorings": count, "exact": exact}
+            coloring = None
+            if count or not exact or not prune:
+                reused = self.build(solver)
+                entry.update(qubits=solver.circuit.num_qubits, iterations=solver.iterations, reused=reused)
+                if solve is not None:
+                    coloring = solve(solver)
+                else:
+                    try:
+                        coloring = solver.solve(shots=shots, seed=seed)
+                    except ValueError as error:  # more qubits than simulate_counts accepts
+                        entry.update(found=False, undecided=str(error))
+                        self.history.append(entry)
+                        break
+                if coloring is None and exact and count:
+                    # Colorings exist, the samples only missed them
+                    coloring = find_coloring(solver.network)
+                    entry["fallback"] = True
+            entry["found"] = coloring is not None
+            self.history.append(entry)
+            if coloring is None:
+                self.lower = k + 1
+            else:
+                self.upper, self.coloring = k, coloring
+        return self.upper, self.coloring
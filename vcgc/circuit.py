@@ -1,24 +1,114 @@
 # A module to handle state preparation, oracle attachment, and diffusion circuit generations for grover's circuit
 
 import numpy as np
-from qiskit import QuantumCircuit
+from qiskit import QuantumCircuit, transpile
+from qiskit.synthesis import (synth_mcx_noaux_v24, synth_mcx_1_clean_kg24, synth_mcx_1_dirty_kg24,
+                              synth_mcx_2_clean_kg24, synth_mcx_n_clean_m15)
 from qiskit.circuit.library.data_preparation.state_preparation import UniformSuperpositionGate
-from math import ceil, log2
+from math import asin, ceil, floor, log2, pi, sin, sqrt
+from .instrumentation import stage
+
+# Multi-controlled X decompositions of the diffusion operator: mode -> (synthesis of
+# an MCX with n controls, number of ancillas, whether the ancillas must start in |0>).
+# "default" leaves a plain mcx gate to the transpiler.
+MCX_MODES = {
+    "default": (None, lambda n: 0, False),
+    "noancilla": (synth_mcx_noaux_v24, lambda n: 0, False),
+    "clean": (synth_mcx_1_clean_kg24, lambda n: 1, True),      # linear depth, one clean ancilla
+    "dirty": (synth_mcx_1_dirty_kg24, lambda n: 1, False),     # linear depth, one ancilla in any state
+    "v-chain": (synth_mcx_n_clean_m15, lambda n: n - 2, True),  # linear depth, n - 2 clean ancillas
+    "log-depth": (synth_mcx_2_clean_kg24, lambda n: 2, True),  # logarithmic depth, two clean ancillas
+}
+
+
+def _state_preparation(num_qubits: int, usp: QuantumCircuit = None, num_encode_qubits: int = 1) -> QuantumCircuit:
+    """Returns Hadamards on every qubit, or usp on every block of num_encode_qubits."""
+    prep = QuantumCircuit(num_qubits)
+    if usp is None:
+        prep.h(range(num_qubits))
+    else:
+        for start_qubit in range(0, num_qubits - num_encode_qubits + 1, num_encode_qubits):
+            prep.compose(usp, qubits=range(start_qubit, start_qubit + num_encode_qubits), inplace=True)
+    return prep
+
 
 # Create a quantum subcircuit for grover diffusion operator
-def generate_grover_diffusion(num_qubits: int) -> QuantumCircuit:
-    # Create a quantum subcircuit for grover diffusion operator
-    grover_diff = QuantumCircuit(num_qubits, name="grover_diffusion")
-    grover_diff.h(range(num_qubits))
+@stage("grover_diffusion")
+def generate_grover_diffusion(num_qubits: int, mcx_mode: str = "default", usp: QuantumCircuit = None,
+                              num_encode_qubits: int = 1) -> QuantumCircuit:
+    """
+    Creates the Grover diffusion operator, a reflection about the prepared state.
+
+    The prepared state is undone, |0...0> is reflected with X gates around a
+    multi-controlled Z (H-MCX-H on the last qubit), and the state is prepared again.
+    Without usp the prepared state is |+>^n (plain Hadamards). Pass the per-vertex
+    state preparation of the Grover circuit to reflect about its actual state, e.g.
+    the uniform superposition over the k valid codes.
+
+    Modes with ancillas return a circuit with the ancillas after the num_qubits data
+    qubits. assemble_grover_circuit places them after the oracle's output qubit,
+    where the oracle's own (uncomputed, hence clean) ancillas live.
+
+    Args:
+        num_qubits (int): Number of data qubits
+        mcx_mode (str): Decomposition of the multi-controlled X, one of MCX_MODES
+        usp (QuantumCircuit): State preparation of one vertex, or None for Hadamards
+        num_encode_qubits (int): Qubits per vertex, the width of usp
+
+    Returns:
+        QuantumCircuit: The diffusion operator
+    """
+    if mcx_mode not in MCX_MODES:
+        raise ValueError(f"Unknown MCX mode '{mcx_mode}', expected one of {list(MCX_MODES)}")
+    synthesis, num_ancillas, _ = MCX_MODES[mcx_mode]
+    num_controls = num_qubits - 1
+    if synthesis is None or num_controls < 3:
+        synthesis, num_ancillas = None, lambda n: 0
+
+    prep = _state_preparation(num_qubits, usp, num_encode_qubits)
+    grover_diff = QuantumCircuit(num_qubits + num_ancillas(num_controls), name="grover_diffusion")
+    grover_diff.compose(prep.inverse(), qubits=range(num_qubits), inplace=True)
     grover_diff.x(range(num_qubits))
     grover_diff.h(num_qubits - 1)
-    grover_diff.mcx(list(range(num_qubits - 1)), num_qubits - 1)
+    if synthesis is None:
+        grover_diff.mcx(list(range(num_controls)), num_qubits - 1)
+    else:
+        # Synthesized MCX circuits act on the controls, then the target, then the ancillas
+        grover_diff.compose(synthesis(num_controls), inplace=True)
     grover_diff.h(num_qubits - 1)
     grover_diff.x(range(num_qubits))
-    grover_diff.h(range(num_qubits))
+    grover_diff.compose(prep, qubits=range(num_qubits), inplace=True)
     return grover_diff
 
 
+def diffusion_depths(num_qubits: int, usp: QuantumCircuit = None, num_encode_qubits: int = 1,
+                     modes: list = None, basis_gates: tuple = ("u", "cx")) -> dict:
+    """
+    Compares the diffusion operator across MCX decompositions.
+
+    Each variant is transpiled to basis_gates without optimization, so the numbers
+    reflect the decomposition rather than the transpiler's later passes.
+
+    Args:
+        num_qubits (int): Number of data qubits
+        usp (QuantumCircuit): State preparation of one vertex, or None for Hadamards
+        num_encode_qubits (int): Qubits per vertex
+        modes (list): Modes to compare, all of MCX_MODES by default
+        basis_gates (tuple): Gate set the depth is measured in
+
+    Returns:
+        dict: mode -> {"depth", "cx", "ancillas"}
+    """
+    report = {}
+    for mode in modes or list(MCX_MODES):
+        diffusion = generate_grover_diffusion(num_qubits, mcx_mode=mode, usp=usp, num_encode_qubits=num_encode_qubits)
+        compiled = transpile(diffusion, basis_gates=list(basis_gates), optimization_level=0)
+        report[mode] = {"depth": compiled.depth(), "cx": compiled.count_ops().get("cx", 0),
+                        "ancillas": diffusion.num_qubits - num_qubits}
+    return report
+
+
+@stage("state_preparation")
 def uniform_superposition(M, n) -> QuantumCircuit:
     """
     Creates a quantum circuit that prepares a uniform superposition state over M basis states.
@@ -66,6 +156,7 @@ def uniform_superposition(M, n) -> QuantumCircuit:
     # display(qcircuit.draw('mpl'))
     return qcircuit
 
+@stage("state_preparation")
 def uniform_superposition_qiskit(num_superpos_states: int, num_qubits: int = None) -> QuantumCircuit:
     """
     Creates a quantum circuit that prepares a uniform superposition state over M basis states.
@@ -89,6 +180,12 @@ def uniform_superposition_qiskit(num_superpos_states: int, num_qubits: int = Non
     
     return qcircuit
 
+def _diffusion_qubits(diffusion: QuantumCircuit, num_data_qubits: int) -> list:
+    """Qubits of a diffusion operator: the data qubits, then its ancillas after the oracle's output qubit."""
+    return list(range(num_data_qubits)) + list(range(num_data_qubits + 1, diffusion.num_qubits + 1))
+
+
+@stage("glue_grover_circuit")
 def glue_grover_circuit(usp: QuantumCircuit, oracle: QuantumCircuit, diffusion: QuantumCircuit, num_data_qubits: int, num_encode_qubits: int) -> QuantumCircuit:
     """
     Glues together the uniform superposition, oracle, and diffusion circuits to create a complete Grover circuit.
@@ -104,7 +201,8 @@ def glue_grover_circuit(usp: QuantumCircuit, oracle: QuantumCircuit, diffusion:
         QuantumCircuit: Complete Grover circuit
     """
     # Create the main circuit with enough qubits for all components
-    total_qubits = max(usp.num_qubits, oracle.num_qubits, diffusion.num_qubits)
+    diffusion_qubits = _diffusion_qubits(diffusion, num_data_qubits)
+    total_qubits = max(usp.num_qubits, oracle.num_qubits, diffusion_qubits[-1] + 1)
     grover_circuit = QuantumCircuit(total_qubits, name="grover_circuit")
     
     # Step 1: Apply uniform superposition to prepare initial state
@@ -122,32 +220,142 @@ def glue_grover_circuit(usp: QuantumCircuit, oracle: QuantumCircuit, diffusion:
     
     # Step 3: Apply diffusion operator
     grover_circuit.barrier()
-    grover_circuit.compose(diffusion, inplace=True)
+    grover_circuit.compose(diffusion, qubits=diffusion_qubits, inplace=True)
     
     return grover_circuit
 
-def glue_grover_circuit_with_iterations(usp: QuantumCircuit, oracle: QuantumCircuit, diffusion: QuantumCircuit, 
-                                      num_data_qubits: int, num_encode_qubits: int, iterations: int = 1) -> QuantumCircuit:
+def optimal_iterations(num_states: int, num_solutions: int) -> int:
     """
-    Creates a complete Grover circuit with multiple iterations.
-    
+    Returns the number of Grover iterations that maximizes the success probability.
+
+    With M marked states among N, each iteration rotates the state by 2*theta where
+    sin(theta) = sqrt(M/N), and k iterations succeed with probability
+    sin^2((2k + 1) * theta). The best k is the integer next to pi/(4*theta) - 1/2
+    with the higher probability.
+
     Args:
-        iterations (int): Number of Grover iterations (oracle + diffusion)
+        num_states (int): Size N of the search space prepared by the state preparation
+        num_solutions (int): Number M of marked states (valid colorings), exact or estimated
+
+    Returns:
+        int: Number of iterations, 0 if there is nothing to amplify (M = 0 or M >= N/2)
+    """
+    if num_solutions <= 0 or num_states <= 0:
+        return 0
+    theta = asin(sqrt(min(num_solutions / num_states, 1.0)))
+    best = pi / (4 * theta) - 0.5
+    candidates = {max(floor(best), 0), max(ceil(best), 0)}
+    return max(sorted(candidates), key=lambda k: sin((2 * k + 1) * theta) ** 2)
+
+
+@stage("glue_grover_circuit")
+def assemble_grover_circuit(usp: QuantumCircuit, oracle: QuantumCircuit, diffusion: QuantumCircuit,
+                            num_data_qubits: int, num_encode_qubits: int, iterations: int = None,
+                            num_states: int = None, num_solutions: int = None) -> QuantumCircuit:
+    """
+    Assembles a Grover circuit with any number of oracle and diffusion rounds.
+
+    The state preparation and the |-> preparation of the oracle's output qubit are the
+    same as in glue_grover_circuit. The oracle and diffusion are converted to one
+    gate each, and every round appends these same gates, so building
+    many rounds does not copy their gates. Use expanded_size for gate-level metrics.
+
+    Args:
+        usp (QuantumCircuit): Per-vertex state preparation circuit
+        oracle (QuantumCircuit): Oracle circuit that marks the target states
+        diffusion (QuantumCircuit): Grover diffusion operator
+        num_data_qubits (int): Total number of data qubits
+        num_encode_qubits (int): Number of qubits per vertex encoding
+        iterations (int): Number of rounds; computed with optimal_iterations if None
+        num_states (int): Search space size, needed when iterations is None
+        num_solutions (int): Number of valid colorings, needed when iterations is None
+
+    Returns:
+        QuantumCircuit: Complete Grover circuit
     """
-    total_qubits = max(usp.num_qubits, oracle.num_qubits, diffusion.num_qubits)
+    if iterations is None:
+        if num_states is None or num_solutions is None:
+            raise ValueError("num_states and num_solutions are required when iterations is not given")
+        iterations = optimal_iterations(num_states, num_solutions)
+
+    diffusion_qubits = _diffusion_qubits(diffusion, num_data_qubits)
+    total_qubits = max(usp.num_qubits, oracle.num_qubits, diffusion_qubits[-1] + 1)
     grover_circuit = QuantumCircuit(total_qubits, name=f"grover_circuit_{iterations}_iter")
-    
-    # Step 1: Apply uniform superposition
+
+    # State preparation of every vertex, and |-> on the output qubit for phase kickback
     for vertex in range(num_data_qubits // num_encode_qubits):
         start_qubit = vertex * num_encode_qubits
-        end_qubit = start_qubit + num_encode_qubits
-        grover_circuit.compose(usp, qubits=range(start_qubit, end_qubit), inplace=True)
-    
-    # Step 2: Apply Grover iterations
-    for iteration in range(iterations):
+        grover_circuit.compose(usp, qubits=range(start_qubit, start_qubit + num_encode_qubits), inplace=True)
+    grover_circuit.x(num_data_qubits)
+    grover_circuit.h(num_data_qubits)
+
+    oracle_instruction = oracle.to_gate()
+    oracle_instruction.name = "oracle"
+    diffusion_instruction = diffusion.to_gate()
+    diffusion_instruction.name = "grover_diffusion"
+    oracle_qubits = list(range(oracle.num_qubits))
+    for _ in range(iterations):
         grover_circuit.barrier()
-        grover_circuit.compose(oracle, inplace=True)
+        grover_circuit.append(oracle_instruction, oracle_qubits, copy=False)
         grover_circuit.barrier()
-        grover_circuit.compose(diffusion, inplace=True)
+        grover_circuit.append(diffusion_instruction, diffusion_qubits, copy=False)
+
+    return grover_circuit
+
+
+def expanded_size(circuit: QuantumCircuit, gates_to_expand: tuple = ("oracle", "grover_diffusion")) -> tuple:
+    """
+    Returns the depth and size the circuit has with the given gates expanded.
+
+    Gives the same result as decompose(gates_to_decompose=gates_to_expand) without
+    building the expanded circuit. Barriers over all qubits split the circuit into
+    segments whose depths add up, and a segment holding a single expandable gate is
+    measured on the gate's definition once, however often it repeats.
+
+    Args:
+        circuit (QuantumCircuit): Circuit, e.g. from assemble_grover_circuit
+        gates_to_expand (tuple): Names of the gates to expand
+
+    Returns:
+        tuple: (depth, size) of the expanded circuit
+    """
+    depth = size = 0
+    cache = {}
+    segment = []
+
+    def measure(segment):
+        if len(segment) == 1 and segment[0].operation.name in gates_to_expand:
+            operation = segment[0].operation
+            if id(operation) not in cache:
+                cache[id(operation)] = (operation.definition.depth(), len(operation.definition), operation)
+            return cache[id(operation)][:2]
+        part = QuantumCircuit(*circuit.qregs, *circuit.cregs)
+        for instruction in segment:
+            part.append(instruction)
+        part = part.decompose(gates_to_decompose=list(gates_to_expand))
+        return part.depth(), len(part)
+
+    for instruction in circuit.data:
+        if instruction.operation.name == "barrier" and len(instruction.qubits) == circuit.num_qubits:
+            segment_depth, segment_size = measure(segment) if segment else (0, 0)
+            depth += segment_depth
+            size += segment_size + 1
+            segment = []
+        else:
+            segment.append(instruction)
+    if segment:
+        segment_depth, segment_size = measure(segment)
+        depth += segment_depth
+        size += segment_size
+    return depth, size
+
+
+def glue_grover_circuit_with_iterations(usp: QuantumCircuit, oracle: QuantumCircuit, diffusion: QuantumCircuit, 
+                                      num_data_qubits: int, num_encode_qubits: int, iterations: int = 1) -> QuantumCircuit:
+    """
+    Creates a complete Grover circuit with multiple iterations.
     
-    return grover_circuit
\ No newline at end of file
+    Args:
+        iterations (int): Number of Grover iterations (oracle + diffusion)
+    """
+    return assemble_grover_circuit(usp, oracle, diffusion, num_data_qubits, num_encode_qubits, iterations=iterations)
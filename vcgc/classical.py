@@ -0,0 +1,431 @@
+# A module with classical routines for the vertex coloring problem
+
+import heapq
+import math
+from typing import Optional
+import numpy as np
+from .network import VCPNetwork
+
+
+def find_coloring(network: VCPNetwork) -> Optional[dict]:
+    """
+    Find a proper coloring of the network with its available colors by backtracking.
+
+    Pre-colored vertices keep their color. Free vertices are colored in order of
+    decreasing degree, each one taking the smallest color not used by a neighbour;
+    when none is left the search backs up to the previous vertex. The search is
+    iterative, so large components do not hit the recursion limit.
+
+    Parameters:
+    -----------
+    network : VCPNetwork
+        The graph network containing vertices and edges
+
+    Returns:
+    --------
+    dict or None : Mapping of every vertex 1..num_vertices to a color index, or None
+        if no proper coloring exists
+    """
+    core = network.core
+    num_colors = network.available_colors
+    colors = core.color_idx.tolist()
+
+    for u, v in core.edges.tolist():
+        if u == v or (colors[u] >= 0 and colors[u] == colors[v]):
+            return None
+
+    order = sorted(core.free_vertices().tolist(), key=lambda v: -int(core.degrees[v]))
+    adjacency = {v: core.neighbors(v).tolist() for v in order}
+    next_color = [0] * len(order)
+    i = 0
+    while 0 <= i < len(order):
+        vertex = order[i]
+        used = {colors[w] for w in adjacency[vertex]}
+        color = next_color[i]
+        while color < num_colors and color in used:
+            color += 1
+        if color < num_colors:
+            colors[vertex] = color
+            next_color[i] = color + 1
+            i += 1
+            if i < len(order):
+                next_color[i] = 0
+        else:
+            colors[vertex] = -1
+            i -= 1
+
+    if i < 0:
+        return None
+    # Vertices without edges can take any color
+    return {v: max(colors[v], 0) for v in range(1, core.num_vertices + 1)}
+
+
+def dsatur(network: VCPNetwork) -> dict:
+    """
+    Color the network with its available colors by DSATUR, allowing conflicts.
+
+    Free vertices are colored one at a time, always the one with the most distinct
+    colors among its colored neighbours (ties broken by degree). Each takes the
+    smallest color no neighbour uses, or when all available colors are taken, the
+    one used by the fewest neighbours. Pre-colored vertices keep their color.
+
+    Parameters:
+    -----------
+    network : VCPNetwork
+        The graph network containing vertices and edges
+
+    Returns:
+    --------
+    dict : Mapping of every vertex 1..num_vertices to a color index; the coloring
+        may have conflicts (see VCPNetwork.verify_colorings)
+    """
+    core = network.core
+    num_colors = network.available_colors
+    colors = core.color_idx.tolist()
+    # neighbour_colors[v][c]: number of colored neighbours of v with color c
+    neighbour_colors = np.zeros((core.num_vertices + 1, num_colors), dtype=np.int32)
+    for v in np.flatnonzero(core.color_idx >= 0).tolist():
+        np.add.at(neighbour_colors, (core.neighbors(v), colors[v]), 1)
+
+    free = core.free_vertices().tolist()
+    heap = [(-int(np.count_nonzero(neighbour_colors[v])), -int(core.degrees[v]), v) for v in free]
+    heapq.heapify(heap)
+    while heap:
+        saturation, _, vertex = heapq.heappop(heap)
+        if colors[vertex] >= 0 or -saturation != np.count_nonzero(neighbour_colors[vertex]):
+            continue  # already colored, or a stale entry pushed before a neighbour was colored
+        counts = neighbour_colors[vertex]
+        color = int(np.argmin(counts))  # the first unused color, or the least used one
+        colors[vertex] = color
+        for w in core.neighbors(vertex).tolist():
+            neighbour_colors[w, color] += 1
+            if colors[w] < 0 and neighbour_colors[w, color] == 1:
+                heapq.heappush(heap, (-int(np.count_nonzero(neighbour_colors[w])), -int(core.degrees[w]), w))
+    return {v: max(colors[v], 0) for v in range(1, core.num_vertices + 1)}
+
+
+def tabu_search(network: VCPNetwork, coloring: Optional[dict] = None, max_iterations: int = 10000,
+                seed: Optional[int] = None) -> dict:
+    """
+    Reduce the conflicts of a coloring by tabu search (TabuCol).
+
+    Every step recolors one conflicting free vertex with the move that removes the
+    most conflicts. Undoing a move is forbidden for a tenure that grows with the
+    number of conflicts, unless it reaches a new best. Pre-colored vertices never
+    move.
+
+    Parameters:
+    -----------
+    network : VCPNetwork
+        The graph network containing vertices and edges
+    coloring : dict, optional
+        Start coloring of every vertex, dsatur(network) by default
+    max_iterations : int
+        Number of moves after which the best coloring so far is returned
+    seed : int, optional
+        Seed of the tie-breaking and tenure randomization
+
+    Returns:
+    --------
+    dict : The coloring with the fewest conflicts that was found
+    """
+    core = network.core
+    num_colors = network.available_colors
+    if coloring is None:
+        coloring = dsatur(network)
+    colors = np.zeros(core.num_vertices + 1, dtype=np.int64)
+    colors[1:] = [coloring[v] for v in range(1, core.num_vertices + 1)]
+    movable = np.zeros(core.num_vertices + 1, dtype=bool)
+    movable[core.free_vertices()] = True
+
+    # gamma[v][c]: number of neighbours of v with color c
+    gamma = np.zeros((core.num_vertices + 1, num_colors), dtype=np.int64)
+    heads, tails = core.edges[:, 0], core.edges[:, 1]
+    np.add.at(gamma, (heads, colors[tails]), 1)
+    np.add.at(gamma, (tails, colors[heads]), 1)
+    conflicts = int(np.count_nonzero(colors[heads] == colors[tails]))
+    best, best_colors = conflicts, colors.copy()
+    tabu_until = np.zeros_like(gamma)
+    rng = np.random.default_rng(seed)
+
+    for iteration in range(max_iterations):
+        if best == 0:
+            break
+        candidates = np.flatnonzero(movable & (gamma[np.arange(len(colors)), colors] > 0))
+        if len(candidates) == 0:
+            break  # only conflicts between pre-colored vertices are left
+        current = gamma[candidates, colors[candidates]]
+        delta = (gamma[candidates] - current[:, None]).astype(float)
+        delta[np.arange(len(candidates)), colors[candidates]] = np.inf
+        tabu = tabu_until[candidates] > iteration
+        delta[tabu & (conflicts + delta >= best)] = np.inf
+        if np.isinf(delta).all():
+            continue
+        # Random tie-breaking among the best moves
+        delta += rng.random(delta.shape) * 0.5
+        row, color = np.unravel_index(np.argmin(delta), delta.shape)
+        vertex, old = candidates[row], colors[candidates[row]]
+        neighbours = core.neighbors(vertex)
+        conflicts += int(gamma[vertex, color] - gamma[vertex, old])
+        np.add.at(gamma, (neighbours, old), -1)
+        np.add.at(gamma, (neighbours, color), 1)
+        colors[vertex] = color
+        tabu_until[vertex, old] = iteration + int(0.6 * conflicts) + int(rng.integers(10)) + 1
+        if conflicts < best:
+            best, best_colors = conflicts, colors.copy()
+    return {v: int(best_colors[v]) for v in range(1, core.num_vertices + 1)}
+
+
+def expected_num_colorings(network: VCPNetwork) -> float:
+    """
+    Estimate the number of proper colorings of the free vertices (first-moment estimate).
+
+    A uniformly random assignment of the available colors to the free vertices
+    satisfies each edge with a free endpoint with probability 1 - 1/k. Treating the
+    edges as independent gives k^n (1 - 1/k)^m. This is exact for forests without
+    pre-colored vertices and a rough estimate otherwise.
+
+    Parameters:
+    -----------
+    network : VCPNetwork
+        The graph network containing vertices and edges
+
+    Returns:
+    --------
+    float : Estimated number of colorings over the vertices with edges and no
+        pre-assigned color (0 if two pre-colored neighbours clash)
+    """
+    core = network.core
+    num_colors = network.available_colors
+    colors = core.color_idx
+    edges = core.edges
+    if len(edges) == 0:
+        return 1.0
+    u, v = edges[:, 0], edges[:, 1]
+    if np.any(u == v) or np.any((colors[u] >= 0) & (colors[u] == colors[v])):
+        return 0.0
+    constrained = int(np.count_nonzero((colors[u] < 0) | (colors[v] < 0)))
+    # k^n (1 - 1/k)^m = (k - 1)^m k^(n - m), kept in integers as far as possible
+    exponent = len(core.free_vertices()) - constrained
+    scale = num_colors ** exponent if exponent >= 0 else 1 / num_colors ** -exponent
+    try:
+        return float((num_colors - 1) ** constrained * scale)
+    except OverflowError:
+        return math.inf
+
+
+def _free_components(network: VCPNetwork) -> tuple:
+    """
+    Split the free vertices into groups connected through free-free edges.
+
+    Returns:
+    --------
+    tuple : (components, neighbors, domains) where components is a list of vertex
+        lists, neighbors maps each free vertex to its free neighbours, and domains maps
+        it to the colors left by its pre-colored neighbours. domains is None if the
+        pre-assigned colors already clash (or there is a self-loop).
+    """
+    core = network.core
+    colors = core.color_idx.tolist()
+    free = core.free_vertices().tolist()
+    neighbors = {v: set() for v in free}
+    domains = {v: set(range(network.available_colors)) for v in free}
+    for u, v in core.edges.tolist():
+        if u == v or (colors[u] >= 0 and colors[u] == colors[v]):
+            return [], neighbors, None
+        if colors[u] < 0 and colors[v] < 0:
+            neighbors[u].add(v)
+            neighbors[v].add(u)
+        elif colors[u] < 0:
+            domains[u].discard(colors[v])
+        elif colors[v] < 0:
+            domains[v].discard(colors[u])
+
+    components = []
+    seen = set()
+    for start in free:
+        if start in seen:
+            continue
+        seen.add(start)
+        component = [start]
+        for vertex in component:
+            for w in neighbors[vertex]:
+                if w not in seen:
+                    seen.add(w)
+                    component.append(w)
+        components.append(component)
+    return components, neighbors, domains
+
+
+def _elimination_order(component: list, neighbors: dict) -> tuple:
+    """Greedy min-degree elimination order of a component and its largest factor scope."""
+    graph = {v: set(neighbors[v]) for v in component}
+    order = []
+    width = 0
+    while graph:
+        vertex = min(graph, key=lambda v: (len(graph[v]), v))
+        adjacent = graph.pop(vertex)
+        width = max(width, len(adjacent) + 1)
+        for w in adjacent:
+            graph[w].discard(vertex)
+            graph[w] |= adjacent - {w}
+        order.append(vertex)
+    return order, width
+
+
+def _expand(table: np.ndarray, scope: tuple, union: tuple) -> np.ndarray:
+    """Broadcast a factor over scope to the axes of union (a superset of scope)."""
+    axes = sorted(range(len(scope)), key=lambda i: union.index(scope[i]))
+    table = np.transpose(table, axes)
+    shape = [table.shape[axes.index(scope.index(v))] if v in scope else 1 for v in union]
+    return table.reshape(shape)
+
+
+def _count_component(order: list, neighbors: dict, domains: dict, num_colors: int, dtype) -> int:
+    """Count the colorings of one component by variable elimination in the given order."""
+    different = 1 - np.eye(num_colors, dtype=dtype)
+    factors = []
+    for v in order:
+        factors.append(((v,), np.array([1 if c in domains[v] else 0 for c in range(num_colors)], dtype=dtype)))
+        factors.extend(((v, w), different) for w in neighbors[v] if v < w)
+
+    for vertex in order:
+        bucket = [factor for factor in factors if vertex in factor[0]]
+        factors = [factor for factor in factors if vertex not in factor[0]]
+        union = tuple(sorted({v for scope, _ in bucket for v in scope}))
+        product = np.ones([1] * len(union), dtype=dtype)
+        for scope, table in bucket:
+            product = product * _expand(table, scope, union)
+        summed = product.sum(axis=union.index(vertex))
+        scope = tuple(v for v in union if v != vertex)
+        if not scope and summed == 0:
+            return 0
+        factors.append((scope, summed))
+
+    count = 1
+    for _, table in factors:
+        count *= int(table)
+    return count
+
+
+def count_colorings(network: VCPNetwork, max_table_size: int = 1 << 22) -> Optional[int]:
+    """
+    Count the proper colorings of the free vertices exactly.
+
+    Pre-colored vertices only remove their color from the domains of their free
+    neighbours, so the free vertices fall apart into components connected by
+    free-free edges, and the count is the product over these components. Each
+    component is counted by variable elimination (dynamic programming over the tree
+    decomposition given by a min-degree elimination order): the "differ" factors of
+    a vertex's edges are multiplied and the vertex is summed out. The cost is about
+    k^width per vertex, where width is the largest factor scope.
+
+    Counts are exact integers. Vertices without edges are not counted, matching the
+    search space of the oracle (see oracle_vertices).
+
+    Parameters:
+    -----------
+    network : VCPNetwork
+        The graph network containing vertices and edges
+    max_table_size : int
+        Give up when a component needs a factor with more entries than this
+
+    Returns:
+    --------
+    int or None : Number of proper colorings, 0 if there is none, or None if some
+        component is too wide to count within max_table_size
+    """
+    num_colors = network.available_colors
+    components, neighbors, domains = _free_components(network)
+    if domains is None:
+        return 0
+
+    orders = []
+    for component in components:
+        order, width = _elimination_order(component, neighbors)
+        if num_colors ** width > max_table_size:
+            return None
+        orders.append(order)
+
+    count = 1
+    for order in orders:
+        # Entries count partial colorings, so they are bounded by k^|component|
+        dtype = np.int64 if num_colors ** len(order) < 1 << 62 else object
+        count *= _count_component(order, neighbors, domains, num_colors, dtype)
+        if count == 0:
+            return 0
+    return count
+
+
+def estimate_colorings(network: VCPNetwork, samples: int = 10000, seed: Optional[int] = None) -> float:
+    """
+    Estimate the number of proper colorings of the free vertices by sampling.
+
+    Sequential importance sampling (Knuth's estimator): vertices are colored in a
+    breadth-first order, each one uniformly among the colors its colored neighbours
+    leave, and the sample's weight is the product of the numbers of choices (0 at a
+    dead end). The mean weight is an unbiased estimate of the count.
+
+    Parameters:
+    -----------
+    network : VCPNetwork
+        The graph network containing vertices and edges
+    samples : int
+        Number of samples per component
+    seed : int, optional
+        Seed of the random generator
+
+    Returns:
+    --------
+    float : Estimated number of colorings (0.0 if the pre-assigned colors clash). An
+        estimate of 0.0 can also mean that no sample found a coloring, which does not
+        prove that none exists.
+    """
+    num_colors = network.available_colors
+    components, neighbors, domains = _free_components(network)
+    if domains is None:
+        return 0.0
+    rng = np.random.default_rng(seed)
+
+    log_estimate = 0.0
+    for component in components:
+        order = component  # breadth-first, so most vertices have a colored neighbour
+        position = {v: i for i, v in enumerate(order)}
+        earlier = [[position[w] for w in neighbors[v] if position[w] < i] for i, v in enumerate(order)]
+        allowed = np.array([[c in domains[v] for c in range(num_colors)] for v in order])
+        colors = np.zeros((samples, len(order)), dtype=np.int64)
+        log_weight = np.zeros(samples)
+        alive = np.ones(samples, dtype=bool)
+        for i in range(len(order)):
+            choices = np.repeat(allowed[i][None, :], samples, axis=0)
+            for j in earlier[i]:
+                choices[np.arange(samples), colors[:, j]] = False
+            counts = choices.sum(axis=1)
+            alive &= counts > 0
+            log_weight += np.log(np.maximum(counts, 1))
+            # Pick the r-th allowed color uniformly
+            picks = (rng.random(samples) * np.maximum(counts, 1)).astype(np.int64)
+            colors[:, i] = np.argmax(np.cumsum(choices, axis=1) > picks[:, None], axis=1)
+        if not alive.any():
+            return 0.0
+        scale = log_weight[alive].max()
+        log_estimate += scale + math.log(float(np.sum(np.exp(log_weight[alive] - scale))) / samples)
+    try:
+        return math.exp(log_estimate)
+    except OverflowError:
+        return math.inf
+
+
+def num_colorings(network: VCPNetwork, max_table_size: int = 1 << 22, samples: int = 10000,
+                  seed: Optional[int] = None) -> tuple:
+    """
+    Count the colorings exactly when feasible, and estimate them by sampling otherwise.
+
+    Returns:
+    --------
+    tuple : (count, exact) where count is an int if exact, else a float estimate
+    """
+    count = count_colorings(network, max_table_size=max_table_size)
+    if count is not None:
+        return count, True
+    return estimate_colorings(network, samples=samples, seed=seed), False
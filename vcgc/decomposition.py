@@ -0,0 +1,130 @@
+# A module that splits a coloring problem into connected components and solves them separately
+
+from typing import Callable, Optional
+from .network import VCPNetwork
+from .boolean import BooleanFunction, oracle_vertices
+from .synthesis import Synthesizer, SynthesisCache
+from .classical import find_coloring
+
+
+class ComponentDecomposition:
+    """
+    Connected-component decomposition of a vertex coloring problem.
+
+    Components are colored independently, so the oracle of each one only needs the
+    qubits of its own vertices. Components with the same canonical form (see
+    VCPNetwork.canonical_form) are isomorphic, including their pre-assigned colors,
+    and share one class: the canonical network of the class is synthesized and
+    solved once and the result is mapped onto every member.
+
+    Attributes:
+    -----------
+    network : VCPNetwork
+        The network being decomposed
+    components : list of tuples
+        (subnetwork, vertices) per component, see VCPNetwork.components
+    forms : list of CanonicalForm
+        Canonical form of every component
+    classes : list of int
+        Isomorphism class of every component
+    representatives : list of int
+        Index into components of the representative of every class
+    oracles : list
+        Synthesized oracle circuit per class (None for classes without free vertices),
+        filled by synthesize
+    """
+
+    def __init__(self, network: VCPNetwork):
+        self.network = network
+        self.components = network.components()
+        self.forms = [subnetwork.canonical_form() for subnetwork, _ in self.components]
+        self.classes = []
+        self.representatives = []
+        self.oracles = []
+        class_of = {}
+        for index, form in enumerate(self.forms):
+            if form.digest not in class_of:
+                class_of[form.digest] = len(self.representatives)
+                self.representatives.append(index)
+            self.classes.append(class_of[form.digest])
+
+    @property
+    def num_classes(self) -> int:
+        return len(self.representatives)
+
+    def synthesize(self, reduction: str = "balanced", exclude_invalid: bool = False,
+                   cache: Optional[SynthesisCache] = None) -> list:
+        """
+        Synthesize one oracle per isomorphism class.
+
+        Parameters:
+        -----------
+        reduction : str
+            How the edge constraints are joined, one of REDUCTION_MODES
+        exclude_invalid : bool
+            If True, forbid codes >= available_colors in the oracles
+        cache : SynthesisCache, optional
+            Persistent cache of synthesized circuits
+
+        Returns:
+        --------
+        list : Qiskit oracle circuit per class, None for classes without free vertices
+        """
+        bf = BooleanFunction()
+        self.oracles = []
+        for index in self.representatives:
+            subnetwork = self.forms[index].network
+            if not oracle_vertices(subnetwork):
+                self.oracles.append(None)
+                continue
+            function = bf.create_multi_bit_function(subnetwork, reduction=reduction, exclude_invalid=exclude_invalid)
+            self.oracles.append(Synthesizer(function, cache=cache).synthesize_with_xag())
+        return self.oracles
+
+    def max_qubits(self) -> int:
+        """Return the qubit count of the widest synthesized oracle (0 if none)."""
+        return max((oracle.num_qubits for oracle in self.oracles if oracle is not None), default=0)
+
+    def solve(self, solver: Callable[[VCPNetwork], Optional[dict]] = find_coloring) -> Optional[dict]:
+        """
+        Color every class representative with solver and merge the results.
+
+        Parameters:
+        -----------
+        solver : callable
+            Maps a canonical component network to a coloring of its vertices 1..n, or
+            None if it has none. Defaults to the classical backtracking search.
+
+        Returns:
+        --------
+        dict or None : Coloring of every vertex of the network, or None if some
+            component cannot be colored
+        """
+        solutions = []
+        for index in self.representatives:
+            coloring = solver(self.forms[index].network)
+            if coloring is None:
+                return None
+            solutions.append(coloring)
+        return self.merge(solutions)
+
+    def merge(self, solutions: list) -> dict:
+        """
+        Combine one representative coloring per class into a coloring of the network.
+
+        Parameters:
+        -----------
+        solutions : list of dict
+            Coloring of the canonical network of every class, keyed by its vertices 1..n
+
+        Returns:
+        --------
+        dict : Coloring of every vertex of the network. Vertices without edges keep
+            their pre-assigned color or get color 0.
+        """
+        color_idx = self.network.core.color_idx.tolist()
+        coloring = {v: max(color_idx[v], 0) for v in range(1, self.network.core.num_vertices + 1)}
+        for (_, vertices), cls, form in zip(self.components, self.classes, self.forms):
+            for vertex, color in form.to_original(solutions[cls]).items():
+                coloring[int(vertices[vertex - 1])] = color
+        return coloring
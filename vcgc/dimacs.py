@@ -1,46 +1,265 @@
 # This module contains functions to read and write DIMACS files.
 
-        
+import hashlib
+import mmap
+import os
+import re
+import tempfile
+from typing import Optional
+import numpy as np
+
+# Matches the start of any line that is not an edge descriptor ("e W V").
+_NON_EDGE_LINE = re.compile(rb'^(?!e[ \t])', re.MULTILINE)
+
+
+def _grow(edges: np.ndarray, count: int, needed: int) -> np.ndarray:
+    """Return a larger copy of the edge buffer when the header under-reports the edges."""
+    grown = np.empty((max(needed, 2 * edges.shape[0], 16), 2), dtype=np.int32)
+    grown[:count] = edges[:count]
+    return grown
+
+
+def _parse_edge_block(block: bytes) -> np.ndarray:
+    """
+    Parse a run of consecutive "e W V" lines in bulk.
+
+    Args:
+        block (bytes): Raw bytes containing only edge lines.
+
+    Returns:
+        np.ndarray: An (m, 2) int32 array of edges.
+    """
+    num_lines = block.count(b'\n') + (not block.endswith(b'\n'))
+    values = np.fromstring(block.replace(b'e', b' '), dtype=np.int64, sep=' ')
+    if values.size != 2 * num_lines:
+        raise ValueError("Malformed edge line in DIMACS file")
+    return values.astype(np.int32).reshape(-1, 2)
+
+
 def read_dimacs(file_path: str) -> tuple:
     """
-    Reads the DIMACS file for a Vertex Coloring Problem and returns the number of vertices, 
+    Reads the DIMACS file for a Vertex Coloring Problem and returns the number of vertices,
     number of edges, colored vertices, the list of edges, and available colors.
-    
+
+    The file is memory mapped and streamed line by line. Edges are written into a
+    preallocated int32 array sized from the "p edge" header, and runs of consecutive
+    edge lines (the whole body for edge-only files) are parsed in bulk.
+
     Args:
         file_path (str): The path to the DIMACS file.
-        
+
     Returns:
-        tuple: returns a tuple of the number of vertices, number of edges, colored vertices, 
-        the list of edges, and available colors.
+        tuple: returns a tuple of the number of vertices, number of edges, available colors,
+        an (m, 2) int32 array of edges, and a dict mapping colored vertices to color indices.
     """
-    with open(file_path, 'r') as f:
-        lines = f.readlines()
-
-    edges = []
-    colored_vertices = {}
     num_vertices = 0
     num_edges = 0
     available_colors = 0
+    colored_vertices = {}
+    edges = np.empty((0, 2), dtype=np.int32)
+    count = 0
+
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return num_vertices, num_edges, available_colors, edges, colored_vertices
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            pos = 0
+            while pos < size:
+                if mm[pos:pos + 2] in (b'e ', b'e\t'):
+                    # Fast path: bulk-parse every edge line up to the next non-edge line
+                    match = _NON_EDGE_LINE.search(mm, pos + 1)
+                    end = match.start() if match else size
+                    block = _parse_edge_block(mm[pos:end])
+                    if count + len(block) > edges.shape[0]:
+                        edges = _grow(edges, count, count + len(block))
+                    edges[count:count + len(block)] = block
+                    count += len(block)
+                    pos = end
+                    continue
+
+                end = mm.find(b'\n', pos)
+                end = size if end == -1 else end + 1
+                parts = mm[pos:end].split()
+                pos = end
+
+                if not parts or parts[0] == b'c':
+                    continue
+                elif parts[0] == b'p':
+                    num_vertices = int(parts[2])
+                    num_edges = int(parts[3])
+                    if num_edges > edges.shape[0]:
+                        edges = _grow(edges, count, count + num_edges)
+                elif parts[0] == b'e':
+                    # An edge line the fast path does not match, e.g. an indented one
+                    if count == edges.shape[0]:
+                        edges = _grow(edges, count, count + 1)
+                    edges[count] = (int(parts[1]), int(parts[2]))
+                    count += 1
+                elif parts[0] == b'n':
+                    colored_vertices[int(parts[1])] = int(parts[2])
+                elif parts[0] == b'x':
+                    if parts[1] == b'colors':
+                        available_colors = int(parts[2])
+                else:
+                    raise ValueError(f"Unrecognized DIMACS line: {b' '.join(parts).decode(errors='replace')}")
+
+    return num_vertices, num_edges, available_colors, edges[:count], colored_vertices
+
+
+def write_dimacs(file_path: str, num_vertices: int, edges, available_colors: int,
+                 colored_vertices: Optional[dict] = None, comments: tuple = ()) -> None:
+    """
+    Write a Vertex Coloring Problem in the DIMACS format read by read_dimacs.
+
+    Args:
+        file_path (str): The path of the file to write.
+        num_vertices (int): Number of vertices, labelled 1..num_vertices.
+        edges: (m, 2) array or list of (u, v) edges over 1-based vertex IDs.
+        available_colors (int): Number of available colors.
+        colored_vertices (dict, optional): Mapping of pre-colored vertices to color indices.
+        comments (tuple): Lines written as "c" comments at the top of the file.
+    """
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    lines = [f"c {comment}" for comment in comments]
+    lines.append(f"p edge {num_vertices} {len(edges)}")
+    lines.extend(f"n {vertex} {color}" for vertex, color in sorted((colored_vertices or {}).items()))
+    lines.extend(f"e {u} {v}" for u, v in edges.tolist())
+    lines.append(f"x colors {available_colors}")
+    with open(file_path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+
+
+# Layout version of the compiled graph cache; bump when the layout changes.
+_CACHE_VERSION = 2
+_CACHE_HEADER = 8
+
+
+def canonical_edges(edges: np.ndarray) -> np.ndarray:
+    """
+    Normalize an edge array so each undirected edge appears once as (u, v) with u <= v.
+
+    Args:
+        edges (np.ndarray): An (m, 2) array of edges, possibly listing both directions.
+
+    Returns:
+        np.ndarray: A deduplicated (m', 2) int32 array sorted by (u, v).
+    """
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    if len(edges) == 0:
+        return np.empty((0, 2), dtype=np.int32)
+    low = edges.min(axis=1)
+    high = edges.max(axis=1)
+    stride = int(high.max()) + 1
+    keys = np.unique(low * stride + high)
+    return np.stack((keys // stride, keys % stride), axis=1).astype(np.int32)
+
+
+def edges_to_csr(num_vertices: int, edges: np.ndarray) -> tuple:
+    """
+    Build a CSR adjacency from an edge array.
+
+    Row ``v`` holds the sorted, deduplicated neighbours of vertex ``v``; row 0 is
+    unused since DIMACS vertex IDs start at 1.
+
+    Args:
+        num_vertices (int): Number of vertices announced by the file.
+        edges (np.ndarray): An (m, 2) array of edges.
+
+    Returns:
+        tuple: the int32 ``indptr`` (length num_vertices + 2) and ``indices`` arrays.
+    """
+    edges = canonical_edges(edges)
+    size = max(num_vertices, int(edges.max()) if len(edges) else 0) + 1
+    src = np.concatenate((edges[:, 0], edges[:, 1]))
+    dst = np.concatenate((edges[:, 1], edges[:, 0]))
+    indptr = np.zeros(size + 1, dtype=np.int32)
+    np.cumsum(np.bincount(src, minlength=size), out=indptr[1:])
+    indices = dst[np.lexsort((dst, src))]
+    return indptr, indices
+
+
+def file_digest(file_path: str) -> str:
+    """
+    Return the SHA-256 hex digest of a file's contents.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_dimacs_cached(file_path: str, cache_dir: Optional[str] = None) -> tuple:
+    """
+    Read a DIMACS file through an on-disk binary cache.
+
+    The first read parses the text file and stores a compiled copy (edges, CSR
+    adjacency and per-vertex color indices in a single int32 ``.npy`` file) keyed by
+    the SHA-256 of the file contents. Later reads memory map that file, so the
+    returned arrays are zero-copy views.
+
+    Args:
+        file_path (str): The path to the DIMACS file.
+        cache_dir (str, optional): Directory holding compiled graphs. Defaults to a
+            ``.vcgc_cache`` directory next to the input file.
+
+    Returns:
+        tuple: the same values as :func:`read_dimacs`, followed by the CSR ``indptr``
+        and ``indices`` arrays.
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(file_path)), '.vcgc_cache')
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    cache_path = os.path.join(cache_dir, f"{stem}.{file_digest(file_path)[:32]}.v{_CACHE_VERSION}.npy")
+
+    if not os.path.exists(cache_path):
+        _compile_dimacs(file_path, cache_path)
+
+    data = np.load(cache_path, mmap_mode='r')
+    _, num_vertices, num_edges, available_colors, m, size = (int(x) for x in data[:6])
+    offset = _CACHE_HEADER
+    edges = data[offset:offset + 2 * m].reshape(m, 2)
+    offset += 2 * m
+    indptr = data[offset:offset + size + 1]
+    offset += size + 1
+    indices = data[offset:offset + int(indptr[-1])]
+    offset += int(indptr[-1])
+    color_idx = data[offset:offset + size]
+
+    colored = np.flatnonzero(color_idx >= 0)
+    colored_vertices = dict(zip(colored.tolist(), color_idx[colored].tolist()))
+    return num_vertices, num_edges, available_colors, edges, colored_vertices, indptr, indices
+
+
+def _compile_dimacs(file_path: str, cache_path: str) -> None:
+    """Parse a DIMACS file and write its compiled form to ``cache_path``."""
+    num_vertices, num_edges, available_colors, edges, colored_vertices = read_dimacs(file_path)
+    indptr, indices = edges_to_csr(num_vertices, edges)
+    size = len(indptr) - 1
+    color_idx = np.full(size, -1, dtype=np.int32)
+    for vertex, color in colored_vertices.items():
+        if 0 <= vertex < size:
+            color_idx[vertex] = color
+
+    header = np.zeros(_CACHE_HEADER, dtype=np.int32)
+    header[:6] = (_CACHE_VERSION, num_vertices, num_edges, available_colors, len(edges), size)
+    data = np.concatenate((header, edges.ravel(), indptr, indices, color_idx))
 
-    for line in lines:
-        if line.startswith('p edge'):
-            parts = line.split()
-            num_vertices = int(parts[2])
-            num_edges = int(parts[3])
-        elif line.startswith('c'):
-            continue
-        elif line.startswith('n'):
-            parts = line.split()
-            node = parts[1]
-            color = parts[2]
-            colored_vertices[node] = color
-        elif line.startswith('x colors'):
-            parts = line.split()
-            available_colors = int(parts[2])
-        else:
-            parts = line.split()
-            W = int(parts[1])
-            V = int(parts[2])
-            edges.append((W,V))
-
-    return num_vertices, num_edges, available_colors, edges, colored_vertices
\ No newline at end of file
+    # Write to a temporary file first so concurrent readers never see a partial cache
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, data)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,150 @@
+# A module that solves only the hard core of a coloring problem with the quantum search
+
+from typing import Callable, Optional
+import numpy as np
+from .network import VCPNetwork
+from .classical import dsatur, tabu_search, count_colorings
+from .simulation import grover_solve
+
+
+class HybridSolver:
+    """
+    Classical heuristic first, Grover search only for what it leaves unresolved.
+
+    DSATUR followed by tabu search colors the network with few conflicts. The free
+    vertices of the conflicting edges, grown by a radius of free neighbours, form
+    the hard core. The residual problem is the subnetwork of the core and its
+    neighbours, with every non-core vertex pre-colored as the heuristic colored it.
+    Pre-colored vertices are oracle constants, so the oracle, and with it the Grover
+    circuit built by the solver, only has qubits for the core. When the boundary
+    admits no coloring of the core, the radius grows.
+
+    Attributes:
+    -----------
+    network : VCPNetwork
+        The network being colored
+    heuristic : dict
+        The coloring found by the classical heuristic
+    conflicts : int
+        Number of conflicting edges of heuristic
+    radius : int
+        Radius of the last residual problem built by solve, None before
+    residual : tuple
+        (subnetwork, vertices) of the last residual problem built by solve, None before
+    """
+
+    def __init__(self, network: VCPNetwork, tabu_iterations: int = 10000, seed: Optional[int] = None):
+        """
+        Parameters:
+        -----------
+        network : VCPNetwork
+            The network to color
+        tabu_iterations : int
+            Move limit of the tabu search
+        seed : int, optional
+            Seed of the tabu search
+        """
+        self.network = network
+        self.heuristic = tabu_search(network, dsatur(network), max_iterations=tabu_iterations, seed=seed)
+        colors = self._colors(self.heuristic)
+        core = network.core
+        self._conflicting = core.edges[colors[core.edges[:, 0] - 1] == colors[core.edges[:, 1] - 1]]
+        self.conflicts = len(self._conflicting)
+        self.radius = None
+        self.residual = None
+
+    def _colors(self, coloring: dict) -> np.ndarray:
+        return np.array([coloring[v] for v in range(1, self.network.core.num_vertices + 1)], dtype=np.int64)
+
+    def hard_core(self, radius: int = 0) -> np.ndarray:
+        """
+        Return the free vertices within radius free-vertex steps of a conflicting edge.
+
+        Parameters:
+        -----------
+        radius : int
+            Number of times the core is grown by its free neighbours
+
+        Returns:
+        --------
+        numpy.ndarray : Vertex IDs in ascending order
+        """
+        core = self.network.core
+        free = np.zeros(core.num_vertices + 1, dtype=bool)
+        free[core.free_vertices()] = True
+        member = np.zeros_like(free)
+        member[self._conflicting.ravel()] = True
+        member &= free
+        for _ in range(radius):
+            frontier = np.flatnonzero(member)
+            neighbours = np.concatenate([core.neighbors(v) for v in frontier]) if len(frontier) else frontier
+            grown = member.copy()
+            grown[neighbours] = True
+            grown &= free
+            if (grown == member).all():
+                break
+            member = grown
+        return np.flatnonzero(member)
+
+    def residual_problem(self, radius: int = 0) -> tuple:
+        """
+        Build the residual problem of the hard core of a radius.
+
+        Parameters:
+        -----------
+        radius : int
+            Radius of the hard core, see hard_core
+
+        Returns:
+        --------
+        tuple : (subnetwork, vertices) as in VCPNetwork.components: the network of the
+            core and its neighbours with the neighbours pre-colored, and the original
+            vertex ID of each of its vertices 1..n
+        """
+        core = self.network.core
+        members = self.hard_core(radius)
+        boundary = np.concatenate([core.neighbors(v) for v in members]) if len(members) else members
+        vertices = np.union1d(members, boundary)
+        subnetwork = self.network.subnetwork(vertices)
+        in_core = np.isin(vertices, members)
+        subnetwork.fix_colors({i: self.heuristic[int(v)] for i, v in enumerate(vertices.tolist(), start=1)
+                               if not in_core[i - 1] and core.color_idx[v] < 0})
+        return subnetwork, vertices
+
+    def solve(self, solver: Callable[[VCPNetwork], Optional[dict]] = grover_solve,
+              max_radius: int = 2) -> Optional[dict]:
+        """
+        Color the network, running solver on the residual problem only.
+
+        Parameters:
+        -----------
+        solver : callable
+            Maps a residual network to a coloring of its vertices 1..n, or None.
+            Defaults to the simulated Grover search.
+        max_radius : int
+            Largest radius tried before giving up
+
+        Returns:
+        --------
+        dict or None : Proper coloring of every vertex, or None if neither the
+            heuristic nor the solver found one
+        """
+        if self.conflicts == 0:
+            return dict(self.heuristic)
+        colors = self._colors(self.heuristic)
+        for radius in range(max_radius + 1):
+            if radius and np.array_equal(self.hard_core(radius), self.hard_core(radius - 1)):
+                break  # the core stopped growing
+            subnetwork, vertices = self.residual_problem(radius)
+            self.radius, self.residual = radius, (subnetwork, vertices)
+            if count_colorings(subnetwork) == 0:
+                continue  # the boundary colors leave the core no coloring
+            coloring = solver(subnetwork)
+            if coloring is None:
+                continue
+            solved = colors.copy()
+            solved[vertices - 1] = [coloring[i] for i in range(1, len(vertices) + 1)]
+            conflicts, _ = self.network.verify_colorings(solved)
+            if conflicts[0] == 0:
+                return {v: int(color) for v, color in enumerate(solved.tolist(), start=1)}
+        return None
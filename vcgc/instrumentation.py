@@ -0,0 +1,132 @@
+# A module to record per-stage wall time, CPU time and memory across the pipeline
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Optional
+
+try:
+    import resource  # Unix only, used for the peak resident set size
+except ImportError:
+    resource = None
+
+# Profiles that are currently recording, innermost last
+_active = []
+
+
+def _peak_rss_kb() -> Optional[int]:
+    """Return the process's peak resident set size in KiB, or None where unavailable."""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class Profile:
+    """
+    Stage records collected while a profile is active (see profile).
+
+    Every record is a dict with the stage name, wall and CPU seconds, the process's
+    peak RSS at the end of the stage and, when memory tracing is on, the peak
+    Python allocation during the stage relative to its start.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.records = []
+        self._open = []  # [start traced bytes, highest traced peak seen by nested stages] per open stage
+
+    def summary(self) -> dict:
+        """
+        Aggregate the records by stage name.
+
+        Returns:
+        --------
+        dict : stage name -> {"calls", "wall_s", "cpu_s", "peak_rss_kb", "peak_traced_kb"},
+            with times summed and peaks maximized over the calls
+        """
+        stages = {}
+        for record in self.records:
+            entry = stages.setdefault(record["stage"], {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0,
+                                                        "peak_rss_kb": None, "peak_traced_kb": None})
+            entry["calls"] += 1
+            entry["wall_s"] += record["wall_s"]
+            entry["cpu_s"] += record["cpu_s"]
+            for field in ("peak_rss_kb", "peak_traced_kb"):
+                if record[field] is not None:
+                    entry[field] = max(entry[field] or 0, record[field])
+        return stages
+
+
+@contextmanager
+def profile(trace_memory: bool = False):
+    """
+    Record every stage entered in this block.
+
+    Parameters:
+    -----------
+    trace_memory : bool
+        If True, also measure per-stage Python allocation peaks with tracemalloc.
+        This slows the pipeline down noticeably, so it is off by default.
+
+    Yields:
+    -------
+    Profile : The profile being filled
+    """
+    current = Profile(trace_memory=trace_memory)
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    _active.append(current)
+    try:
+        yield current
+    finally:
+        _active.remove(current)
+        if started_tracing:
+            tracemalloc.stop()
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Time a pipeline stage for the active profiles; does nothing when none is active.
+
+    Parameters:
+    -----------
+    name : str
+        Stage name, e.g. "xag_synth"
+    """
+    if not _active:
+        yield
+        return
+
+    tracing = tracemalloc.is_tracing() and any(p.trace_memory for p in _active)
+    if tracing:
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        # reset_peak clears the peak of enclosing stages too, so they keep their own running maximum
+        peak = tracemalloc.get_traced_memory()[1]
+        for p in _active:
+            for opened in p._open:
+                opened[1] = max(opened[1], peak)
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        for p in _active:
+            p._open.append([start_bytes, 0])
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall
+        cpu = time.process_time() - cpu
+        peak_traced_kb = None
+        if tracing:
+            peak = tracemalloc.get_traced_memory()[1]
+            for p in _active:
+                start_bytes, nested_peak = p._open.pop()
+                for opened in p._open:
+                    opened[1] = max(opened[1], peak, nested_peak)
+                peak_traced_kb = max(peak, nested_peak, start_bytes) - start_bytes >> 10
+        record = {"stage": name, "wall_s": wall, "cpu_s": cpu, "peak_rss_kb": _peak_rss_kb(),
+                  "peak_traced_kb": peak_traced_kb}
+        for p in _active:
+            p.records.append(record)
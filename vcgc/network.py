@@ -1,73 +1,540 @@
 # This module is to create and visualize NetworkX graphs
 
 import networkx as nx
+import numpy as np
 from matplotlib import pyplot as plt
 from .dimacs import *
+from .canonical import CanonicalForm
 import random
 from typing import Optional
 from networkx import bfs_tree
 
+DEFAULT_COLOR_MAP = ['red', 'green', 'blue', 'orange', 'purple', 'cyan', 'magenta', 'yellow']
+
+
+class GraphCore:
+    """
+    Compact array representation of a vertex coloring instance.
+
+    Vertex IDs index the per-vertex arrays directly (entry 0 is unused since DIMACS
+    IDs start at 1). Edges are canonical: each undirected edge appears once as
+    (u, v) with u <= v, sorted by (u, v).
+
+    Attributes:
+    -----------
+    num_vertices : int
+        Number of vertices, numbered 1..num_vertices
+    edges : numpy.ndarray
+        (m, 2) int32 array of canonical edges
+    degrees : numpy.ndarray
+        int32 degree of every vertex
+    color_idx : numpy.ndarray
+        int32 pre-assigned color of every vertex, -1 if uncolored
+    indptr, indices : numpy.ndarray
+        CSR adjacency, the neighbours of v are indices[indptr[v]:indptr[v + 1]]
+    """
+
+    __slots__ = ('num_vertices', 'edges', 'degrees', 'color_idx', 'indptr', 'indices')
+
+    def __init__(self, num_vertices: int = 0, edges=None, colored_nodes: Optional[dict] = None,
+                 num_colors: int = 0, indptr: Optional[np.ndarray] = None, indices: Optional[np.ndarray] = None):
+        self.edges = canonical_edges(np.empty((0, 2)) if edges is None else edges)
+        if indptr is None or indices is None:
+            indptr, indices = edges_to_csr(num_vertices, self.edges)
+        self.indptr = indptr
+        self.indices = indices
+        self.num_vertices = len(indptr) - 2
+        self.degrees = np.diff(indptr).astype(np.int32)
+
+        self.color_idx = np.full(self.num_vertices + 1, -1, dtype=np.int32)
+        for v, c in (colored_nodes or {}).items():
+            v, c = int(v), int(c)
+            if 1 <= v <= self.num_vertices and 0 <= c < num_colors:
+                self.color_idx[v] = c
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.edges)
+
+    def vertices(self) -> np.ndarray:
+        """Return all vertex IDs in ascending order."""
+        return np.arange(1, self.num_vertices + 1)
+
+    def used_vertices(self) -> np.ndarray:
+        """Return the IDs of vertices that appear in at least one edge, in ascending order."""
+        return np.flatnonzero(self.degrees)
+
+    def free_vertices(self) -> np.ndarray:
+        """Return the IDs of vertices that appear in an edge and have no pre-assigned color."""
+        return np.flatnonzero((self.degrees > 0) & (self.color_idx < 0))
+
+    def neighbors(self, v: int) -> np.ndarray:
+        """Return the sorted neighbours of vertex v."""
+        return self.indices[self.indptr[v]:self.indptr[v + 1]]
+
+    def component_labels(self) -> np.ndarray:
+        """
+        Label every vertex with the index of its connected component.
+
+        Components are numbered in order of their smallest vertex and discovered by
+        a breadth-first search that expands a whole frontier per step through the
+        CSR arrays. Isolated vertices form components of their own.
+
+        Returns:
+        --------
+        labels : numpy.ndarray
+            int32 component index of every vertex, -1 for the unused entry 0
+        """
+        labels = np.full(self.num_vertices + 1, -1, dtype=np.int32)
+        label = 0
+        for vertex in range(1, self.num_vertices + 1):
+            if labels[vertex] >= 0:
+                continue
+            labels[vertex] = label
+            frontier = np.array([vertex])
+            while frontier.size:
+                counts = self.degrees[frontier]
+                starts = np.repeat(self.indptr[frontier] - np.cumsum(counts) + counts, counts)
+                neighbors = self.indices[starts + np.arange(counts.sum())]
+                frontier = np.unique(neighbors[labels[neighbors] < 0])
+                labels[frontier] = label
+            label += 1
+        return labels
+
+    def greedy_clique(self) -> list:
+        """
+        Grow a maximal clique greedily from the vertex of highest degree.
+
+        Each step adds the candidate (a common neighbour of the clique so far) with
+        the most neighbours among the remaining candidates.
+
+        Returns:
+        --------
+        list : Vertex IDs of the clique in the order they were added, empty if there are no vertices
+        """
+        if self.num_vertices == 0:
+            return []
+        vertex = int(np.argmax(self.degrees[1:])) + 1
+        clique = [vertex]
+        candidates = set(self.neighbors(vertex).tolist()) - {vertex}
+        while candidates:
+            vertex = max(sorted(candidates), key=lambda v: len(candidates.intersection(self.neighbors(v).tolist())))
+            clique.append(vertex)
+            candidates.intersection_update(self.neighbors(vertex).tolist())
+            candidates.discard(vertex)
+        return clique
+
+    def edge_groups(self) -> list:
+        """
+        Partition the edge indices into vertex stars.
+
+        Vertices are visited by decreasing degree and each one claims its incident
+        edges that are not yet assigned, so edges sharing a vertex end up together.
+
+        Returns:
+        --------
+        groups : list of lists
+            Indices into self.edges, one list per star
+        """
+        incident = [[] for _ in range(self.num_vertices + 1)]
+        for i, (u, v) in enumerate(self.edges.tolist()):
+            incident[u].append(i)
+            if v != u:
+                incident[v].append(i)
+
+        assigned = np.zeros(self.num_edges, dtype=bool)
+        groups = []
+        for vertex in np.argsort(-self.degrees, kind='stable').tolist():
+            group = [i for i in incident[vertex] if not assigned[i]]
+            if group:
+                assigned[group] = True
+                groups.append(group)
+        return groups
+
+    def to_networkx(self, color_map: list) -> nx.Graph:
+        """
+        Build the equivalent networkx graph with 'color' and 'color_idx' node attributes.
+
+        Parameters:
+        -----------
+        color_map : list
+            Color names indexed by color index
+
+        Returns:
+        --------
+        graph : networkx.Graph
+        """
+        graph = nx.Graph()
+        graph.add_nodes_from(
+            (v, {'color': color_map[c] if c >= 0 else 'lightgray', 'color_idx': c})
+            for v, c in enumerate(self.color_idx[1:].tolist(), start=1)
+        )
+        graph.add_edges_from(self.edges.tolist())
+        return graph
+
+
+class GraphReduction:
+    """
+    Result of VCPNetwork.reduce: the reduced network and how to undo the reduction.
+
+    Removed vertices are recolored in reverse removal order. Each one takes the
+    smallest color not used by its already colored neighbours, which always exists:
+    a peeled vertex had fewer than k neighbours left when it was removed, and a
+    dominated vertex can at least reuse the color of the vertex dominating it.
+
+    Attributes:
+    -----------
+    network : VCPNetwork
+        The original network
+    reduced : VCPNetwork
+        The network induced by the remaining vertices, relabeled to 1..n, with
+        num_colors available colors
+    vertices : numpy.ndarray
+        Original IDs of the vertices of reduced
+    removed : list of int
+        Original IDs of the removed vertices, in removal order
+    num_colors : int
+        Number of colors k the reduction was computed for
+    """
+
+    def __init__(self, network: 'VCPNetwork', removed: list, num_colors: int):
+        self.network = network
+        self.removed = removed
+        self.num_colors = num_colors
+        keep = np.ones(network.core.num_vertices + 1, dtype=bool)
+        keep[0] = False
+        keep[removed] = False
+        self.vertices = np.flatnonzero(keep)
+        self.reduced = network.subnetwork(self.vertices, num_colors=num_colors)
+
+    def reconstruct(self, coloring: dict) -> dict:
+        """
+        Extend a coloring of the reduced network to the original network.
+
+        Parameters:
+        -----------
+        coloring : dict
+            Color of every vertex 1..n of the reduced network
+
+        Returns:
+        --------
+        dict : Color of every vertex of the original network
+        """
+        core = self.network.core
+        colors = np.full(core.num_vertices + 1, -1, dtype=np.int64)
+        for vertex, color in coloring.items():
+            colors[self.vertices[vertex - 1]] = color
+        for vertex in reversed(self.removed):
+            used = set(colors[core.neighbors(vertex)].tolist())
+            colors[vertex] = next(c for c in range(self.num_colors) if c not in used)
+        return {v: int(colors[v]) for v in range(1, core.num_vertices + 1)}
+
+
 class VCPNetwork:
 
-    def __init__(self, file_path: str = None):
-        self.edges = []
+    def __init__(self, file_path: str = None, use_cache: bool = False, cache_dir: Optional[str] = None):
+        self.edges = np.empty((0, 2), dtype=np.int32)
         self.colored_vertices = {}
         self.num_vertices = 0
         self.num_edges = 0
         self.available_colors = 0
-        self.graph = nx.Graph()  # Declare a graph object
+        self.core = GraphCore()
+        self._graph = None  # networkx view of self.core, built on first access
         self.color_map = []
         if file_path:
-            self.read_dimacs(file_path=file_path) 
+            self.read_dimacs(file_path=file_path, use_cache=use_cache, cache_dir=cache_dir)
+
+    @property
+    def graph(self) -> nx.Graph:
+        """
+        The networkx view of the network, built lazily from self.core.
+
+        Only drawing, traversal and other networkx-based helpers need it; boolean
+        function generation reads the arrays in self.core directly.
+        """
+        if self._graph is None:
+            self._graph = self.core.to_networkx(self.color_map)
+        return self._graph
     
-    def read_dimacs(self, file_path: str) -> None:
-        self.num_vertices, self.num_edges, self.available_colors, self.edges, self.colored_vertices = read_dimacs(file_path=file_path)
-        self.create_colored_graph(self.num_vertices, self.edges, self.colored_vertices, self.available_colors)
+    def read_dimacs(self, file_path: str, use_cache: bool = False, cache_dir: Optional[str] = None) -> None:
+        """
+        Load the network from a DIMACS file.
 
-    def create_colored_graph(self, num_vertices: int, edges: list, colored_nodes: dict, num_colors: int,
-                              color_map: list = ['red', 'green', 'blue', 'orange', 'purple', 'cyan', 'magenta', 'yellow']) -> nx.Graph:
+        Parameters:
+        -----------
+        file_path : str
+            Path to the DIMACS file
+        use_cache : bool, optional
+            If True, read through the compiled binary cache (see read_dimacs_cached)
+        cache_dir : str, optional
+            Cache directory, defaults to a .vcgc_cache directory next to the input
         """
-        Generate a graph with colored nodes.
+        indptr = indices = None
+        if use_cache:
+            (self.num_vertices, self.num_edges, self.available_colors, self.edges,
+             self.colored_vertices, indptr, indices) = read_dimacs_cached(file_path=file_path, cache_dir=cache_dir)
+        else:
+            self.num_vertices, self.num_edges, self.available_colors, self.edges, self.colored_vertices = read_dimacs(file_path=file_path)
+        self.create_graph_core(self.num_vertices, self.edges, self.colored_vertices, self.available_colors,
+                               indptr=indptr, indices=indices)
+
+    def create_graph_core(self, num_vertices: int, edges, colored_nodes: dict, num_colors: int,
+                          color_map: list = DEFAULT_COLOR_MAP, indptr: Optional[np.ndarray] = None,
+                          indices: Optional[np.ndarray] = None) -> GraphCore:
+        """
+        Build the array-backed graph core. The networkx graph is rebuilt on next access.
         
         Parameters:
         -----------
         num_vertices : int
             Number of vertices in the graph
-        edges : list of tuples
-            List of edges as (source, target) tuples
+        edges : numpy.ndarray or list of tuples
+            (m, 2) array of edges, or a list of (source, target) tuples
         colored_nodes : dict
-            Dictionary mapping node IDs (as strings) to color indices (as strings)
+            Dictionary mapping node IDs to color indices
         num_colors : int
             Number of available colors
+        color_map : list, optional
+            Color names used when drawing colored nodes
+        indptr, indices : numpy.ndarray, optional
+            Precomputed CSR adjacency (e.g. from the compiled graph cache)
             
         Returns:
         --------
-        graph : networkx.Graph
-                The generated graph with color attributes embedded in nodes
+        core : GraphCore
         """
-        
         # Ensure we have enough colors
         if num_colors > len(color_map):
             color_map = color_map * (num_colors // len(color_map) + 1)
-        color_map = color_map[:num_colors]
-        
-        # Create vertices with color attributes
-        for v in range(1,num_vertices+1):
-            # Check if this node has a color assigned
-            if str(v) in colored_nodes:
-                color_idx = int(colored_nodes[str(v)])
-                if 0 <= color_idx < num_colors:
-                    # Add node with color attribute directly
-                    self.graph.add_node(v, color=color_map[color_idx], color_idx=color_idx)
-                else:
-                    self.graph.add_node(v, color='lightgray', color_idx=-1)
-            else:
-                self.graph.add_node(v, color='lightgray', color_idx=-1)
-        
-        # Add edges
-        for e in edges:
-            self.graph.add_edge(*e)
+        self.color_map = color_map[:num_colors]
+
+        self.core = GraphCore(num_vertices, edges, colored_nodes, num_colors, indptr=indptr, indices=indices)
+        self._graph = None
+        return self.core
+
+    def fix_colors(self, assignment: dict) -> None:
+        """
+        Pre-assign colors to vertices, as if they were given by "n <node> <color>" lines.
+
+        Parameters:
+        -----------
+        assignment : dict
+            Mapping of vertex IDs to color indices, merged into colored_vertices
+        """
+        self.colored_vertices = {**self.colored_vertices, **assignment}
+        self.create_graph_core(self.core.num_vertices, self.core.edges, self.colored_vertices, self.available_colors,
+                               color_map=self.color_map or DEFAULT_COLOR_MAP, indptr=self.core.indptr,
+                               indices=self.core.indices)
+
+    def verify_colorings(self, colors, max_elements: int = 1 << 24) -> tuple:
+        """
+        Find the conflicting edges of a batch of candidate colorings at once.
+
+        Every row is checked against the edge index arrays in one vectorized
+        comparison. Rows are processed in blocks of at most max_elements compared
+        edge endpoints, so millions of samples fit in memory.
+
+        Parameters:
+        -----------
+        colors : array-like
+            (rows, num_vertices) integer matrix, column v - 1 holding the color of
+            vertex v, or a single coloring as a 1-D array
+        max_elements : int
+            Upper bound on rows * num_edges per block
+
+        Returns:
+        --------
+        tuple : (conflicts, first_conflict). conflicts is the int64 number of
+            monochromatic edges per row; first_conflict is an int64 (rows, 2) array
+            with the first such edge (u, v) in edge order, or (-1, -1) for proper rows.
+        """
+        colors = np.atleast_2d(np.asarray(colors))
+        if colors.ndim != 2 or colors.shape[1] != self.core.num_vertices:
+            raise ValueError(f"Expected a (rows, {self.core.num_vertices}) coloring matrix, got shape {colors.shape}")
+        rows = len(colors)
+        conflicts = np.zeros(rows, dtype=np.int64)
+        first_conflict = np.full((rows, 2), -1, dtype=np.int64)
+        edges = self.core.edges
+        if len(edges) == 0:
+            return conflicts, first_conflict
+
+        heads = edges[:, 0].astype(np.intp) - 1
+        tails = edges[:, 1].astype(np.intp) - 1
+        step = max(1, max_elements // len(edges))
+        for start in range(0, rows, step):
+            block = colors[start:start + step]
+            clash = block[:, heads] == block[:, tails]
+            conflicts[start:start + step] = clash.sum(axis=1)
+            hit = clash.any(axis=1)
+            first_conflict[start:start + step][hit] = edges[clash[hit].argmax(axis=1)]
+        return conflicts, first_conflict
+
+    def subnetwork(self, vertices, num_colors: Optional[int] = None) -> 'VCPNetwork':
+        """
+        Build the network induced by a set of vertices, relabeled to 1..len(vertices).
+
+        Parameters:
+        -----------
+        vertices : array-like
+            Distinct vertex IDs of this network; vertices[i] becomes vertex i + 1
+        num_colors : int, optional
+            Available colors of the induced network, defaults to available_colors
+
+        Returns:
+        --------
+        network : VCPNetwork
+            The induced network with the same pre-assigned colors
+        """
+        num_colors = self.available_colors if num_colors is None else num_colors
+        vertices = np.asarray(vertices, dtype=np.int64)
+        relabel = np.zeros(self.core.num_vertices + 1, dtype=np.int32)
+        relabel[vertices] = np.arange(1, len(vertices) + 1)
+        edges = relabel[self.core.edges]
+        edges = edges[(edges[:, 0] > 0) & (edges[:, 1] > 0)]
+        colors = self.core.color_idx[vertices].tolist()
+
+        network = VCPNetwork()
+        network.num_vertices = len(vertices)
+        network.num_edges = len(edges)
+        network.available_colors = num_colors
+        network.edges = edges
+        network.colored_vertices = {i: c for i, c in enumerate(colors, start=1) if c >= 0}
+        network.create_graph_core(network.num_vertices, edges, network.colored_vertices, num_colors,
+                                  color_map=self.color_map or DEFAULT_COLOR_MAP)
+        return network
+
+    def reduce(self, k: Optional[int] = None, dominated: bool = True) -> GraphReduction:
+        """
+        Remove vertices whose color can always be chosen after the rest is colored.
+
+        Two rules are applied until neither removes anything:
+        - peeling: a free vertex with fewer than k remaining neighbours
+        - domination: a free vertex u with a non-adjacent vertex v such that every
+          remaining neighbour of u is also a neighbour of v (u can reuse v's color)
+        Pre-colored vertices are never removed.
+
+        Parameters:
+        -----------
+        k : int, optional
+            Number of colors, defaults to available_colors; the reduced network
+            gets k available colors
+        dominated : bool, optional
+            If False, only peel low-degree vertices
+
+        Returns:
+        --------
+        reduction : GraphReduction
+            The reduced network and the reconstruction step
+        """
+        k = self.available_colors if k is None else k
+        core = self.core
+        if core.color_idx.max(initial=-1) >= k:
+            raise ValueError(f"k={k} is smaller than the number of pre-assigned colors")
+        adjacency = [set(core.neighbors(v).tolist()) for v in range(core.num_vertices + 1)]
+        free = (core.color_idx < 0).tolist()
+        alive = [True] * (core.num_vertices + 1)
+        removed = []
+
+        def remove(vertex):
+            alive[vertex] = False
+            removed.append(vertex)
+            for neighbor in adjacency[vertex]:
+                adjacency[neighbor].discard(vertex)
+
+        changed = True
+        while changed:
+            changed = False
+            # Peel low-degree vertices with a worklist; removals may expose new ones
+            stack = [v for v in range(1, core.num_vertices + 1) if alive[v] and free[v] and len(adjacency[v]) < k]
+            while stack:
+                vertex = stack.pop()
+                if not alive[vertex] or len(adjacency[vertex]) >= k:
+                    continue
+                neighbors = list(adjacency[vertex])
+                remove(vertex)
+                stack.extend(w for w in neighbors if free[w] and len(adjacency[w]) < k)
+                changed = True
+
+            if not dominated:
+                break
+            for vertex in range(1, core.num_vertices + 1):
+                if not (alive[vertex] and free[vertex] and adjacency[vertex]):
+                    continue
+                neighbors = adjacency[vertex]
+                # Dominating vertices share every neighbour, so search next to the sparsest one
+                pivot = min(neighbors, key=lambda w: len(adjacency[w]))
+                for candidate in adjacency[pivot]:
+                    if candidate != vertex and candidate not in neighbors and neighbors <= adjacency[candidate]:
+                        remove(vertex)
+                        changed = True
+                        break
+
+        return GraphReduction(self, removed, k)
+
+    def canonical_form(self, max_leaves: int = 10000) -> CanonicalForm:
+        """
+        Relabel the network into a canonical vertex order.
+
+        The order comes from color refinement (1-WL, seeded with the pre-assigned
+        colors) followed by an individualization-refinement search for the labelling
+        with the smallest certificate. Isomorphic networks map to the same canonical
+        network, so oracle generation and synthesis on it can be shared.
+
+        Parameters:
+        -----------
+        max_leaves : int, optional
+            Search budget, see CanonicalForm.certified
+
+        Returns:
+        --------
+        form : CanonicalForm
+            The canonical network and the permutation back to this network
+        """
+        return CanonicalForm(self, max_leaves=max_leaves)
+
+    def components(self, include_isolated: bool = False) -> list:
+        """
+        Split the network into its connected components.
+
+        Parameters:
+        -----------
+        include_isolated : bool, optional
+            If True, vertices without edges are returned as one-vertex components
+
+        Returns:
+        --------
+        components : list of tuples
+            (subnetwork, vertices) per component, where vertices holds the original
+            IDs of the subnetwork's vertices 1..len(vertices)
+        """
+        labels = self.core.component_labels()[1:]
+        vertices = np.argsort(labels, kind='stable') + 1
+        groups = np.split(vertices, np.flatnonzero(np.diff(labels[vertices - 1])) + 1)
+        return [(self.subnetwork(group), group) for group in groups
+                if len(group) and (include_isolated or len(group) > 1)]
+
+    def create_colored_graph(self, num_vertices: int, edges, colored_nodes: dict, num_colors: int,
+                              color_map: list = DEFAULT_COLOR_MAP) -> nx.Graph:
+        """
+        Generate a graph with colored nodes.
         
+        Parameters:
+        -----------
+        num_vertices : int
+            Number of vertices in the graph
+        edges : numpy.ndarray or list of tuples
+            (m, 2) array of edges, or a list of (source, target) tuples
+        colored_nodes : dict
+            Dictionary mapping node IDs to color indices
+        num_colors : int
+            Number of available colors
+            
+        Returns:
+        --------
+        graph : networkx.Graph
+                The generated graph with color attributes embedded in nodes
+        """
+        self.create_graph_core(num_vertices, edges, colored_nodes, num_colors, color_map=color_map)
         return self.graph
     
     def draw_graph(self, pos: Optional[dict] = None, name: Optional[str] = None, figsize: tuple =(5, 5), node_size: int = 2000) -> None:
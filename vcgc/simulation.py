@@ -0,0 +1,347 @@
+# A module that simulates Grover circuits on the CPU and decodes the measured colorings
+
+from math import ceil, log2
+from typing import Optional, Sequence
+import numpy as np
+from qiskit import ClassicalRegister, QuantumCircuit, transpile
+from qiskit.quantum_info import Statevector
+from .network import VCPNetwork
+from .boolean import BooleanFunction, oracle_vertices
+from .synthesis import Synthesizer, SynthesisCache
+from .circuit import (assemble_grover_circuit, generate_grover_diffusion, optimal_iterations,
+                      uniform_superposition_qiskit)
+from .classical import num_colorings
+from .instrumentation import stage
+
+try:
+    from qiskit_aer import AerSimulator
+except ImportError:
+    AerSimulator = None  # qiskit's own Statevector sampling is used instead
+
+# A statevector of n qubits takes 16 * 2**n bytes, 16 GiB at 30 qubits
+MAX_SIMULATED_QUBITS = 30
+
+
+def simulate_counts(circuit: QuantumCircuit, qubits: Sequence[int], shots: int = 1024,
+                    seed: Optional[int] = None, max_qubits: int = MAX_SIMULATED_QUBITS) -> dict:
+    """
+    Sample measurements of some qubits of a circuit on a local statevector simulator.
+
+    Uses qiskit-aer when it is installed and qiskit's Statevector otherwise. Either
+    way the whole circuit is simulated, so its width is limited by max_qubits.
+
+    Parameters:
+    -----------
+    circuit : QuantumCircuit
+        Circuit without measurements, e.g. from assemble_grover_circuit
+    qubits : sequence of int
+        Qubits to measure
+    shots : int
+        Number of samples
+    seed : int, optional
+        Seed of the sampler
+    max_qubits : int
+        Widest circuit that is simulated
+
+    Returns:
+    --------
+    dict : Bitstring -> count. Bitstrings are little-endian as everywhere in Qiskit:
+        the last character is qubits[0].
+    """
+    if circuit.num_qubits > max_qubits:
+        raise ValueError(f"Circuit has {circuit.num_qubits} qubits, more than the {max_qubits} that are simulated")
+    qubits = list(qubits)
+    if AerSimulator is not None:
+        measured = circuit.copy()
+        register = ClassicalRegister(len(qubits), "meas")
+        measured.add_register(register)
+        measured.measure(qubits, register)
+        simulator = AerSimulator(method="statevector")
+        result = simulator.run(transpile(measured, simulator), shots=shots, seed_simulator=seed).result()
+        return result.get_counts()
+    state = Statevector(circuit)
+    state.seed(seed)
+    return state.sample_counts(shots, qargs=qubits)
+
+
+def decode_bits(bits: np.ndarray, network: VCPNetwork, num_encode_qubits: Optional[int] = None,
+                fix_colored: bool = True) -> np.ndarray:
+    """
+    Decode input assignments of the multi-bit coloring function into colorings.
+
+    Bit b of the i-th vertex of oracle_vertices is input (and data qubit)
+    i * num_encode_qubits + b, and the bits of a vertex are its color code, least
+    significant first, so every vertex's code is a dot product with the bit weights.
+    Vertices without inputs keep their pre-assigned color or get color 0.
+
+    Parameters:
+    -----------
+    bits : numpy.ndarray
+        (rows, inputs) 0/1 matrix, column q holding input q. Columns past the data
+        qubits are ignored.
+    network : VCPNetwork
+        The network the function was built from
+    num_encode_qubits : int, optional
+        Bits per vertex, ceil(log2(available_colors)) by default
+    fix_colored : bool
+        Whether pre-colored vertices were constants, as in build_multi_bit_function
+
+    Returns:
+    --------
+    numpy.ndarray : int64 (rows, num_vertices) matrix whose column v - 1 is the
+        color of vertex v
+    """
+    if num_encode_qubits is None:
+        num_encode_qubits = ceil(log2(network.available_colors))
+    vertices = np.asarray(oracle_vertices(network, fix_colored=fix_colored), dtype=np.int64)
+    num_data_qubits = len(vertices) * num_encode_qubits
+    if len(bits) and bits.shape[1] < num_data_qubits:
+        raise ValueError(f"Expected at least {num_data_qubits} bits per row, got {bits.shape[1]}")
+
+    base = np.maximum(network.core.color_idx[1:], 0).astype(np.int64)
+    colors = np.tile(base, (len(bits), 1))
+    if num_data_qubits:
+        weights = np.left_shift(1, np.arange(num_encode_qubits, dtype=np.int64))
+        codes = bits[:, :num_data_qubits].reshape(len(bits), len(vertices), num_encode_qubits) @ weights
+        colors[:, vertices - 1] = codes
+    return colors
+
+
+def decode_counts(counts: dict, network: VCPNetwork, num_encode_qubits: Optional[int] = None,
+                  fix_colored: bool = True, per_shot: bool = False) -> tuple:
+    """
+    Decode measured bitstrings into one coloring of the whole network per row.
+
+    All bitstrings are unpacked at once into a bit matrix, which decode_bits turns
+    into colors.
+
+    Parameters:
+    -----------
+    counts : dict
+        Bitstring -> count, with qubit 0 last (see simulate_counts). Characters past
+        the data qubits (e.g. measured ancillas) are ignored.
+    network : VCPNetwork
+        The network the oracle was built from
+    num_encode_qubits : int, optional
+        Qubits per vertex, ceil(log2(available_colors)) by default
+    fix_colored : bool
+        Whether pre-colored vertices were oracle constants, as in build_multi_bit_function
+    per_shot : bool
+        If True, repeat every row by its count to get one row per shot
+
+    Returns:
+    --------
+    tuple : (colors, frequencies). colors is an int64 (rows, num_vertices) matrix
+        whose column v - 1 is the color of vertex v; frequencies is the int64 count of
+        every row, all ones if per_shot.
+    """
+    keys = [key.replace(" ", "") for key in counts]
+    frequencies = np.fromiter(counts.values(), dtype=np.int64, count=len(keys))
+    width = len(keys[0]) if keys else 0
+    if any(len(key) != width for key in keys):
+        raise ValueError("Bitstrings must all have the same length")
+    # Reverse the columns so that column q is qubit q
+    bits = (np.frombuffer("".join(keys).encode("ascii"), dtype=np.uint8).reshape(len(keys), width)
+            - ord("0"))[:, ::-1]
+    colors = decode_bits(bits, network, num_encode_qubits, fix_colored=fix_colored)
+
+    if per_shot:
+        colors = np.repeat(colors, frequencies, axis=0)
+        frequencies = np.ones(len(colors), dtype=np.int64)
+    return colors, frequencies
+
+
+def valid_colorings(network: VCPNetwork, colors: np.ndarray) -> np.ndarray:
+    """
+    Check a batch of colorings against the network's edges and color count.
+
+    Parameters:
+    -----------
+    network : VCPNetwork
+        The network to check against
+    colors : numpy.ndarray
+        (rows, num_vertices) matrix as returned by decode_counts
+
+    Returns:
+    --------
+    numpy.ndarray : bool per row, True if the row is a proper coloring with codes
+        below available_colors (see VCPNetwork.verify_colorings)
+    """
+    colors = np.asarray(colors)
+    conflicts, _ = network.verify_colorings(colors)
+    return (conflicts == 0) & ((colors >= 0) & (colors < network.available_colors)).all(axis=1)
+
+
+class GroverSolver:
+    """
+    Colors a network by simulating its Grover circuit.
+
+    The circuit is built the same way as the VCGC benchmark circuit: the multi-bit
+    coloring oracle synthesized with XAG, the uniform superposition over the k codes
+    of every vertex, and a diffusion operator reflecting about that state. Measured
+    samples are decoded and verified in bulk, so invalid samples are never returned.
+
+    Attributes:
+    -----------
+    network : VCPNetwork
+        The network being colored
+    circuit : QuantumCircuit
+        The Grover circuit, filled by build
+    iterations : int
+        Number of Grover rounds of circuit
+    num_data_qubits : int
+        Number of data qubits, the ones measured
+    num_encode_qubits : int
+        Qubits per vertex
+    oracle, usp, diffusion_operator : QuantumCircuit
+        The components of circuit, filled by build unless they were given
+    """
+
+    def __init__(self, network: VCPNetwork, reduction: str = "balanced", exclude_invalid: bool = False,
+                 iterations: Optional[int] = None, diffusion: str = "default", reflect_usp: bool = True,
+                 cache: Optional[SynthesisCache] = None, oracle: Optional[QuantumCircuit] = None,
+                 usp: Optional[QuantumCircuit] = None, diffusion_operator: Optional[QuantumCircuit] = None):
+        """
+        Parameters:
+        -----------
+        network : VCPNetwork
+            The network to color
+        reduction : str
+            How the edge constraints are joined, one of REDUCTION_MODES
+        exclude_invalid : bool
+            If True, forbid codes >= available_colors in the oracle and prepare all codes
+        iterations : int, optional
+            Number of Grover rounds, chosen from the number of colorings if None
+        diffusion : str
+            MCX decomposition of the diffusion operator, one of MCX_MODES
+        reflect_usp : bool
+            If True, reflect about the prepared state rather than |+>^n
+        cache : SynthesisCache, optional
+            Persistent cache of synthesized oracles
+        oracle, usp, diffusion_operator : QuantumCircuit, optional
+            Components built earlier for the same settings, reused instead of being
+            built again (see ChromaticSearch)
+        """
+        self.network = network
+        self.reduction = reduction
+        self.exclude_invalid = exclude_invalid
+        self.iterations = iterations
+        self.diffusion = diffusion
+        self.reflect_usp = reflect_usp
+        self.cache = cache
+        self.oracle = oracle
+        self.usp = usp
+        self.diffusion_operator = diffusion_operator
+        self.circuit = None
+        self.num_encode_qubits = ceil(log2(network.available_colors))
+        self.num_data_qubits = len(oracle_vertices(network)) * self.num_encode_qubits
+        self._num_solutions = None
+
+    @property
+    def num_codes(self) -> int:
+        """Number of codes prepared per vertex."""
+        return 2 ** self.num_encode_qubits if self.exclude_invalid else self.network.available_colors
+
+    def count_solutions(self) -> tuple:
+        """Return (number of colorings, exact) from classical.num_colorings, computed once."""
+        if self._num_solutions is None:
+            self._num_solutions = num_colorings(self.network, seed=0)
+        return self._num_solutions
+
+    def build(self) -> QuantumCircuit:
+        """Build, store and return the Grover circuit."""
+        network = self.network
+        if self.oracle is None:
+            function = BooleanFunction().create_multi_bit_function(network, reduction=self.reduction,
+                                                                   exclude_invalid=self.exclude_invalid)
+            self.oracle = Synthesizer(function, cache=self.cache).synthesize_with_xag()
+        if self.usp is None:
+            if self.exclude_invalid:
+                self.usp = QuantumCircuit(self.num_encode_qubits)
+                self.usp.h(range(self.num_encode_qubits))
+            else:
+                self.usp = uniform_superposition_qiskit(num_superpos_states=self.num_codes).decompose()
+        if self.diffusion_operator is None:
+            self.diffusion_operator = generate_grover_diffusion(self.num_data_qubits, mcx_mode=self.diffusion,
+                                                                usp=self.usp if self.reflect_usp else None,
+                                                                num_encode_qubits=self.num_encode_qubits)
+
+        if self.iterations is None:
+            num_states = self.num_codes ** (self.num_data_qubits // self.num_encode_qubits)
+            num_solutions, _ = self.count_solutions()
+            num_solutions = min(num_solutions, num_states)
+            self.iterations = optimal_iterations(num_states, max(round(num_solutions), 1) if num_solutions else 0)
+        self.circuit = assemble_grover_circuit(usp=self.usp, oracle=self.oracle, diffusion=self.diffusion_operator,
+                                               num_data_qubits=self.num_data_qubits,
+                                               num_encode_qubits=self.num_encode_qubits,
+                                               iterations=self.iterations)
+        return self.circuit
+
+    def sample(self, shots: int = 1024, seed: Optional[int] = None, per_shot: bool = False) -> tuple:
+        """
+        Simulate the circuit and decode and verify the samples.
+
+        Parameters:
+        -----------
+        shots : int
+            Number of samples
+        seed : int, optional
+            Seed of the sampler
+        per_shot : bool
+            If True, return one row per shot instead of one per distinct sample
+
+        Returns:
+        --------
+        tuple : (colors, frequencies, valid), see decode_counts and valid_colorings
+        """
+        if self.num_data_qubits == 0:
+            # Everything is pre-colored, the only candidate is the given coloring
+            counts = {"": shots}
+        else:
+            if self.circuit is None:
+                self.build()
+            with stage("simulate"):
+                counts = simulate_counts(self.circuit, range(self.num_data_qubits), shots=shots, seed=seed)
+        with stage("decode"):
+            colors, frequencies = decode_counts(counts, self.network, self.num_encode_qubits, per_shot=per_shot)
+            valid = valid_colorings(self.network, colors)
+        return colors, frequencies, valid
+
+    def solve(self, shots: int = 1024, seed: Optional[int] = None) -> Optional[dict]:
+        """
+        Return the most frequently measured valid coloring, or None if no sample is valid.
+
+        Returns:
+        --------
+        dict or None : Color of every vertex 1..n
+        """
+        colors, frequencies, valid = self.sample(shots=shots, seed=seed)
+        if not valid.any():
+            return None
+        best = np.flatnonzero(valid)[np.argmax(frequencies[valid])]
+        return {v: int(color) for v, color in enumerate(colors[best].tolist(), start=1)}
+
+
+def grover_solve(network: VCPNetwork, shots: int = 1024, seed: Optional[int] = None, **options) -> Optional[dict]:
+    """
+    Color a network with a simulated Grover search, see GroverSolver.
+
+    Fits the solver argument of ComponentDecomposition.solve, e.g.
+    decomposition.solve(solver=functools.partial(grover_solve, seed=0)).
+
+    Parameters:
+    -----------
+    network : VCPNetwork
+        The network to color
+    shots : int
+        Number of samples
+    seed : int, optional
+        Seed of the sampler
+    **options
+        Passed on to GroverSolver
+
+    Returns:
+    --------
+    dict or None : Color of every vertex 1..n, or None if no sample is a valid coloring
+    """
+    return GroverSolver(network, **options).solve(shots=shots, seed=seed)
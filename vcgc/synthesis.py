@@ -1,19 +1,144 @@
 # A module that utilizes the Tweedledum library to synthesize quantum circuits
 
+import contextlib
+import hashlib
+import os
+import tempfile
+from typing import Optional
+from qiskit import QuantumCircuit, qpy
 from tweedledum.synthesis import xag_synth
 from tweedledum.qiskit import to_qiskit
+from tweedledum.classical import write_verilog
 from tweedledum.bool_function_compiler.bool_function import BoolFunction
+from .instrumentation import stage
+
+# Bump when the synthesis flow changes so stale cache entries are not reused.
+_SYNTHESIS_VERSION = 1
+
+
+def logic_network_verilog(logic_network) -> str:
+    """
+    Return the Verilog text tweedledum writes for a logic network.
+
+    Args:
+        logic_network: A tweedledum LogicNetwork.
+
+    Returns:
+        str: One "assign" statement per gate, in node order.
+    """
+    fd, path = tempfile.mkstemp(suffix='.v')
+    os.close(fd)
+    try:
+        write_verilog(logic_network, path)
+        with open(path, 'r', newline='') as f:
+            return f.read()
+    finally:
+        os.unlink(path)
+
+
+def logic_network_digest(logic_network) -> str:
+    """
+    Return a SHA-256 hex digest identifying a logic network by its structure.
+
+    The network is serialized with tweedledum's Verilog writer, which lists the
+    inputs, gates and outputs in node order, so equal networks hash equally.
+
+    Args:
+        logic_network: A tweedledum LogicNetwork.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256(f"xag_synth:v{_SYNTHESIS_VERSION}\n".encode())
+    digest.update(logic_network_verilog(logic_network).encode())
+    return digest.hexdigest()
+
+
+class SynthesisCache:
+    """
+    Persistent, content-addressed store of synthesized circuits.
+
+    Each entry is one QPY file named by a digest (see logic_network_digest). Hits
+    refresh the file's modification time, and inserts evict the least recently used
+    entries until the directory fits in max_bytes.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = 256 << 20):
+        """
+        Args:
+            cache_dir (str, optional): Directory holding the entries. Defaults to
+                ~/.cache/vcgc/synthesis.
+            max_bytes (int): Size limit of the directory in bytes.
+        """
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.expanduser('~'), '.cache', 'vcgc', 'synthesis')
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.qpy")
+
+    def get(self, key: str) -> Optional[QuantumCircuit]:
+        """Return the circuit stored under key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                circuit = qpy.load(f)[0]
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Truncated, corrupt or written by an incompatible QPY version: treat as a miss
+            with contextlib.suppress(OSError):
+                os.unlink(path)
+            return None
+        # The entry may have been evicted by another process in the meantime
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return circuit
+
+    def put(self, key: str, circuit: QuantumCircuit) -> None:
+        """Store a circuit under key and evict old entries beyond max_bytes."""
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                qpy.dump(circuit, f)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete the least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.qpy'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
 
 class Synthesizer:
     """A class to handle synthesis of quantum circuits using Tweedledum."""
 
-    def __init__(self, cf = None):
+    def __init__(self, cf = None, cache: Optional[SynthesisCache] = None):
         if (cf != None):
             self.logic_network = cf._logic_network
         else:
             self.logic_network = None
         self.tweedledum_circuit = None
         self.qiskit_circuit = None
+        self.cache = cache
 
     @staticmethod
     def xag_synthesis_preview(cf):
@@ -31,9 +156,29 @@ class Synthesizer:
         return qc_qiskit
     
     def synthesize_with_xag(self):
-        """Synthesize the logic network using XAG synthesis."""
-        self.tweedledum_circuit = xag_synth(self.logic_network)
-        self.qiskit_circuit = to_qiskit(self.tweedledum_circuit, circuit_type="gatelist")
+        """
+        Synthesize the logic network using XAG synthesis.
+
+        With a cache, the Qiskit circuit is looked up by the network's digest first.
+        A hit skips xag_synth and to_qiskit, and leaves tweedledum_circuit as None.
+        """
+        key = None
+        if self.cache is not None:
+            with stage("cache_lookup"):
+                key = logic_network_digest(self.logic_network)
+                cached = self.cache.get(key)
+            if cached is not None:
+                self.tweedledum_circuit = None
+                self.qiskit_circuit = cached
+                return self.qiskit_circuit
+
+        with stage("xag_synth"):
+            self.tweedledum_circuit = xag_synth(self.logic_network)
+        with stage("to_qiskit"):
+            self.qiskit_circuit = to_qiskit(self.tweedledum_circuit, circuit_type="gatelist")
+        if key is not None:
+            with stage("cache_store"):
+                self.cache.put(key, self.qiskit_circuit)
         return self.qiskit_circuit
     
     def print_circuit_info(self):
@@ -41,6 +186,8 @@ class Synthesizer:
         if self.tweedledum_circuit:
             print(f"Number of qubits: {self.tweedledum_circuit.num_qubits()}")
             print(self.tweedledum_circuit)
+        elif self.qiskit_circuit:
+            print(f"Number of qubits: {self.qiskit_circuit.num_qubits} (loaded from the synthesis cache)")
         else:
             print("No circuit synthesized yet.")
 
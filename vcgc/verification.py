@@ -0,0 +1,387 @@
+# A module that checks oracles against the coloring predicate with bit-parallel simulation
+
+import os
+import re
+from math import ceil, log2
+from typing import Callable, Optional
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit.circuit import ControlledGate
+from .network import VCPNetwork
+from .boolean import oracle_vertices
+from .classical import tabu_search
+from .simulation import decode_bits
+from .synthesis import logic_network_verilog
+
+# Gates that only change the phase of basis states, which the check ignores
+_DIAGONAL_GATES = {"id", "z", "s", "sdg", "t", "tdg", "p", "rz", "u1", "cz", "cp", "crz", "cu1", "ccz", "cs",
+                   "csdg", "mcphase", "global_phase", "barrier", "delay"}
+# Toffolis up to a relative phase: all qubits but the last are controls
+_RELATIVE_PHASE_TOFFOLIS = {"rccx", "rcccx"}
+
+_VERILOG_TOKEN = re.compile(r"\s*(1'b[01]|[A-Za-z_][\w$]*(?:\[\d+\])?|[~&|^()])")
+
+
+class OracleCheck:
+    """
+    Result of check_oracle.
+
+    Attributes:
+    -----------
+    num_assignments : int
+        Number of input assignments that were checked
+    exhaustive : bool
+        True if every assignment was checked
+    mismatches : int
+        Assignments where the oracle disagrees with the predicate
+    garbage : int
+        Assignments after which a reversible circuit leaves an input or ancilla
+        changed (always 0 for logic networks)
+    counterexample : list or None
+        Input bits (input 0 first) of the first failing assignment
+    """
+
+    def __init__(self, num_assignments: int, exhaustive: bool, mismatches: int, garbage: int,
+                 counterexample: Optional[list]):
+        self.num_assignments = num_assignments
+        self.exhaustive = exhaustive
+        self.mismatches = mismatches
+        self.garbage = garbage
+        self.counterexample = counterexample
+
+    @property
+    def passed(self) -> bool:
+        return self.mismatches == 0 and self.garbage == 0
+
+    def __repr__(self) -> str:
+        mode = "exhaustive" if self.exhaustive else "sampled"
+        return (f"OracleCheck({mode}, {self.num_assignments} assignments, {self.mismatches} mismatches, "
+                f"{self.garbage} garbage)")
+
+
+def pack_words(bits: np.ndarray) -> np.ndarray:
+    """
+    Pack the columns of a (rows, signals) 0/1 matrix into 64 assignments per word.
+
+    Returns:
+    --------
+    numpy.ndarray : uint64 (signals, ceil(rows / 64)) array; bit t of word w of a
+        signal is its value in row 64 * w + t. Padding rows are 0.
+    """
+    rows, signals = bits.shape
+    padded = np.zeros((signals, -(-rows // 64) * 64), dtype=np.uint8)
+    padded[:, :rows] = bits.T
+    return np.packbits(padded, axis=1, bitorder="little").view("<u8").astype(np.uint64)
+
+
+def unpack_words(words: np.ndarray, rows: int) -> np.ndarray:
+    """Return the first rows assignments of a packed signal as a bool array (inverse of pack_words)."""
+    return np.unpackbits(words.astype("<u8").view(np.uint8), bitorder="little")[:rows].astype(bool)
+
+
+def _parse_expression(tokens: list, position: int, level: int = 0) -> tuple:
+    """Parse tokens from position at a precedence level (| < ^ < &), return (tree, next position)."""
+    operators = ("|", "^", "&")
+    if level == len(operators):
+        token = tokens[position]
+        if token == "~":
+            operand, position = _parse_expression(tokens, position + 1, level)
+            return ("~", operand), position
+        if token == "(":
+            operand, position = _parse_expression(tokens, position + 1)
+            if tokens[position] != ")":
+                raise ValueError(f"Expected ')' in Verilog expression, got '{tokens[position]}'")
+            return operand, position + 1
+        return token, position + 1
+    tree, position = _parse_expression(tokens, position, level + 1)
+    while position < len(tokens) and tokens[position] == operators[level]:
+        operand, position = _parse_expression(tokens, position + 1, level + 1)
+        tree = (operators[level], tree, operand)
+    return tree, position
+
+
+def read_verilog_netlist(verilog: str) -> tuple:
+    """
+    Parse a gate-level Verilog module of "assign" statements.
+
+    Covers the modules tweedledum's write_verilog and BooleanFunction.create_manual_verilog
+    write: ~, &, ^, | and parentheses over inputs, wires and the constants 1'b0 and 1'b1.
+
+    Parameters:
+    -----------
+    verilog : str
+        Module text
+
+    Returns:
+    --------
+    tuple : (inputs, outputs, assigns), assigns mapping every wire and output to its
+        expression tree in a topological order
+    """
+    inputs, outputs, assigns = [], [], {}
+    for statement in verilog.replace("\n", " ").split(";"):
+        keyword, _, rest = statement.strip().partition(" ")
+        if keyword == "input":
+            inputs.extend(name.strip() for name in rest.split(","))
+        elif keyword == "output":
+            outputs.extend(name.strip() for name in rest.split(","))
+        elif keyword == "assign":
+            target, _, expression = rest.partition("=")
+            tokens = _VERILOG_TOKEN.findall(expression)
+            if "".join(tokens) != re.sub(r"\s", "", expression):
+                raise ValueError(f"Unsupported Verilog expression '{expression.strip()}'")
+            tree, position = _parse_expression(tokens, 0)
+            if position != len(tokens):
+                raise ValueError(f"Unsupported Verilog expression '{expression.strip()}'")
+            assigns[target.strip()] = tree
+
+    # Order the assigns so that every wire comes after the wires it reads
+    ordered, state = {}, {}
+    for name in assigns:
+        stack = [(name, False)]
+        while stack:
+            signal, expanded = stack.pop()
+            if signal not in assigns or state.get(signal) == "done":
+                continue
+            if expanded:
+                state[signal] = "done"
+                ordered[signal] = assigns[signal]
+                continue
+            if state.get(signal) == "open":
+                raise ValueError(f"Combinational loop through '{signal}'")
+            state[signal] = "open"
+            stack.append((signal, True))
+            nodes = [assigns[signal]]
+            while nodes:
+                node = nodes.pop()
+                if isinstance(node, tuple):
+                    nodes.extend(node[1:])
+                elif state.get(node) != "done":
+                    stack.append((node, False))
+    return inputs, outputs, ordered
+
+
+def simulate_verilog(verilog: str, inputs: np.ndarray) -> np.ndarray:
+    """
+    Evaluate the first output of a Verilog module on packed input words.
+
+    Parameters:
+    -----------
+    verilog : str
+        Module text, see read_verilog_netlist
+    inputs : numpy.ndarray
+        uint64 (num_inputs, words) array from pack_words, one row per module input
+
+    Returns:
+    --------
+    numpy.ndarray : uint64 words of the output
+    """
+    names, outputs, assigns = read_verilog_netlist(verilog)
+    if len(names) != len(inputs):
+        raise ValueError(f"Module has {len(names)} inputs, got {len(inputs)} input signals")
+    ones = np.full(inputs.shape[1], np.uint64(0xFFFFFFFFFFFFFFFF))
+    values = dict(zip(names, inputs))
+    values["1'b0"] = np.zeros_like(ones)
+    values["1'b1"] = ones
+
+    def evaluate(node):
+        if not isinstance(node, tuple):
+            if node not in values:
+                raise ValueError(f"Signal '{node}' is read but never assigned")
+            return values[node]
+        if node[0] == "~":
+            return ~evaluate(node[1])
+        left, right = evaluate(node[1]), evaluate(node[2])
+        return left & right if node[0] == "&" else left ^ right if node[0] == "^" else left | right
+
+    for signal, tree in assigns.items():
+        values[signal] = evaluate(tree)
+    return values[outputs[0]]
+
+
+def _apply_reversible(circuit: QuantumCircuit, state: np.ndarray, qubits: list) -> None:
+    """Apply the X/CX/MCX/SWAP gates of circuit to packed basis states, in place."""
+    for instruction in circuit.data:
+        operation = instruction.operation
+        targets = [qubits[circuit.find_bit(qubit).index] for qubit in instruction.qubits]
+        name = operation.name
+        if name in _DIAGONAL_GATES:
+            continue
+        if name == "x":
+            np.invert(state[targets[0]], out=state[targets[0]])
+        elif name == "swap":
+            state[targets] = state[targets[::-1]]
+        elif name in _RELATIVE_PHASE_TOFFOLIS or (isinstance(operation, ControlledGate)
+                                                  and operation.base_gate.name == "x"):
+            num_controls = len(targets) - 1
+            ctrl_state = getattr(operation, "ctrl_state", (1 << num_controls) - 1)
+            mask = np.full(state.shape[1], np.uint64(0xFFFFFFFFFFFFFFFF))
+            for i, control in enumerate(targets[:num_controls]):
+                mask &= state[control] if (ctrl_state >> i) & 1 else ~state[control]
+            state[targets[-1]] ^= mask
+        elif operation.definition is not None:
+            _apply_reversible(operation.definition, state, targets)
+        else:
+            raise ValueError(f"Gate '{name}' is not a classical reversible gate")
+
+
+def simulate_reversible(circuit: QuantumCircuit, inputs: np.ndarray, output_qubit: Optional[int] = None) -> tuple:
+    """
+    Run a reversible oracle circuit on packed basis states.
+
+    The inputs go on the first qubits and every other qubit starts in |0>. Gates that
+    only add phases to basis states are skipped, so phases are not checked.
+
+    Parameters:
+    -----------
+    circuit : QuantumCircuit
+        Oracle with the inputs on qubits 0..n-1 and the output on qubit n, as
+        Synthesizer.synthesize_with_xag returns it
+    inputs : numpy.ndarray
+        uint64 (n, words) array from pack_words
+    output_qubit : int, optional
+        Qubit holding the result, n by default
+
+    Returns:
+    --------
+    tuple : (output, garbage) uint64 words; garbage marks the assignments after which
+        some other qubit does not hold its initial value
+    """
+    if output_qubit is None:
+        output_qubit = len(inputs)
+    if circuit.num_qubits <= max(output_qubit, len(inputs) - 1):
+        raise ValueError(f"Circuit has {circuit.num_qubits} qubits, too few for {len(inputs)} inputs and an output")
+    initial = np.zeros((circuit.num_qubits, inputs.shape[1]), dtype=np.uint64)
+    initial[:len(inputs)] = inputs
+    state = initial.copy()
+    _apply_reversible(circuit, state, list(range(circuit.num_qubits)))
+    changed = np.delete(state ^ initial, output_qubit, axis=0)
+    garbage = np.bitwise_or.reduce(changed, axis=0) if len(changed) else np.zeros(inputs.shape[1], dtype=np.uint64)
+    return state[output_qubit], garbage
+
+
+def coloring_predicate(network: VCPNetwork, bits: np.ndarray, fix_colored: bool = True,
+                       exclude_invalid: bool = False) -> np.ndarray:
+    """
+    Evaluate the multi-bit coloring function classically on a batch of assignments.
+
+    Parameters:
+    -----------
+    network : VCPNetwork
+        The network the function was built from
+    bits : numpy.ndarray
+        (rows, inputs) 0/1 matrix in the input order of build_multi_bit_function
+    fix_colored : bool
+        Whether pre-colored vertices are constants
+    exclude_invalid : bool
+        Whether codes >= available_colors are rejected
+
+    Returns:
+    --------
+    numpy.ndarray : bool per row
+    """
+    colors = decode_bits(bits, network, fix_colored=fix_colored)
+    conflicts, _ = network.verify_colorings(colors)
+    satisfied = conflicts == 0
+    if exclude_invalid:
+        satisfied &= (colors < network.available_colors).all(axis=1)
+    return satisfied
+
+
+def _assignments(network: VCPNetwork, num_inputs: int, max_exhaustive: int, samples: int,
+                 fix_colored: bool, seed: Optional[int]) -> tuple:
+    """Return (bits, exhaustive): every assignment, or uniform samples plus mutated solutions."""
+    if num_inputs <= max_exhaustive:
+        index = np.arange(1 << num_inputs, dtype=np.int64)
+        return ((index[:, None] >> np.arange(num_inputs)) & 1).astype(np.uint8), True
+
+    # Uniform samples almost never satisfy the predicate, so half of them start from a
+    # coloring with few conflicts and recolor up to two random vertices. Tabu search
+    # is bounded by its move limit, where backtracking to a proper coloring is not.
+    rng = np.random.default_rng(seed)
+    bits = rng.integers(0, 2, size=(samples, num_inputs), dtype=np.uint8)
+    vertices = oracle_vertices(network, fix_colored=fix_colored)
+    coloring = tabu_search(network, seed=seed)
+    if vertices:
+        bits_per_color = num_inputs // len(vertices)
+        codes = np.tile([coloring[v] for v in vertices], (samples // 2, 1))
+        rows = np.arange(len(codes))
+        for _ in range(2):
+            recolor = rng.random(len(codes)) < 0.5
+            columns = rng.integers(0, len(vertices), size=len(codes))
+            codes[rows[recolor], columns[recolor]] = rng.integers(0, 1 << bits_per_color, size=recolor.sum())
+        bits[:len(codes)] = ((codes[:, :, None] >> np.arange(bits_per_color)) & 1).reshape(len(codes), -1)
+    return bits, False
+
+
+def check_oracle(network: VCPNetwork, oracle, fix_colored: bool = True, exclude_invalid: bool = False,
+                 predicate: Optional[Callable[[np.ndarray], np.ndarray]] = None, max_exhaustive: int = 20,
+                 samples: int = 1 << 16, seed: Optional[int] = None) -> OracleCheck:
+    """
+    Check an oracle against the coloring predicate, 64 assignments per machine word.
+
+    Every input assignment is checked when there are at most max_exhaustive inputs;
+    otherwise samples assignments are drawn, half uniformly and half near a
+    coloring found by tabu search so that both outcomes are covered. Logic networks
+    are evaluated gate by gate through their Verilog text, and reversible circuits by
+    running their X/CX/MCX gates on packed basis states, which also checks that every
+    ancilla and input is restored.
+
+    Parameters:
+    -----------
+    network : VCPNetwork
+        The network the oracle was built from
+    oracle : QuantumCircuit, BoolFunction, LogicNetwork or str
+        A synthesized circuit (inputs first, then the output qubit), a tweedledum
+        function or logic network, or Verilog text or a path to a Verilog file
+    fix_colored : bool
+        Whether pre-colored vertices are constants, as in build_multi_bit_function
+    exclude_invalid : bool
+        Whether codes >= available_colors are rejected
+    predicate : callable, optional
+        Maps a (rows, inputs) 0/1 matrix to the expected bool per row, for oracles
+        with another input layout. Defaults to coloring_predicate.
+    max_exhaustive : int
+        Largest input count that is checked exhaustively
+    samples : int
+        Number of sampled assignments for larger inputs
+    seed : int, optional
+        Seed of the sampler
+
+    Returns:
+    --------
+    OracleCheck : The mismatch and garbage counts and a counterexample
+    """
+    if isinstance(oracle, QuantumCircuit):
+        verilog = None
+    elif isinstance(oracle, str):
+        verilog = oracle
+        if os.path.exists(oracle):
+            with open(oracle, "r") as f:
+                verilog = f.read()
+    else:
+        verilog = logic_network_verilog(getattr(oracle, "_logic_network", oracle))
+
+    if verilog is not None:
+        num_inputs = len(read_verilog_netlist(verilog)[0])
+    else:
+        bits_per_color = ceil(log2(network.available_colors))
+        num_inputs = len(oracle_vertices(network, fix_colored=fix_colored)) * bits_per_color
+    bits, exhaustive = _assignments(network, num_inputs, max_exhaustive, samples, fix_colored, seed)
+    if predicate is None:
+        expected = coloring_predicate(network, bits, fix_colored=fix_colored, exclude_invalid=exclude_invalid)
+    else:
+        expected = np.asarray(predicate(bits), dtype=bool)
+
+    words = pack_words(bits)
+    if verilog is not None:
+        output = simulate_verilog(verilog, words)
+        garbage = np.zeros(len(bits), dtype=bool)
+    else:
+        output, garbage_words = simulate_reversible(oracle, words)
+        garbage = unpack_words(garbage_words, len(bits))
+    mismatch = unpack_words(output, len(bits)) != expected
+
+    failing = np.flatnonzero(mismatch | garbage)
+    counterexample = bits[failing[0]].tolist() if len(failing) else None
+    return OracleCheck(num_assignments=len(bits), exhaustive=exhaustive, mismatches=int(mismatch.sum()),
+                       garbage=int(garbage.sum()), counterexample=counterexample)